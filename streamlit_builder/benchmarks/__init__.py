@@ -0,0 +1 @@
+"""Micro-benchmarks, run with `python -m streamlit_builder.benchmarks.<name>`"""
\ No newline at end of file
@@ -0,0 +1,61 @@
+"""Measure cold import time of a Streamlit app's dependencies with and without precompiled bytecode"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+from ..core.container.bytecode import BytecodeCompiler
+from ..core.container.terminal import Terminal
+
+def _time_import(python: Path, modules: List[str], count: int, write_bytecode: bool) -> List[float]:
+    env = dict(os.environ)
+    if not write_bytecode:
+        env["PYTHONDONTWRITEBYTECODE"] = "1"  # Keep every run as cold as the first
+    timings = []
+    for _ in range(count):
+        start = time.perf_counter()
+        subprocess.run([str(python), "-c", f"import {', '.join(modules)}"], env=env, check=True)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+async def run(packages: List[str], modules: List[str], count: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        terminal = Terminal(root)
+        venv = root / ".venv"
+        await terminal.execute(["uv", "venv", str(venv)], "venv")
+        if await terminal.execute(["uv", "pip", "install", "--python", str(venv / "bin" / "python"), *packages], "install") != 0:
+            raise RuntimeError(f"Failed to install {' '.join(packages)}")
+        python = venv / "bin" / "python"
+        
+        results = {"uncompiled": _time_import(python, modules, count, write_bytecode=False)}
+        
+        compiler = BytecodeCompiler(terminal, venv)
+        start = time.perf_counter()
+        compiler.submit_packages()
+        await compiler.wait()
+        compile_time = time.perf_counter() - start
+        
+        results["precompiled"] = _time_import(python, modules, count, write_bytecode=True)
+        await terminal.cleanup()
+    return {"compile_time": compile_time, **results}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=5)
+    parser.add_argument("--packages", nargs="*", default=["streamlit", "pandas", "plotly"])
+    parser.add_argument("--modules", nargs="*", default=["streamlit", "pandas", "plotly.express"])
+    args = parser.parse_args()
+    
+    results = asyncio.run(run(args.packages, args.modules, args.count))
+    print(f"background compile: {results['compile_time']:.2f} s")
+    for label in ("uncompiled", "precompiled"):
+        print(f"{label:>12}: median import {statistics.median(results[label]):.2f} s")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
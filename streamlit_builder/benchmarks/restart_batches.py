@@ -0,0 +1,79 @@
+"""Count server restarts for turns that write many files, per file versus per quiet batch"""
+import argparse
+import asyncio
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, List
+
+from watchfiles import Change
+
+from ..core.constants import REQUIREMENTS_FILE, STREAMLIT_CONFIG_FILE
+from ..core.container.terminal import Terminal
+from ..runtime.session_manager import DevelopmentSession
+
+def _turn_files(files: int) -> List[Path]:
+    """Files a typical multi-file turn writes: pages, dependencies, then server config"""
+    pages = [Path("app.py")] + [Path("pages") / f"page_{i}.py" for i in range(1, max(files - 2, 1))]
+    return pages + [Path(REQUIREMENTS_FILE), STREAMLIT_CONFIG_FILE]
+
+async def _run_turn(root: Path, files: int, gap: float, restart_time: float) -> Dict[str, int]:
+    terminal = Terminal(root)
+    session = DevelopmentSession(SimpleNamespace(terminal=terminal, bytecode=None, wheelhouse=None), root)
+    counts = {"events": 0, "per_file": 0}
+    
+    async def fake_start(app_path: str = "app.py", port=None):
+        await asyncio.sleep(restart_time)
+    
+    async def fake_stop():
+        pass
+    
+    async def fake_sync():
+        await asyncio.sleep(restart_time)
+    
+    async def count_event(path: Path):
+        counts["events"] += 1
+        # What handling each event on its own would have done
+        if path.name == REQUIREMENTS_FILE or path.parts[-2:] == STREAMLIT_CONFIG_FILE.parts or path.suffix == ".py":
+            counts["per_file"] += 1
+    
+    session.streamlit.start, session.streamlit.stop, session.uv.sync_requirements = fake_start, fake_stop, fake_sync
+    for change in (Change.added, Change.modified):
+        session.file_watcher.on_change(change, count_event)
+    
+    await session.file_watcher.start()
+    for relative in _turn_files(files):
+        path = root / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(f"# {relative}\n")
+        await asyncio.sleep(gap)
+    
+    # Let the last batch settle and any restart finish
+    await asyncio.sleep(session.quiet_period + 0.5)
+    await asyncio.gather(*session._applying)
+    await session.file_watcher.stop()
+    await terminal.cleanup()
+    return {**counts, "batched": session.streamlit.restarts}
+
+async def run(turns: int, files: int, gap: float, restart_time: float) -> List[Dict[str, int]]:
+    results = []
+    for _ in range(turns):
+        with tempfile.TemporaryDirectory() as tmp:
+            results.append(await _run_turn(Path(tmp), files, gap, restart_time))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--files", type=int, default=8, help="Files written per turn")
+    parser.add_argument("--gap", type=float, default=0.05, help="Seconds between file writes")
+    parser.add_argument("--restart-time", type=float, default=1.0, help="Simulated seconds per restart")
+    args = parser.parse_args()
+    
+    results = asyncio.run(run(args.turns, args.files, args.gap, args.restart_time))
+    for i, result in enumerate(results, 1):
+        print(f"turn {i}: {result['events']} change events, "
+              f"{result['per_file']} restarts per file, {result['batched']} per quiet batch")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,45 @@
+"""Compare per-command latency of the persistent shell against spawning each command"""
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+from ..core.container.terminal import Terminal
+
+async def _time_commands(terminal: Terminal, command: List[str], count: int) -> List[float]:
+    timings = []
+    for _ in range(count):
+        start = time.perf_counter()
+        await terminal.execute(command, "bench")
+        timings.append(time.perf_counter() - start)
+    return timings
+
+async def run(count: int, command: List[str]) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {}
+        for label, persistent in (("spawn", False), ("shell", True)):
+            terminal = Terminal(Path(tmp), persistent_shell=persistent)
+            # Warm up: starts the shell in persistent mode
+            await terminal.execute(command, "warmup")
+            timings = await _time_commands(terminal, command, count)
+            await terminal.cleanup()
+            results[label] = timings
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=200)
+    parser.add_argument("command", nargs="*", default=["echo", "hello"])
+    args = parser.parse_args()
+    
+    results = asyncio.run(run(args.count, args.command))
+    for label, timings in results.items():
+        timings_ms = sorted(t * 1000 for t in timings)
+        p95 = timings_ms[int(len(timings_ms) * 0.95) - 1]
+        print(f"{label:>6}: mean {statistics.mean(timings_ms):.2f} ms, p50 {statistics.median(timings_ms):.2f} ms, p95 {p95:.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Measure event loop cost of Terminal output capture per MB of process output"""
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from ..core.container.terminal import Terminal
+
+async def _measure_loop_lag(stop: asyncio.Event, interval: float, lags: list):
+    """Record how late a periodic tick fires while output is being pumped"""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, loop.time() - expected))
+
+async def run(megabytes: int, line_length: int) -> dict:
+    """Pump `megabytes` of output through Terminal.execute"""
+    lines = (megabytes * 1024 * 1024) // (line_length + 1)
+    script = f"import sys\nline = 'x' * {line_length} + '\\n'\nsys.stdout.write(line * {lines})"
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        terminal = Terminal(Path(tmp))
+        received = 0
+        
+        def handler(line: str):
+            nonlocal received
+            received += 1
+        
+        terminal.add_output_handler("bench", handler)
+        
+        stop = asyncio.Event()
+        lags: list = []
+        ticker = asyncio.create_task(_measure_loop_lag(stop, 0.001, lags))
+        
+        start = time.perf_counter()
+        cpu_start = time.process_time()
+        await terminal.execute([sys.executable, "-c", script], "bench")
+        wall = time.perf_counter() - start
+        cpu = time.process_time() - cpu_start
+        
+        stop.set()
+        await ticker
+    
+    return {
+        "megabytes": megabytes,
+        "lines": received,
+        "wall_s_per_mb": wall / megabytes,
+        "loop_cpu_s_per_mb": cpu / megabytes,
+        "max_loop_lag_ms": max(lags, default=0.0) * 1000,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--megabytes", type=int, default=16)
+    parser.add_argument("--line-length", type=int, default=80)
+    args = parser.parse_args()
+    
+    result = asyncio.run(run(args.megabytes, args.line_length))
+    for key, value in result.items():
+        print(f"{key:>20}: {value:.4f}" if isinstance(value, float) else f"{key:>20}: {value}")
+
+if __name__ == "__main__":
+    main()
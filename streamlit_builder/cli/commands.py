@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Optional, Dict, Any, Callable, Awaitable
+from typing import Optional, Dict, Any, Callable, Awaitable, List
 from pathlib import Path
 import asyncio
 import click
@@ -12,7 +12,30 @@ from ..runtime.session_manager import DevelopmentSession
 from .display import Display
 from ..core.llm.chat import ChatSession
 from ..core.llm.model import ClaudeModel
-from ..core.constants import ENV_DIR
+from ..core.constants import (
+    ENV_DIR,
+    APP_ENTRY_FILES,
+    DEFAULT_PORT,
+    HOST_MAX_LIVE_SERVERS,
+    HOST_IDLE_TIMEOUT,
+    PROFILE_RERUN_TIMEOUT,
+    LOAD_TEST_VIEWERS,
+    LOAD_TEST_DURATION,
+    LOAD_TEST_THINK_TIME,
+    WHEELHOUSE_DIR,
+)
+from ..core.container.terminal import Terminal
+from ..package.coalescer import InstallCoalescer
+from ..package.uv_manager import UVManager
+from ..package.venv_pool import VenvPool
+from ..project.templates import BasicTemplate
+from ..server.host import AppHost
+from ..runtime.profiler import AppProfiler
+from ..project.datasets import DatasetCatalog
+from ..project.entry import find_app_entry
+from ..server.load_test import LoadTester
+from ..server.proxy import free_port
+from ..server.streamlit_runner import StreamlitRunner
 
 @dataclass
 class CommandContext:
@@ -48,6 +71,14 @@ class CommandRunner:
             await self._run_project(project_path, **kwargs)
         elif command == "install":
             await self._install_package(project_path, **kwargs)
+        elif command == "host":
+            await self._host_workspaces(project_path, **kwargs)
+        elif command == "profile":
+            await self._profile_project(project_path, **kwargs)
+        elif command == "ingest":
+            await self._ingest_data(project_path, **kwargs)
+        elif command == "load-test":
+            await self._load_test(project_path, **kwargs)
         else:
             raise ValueError(f"Unknown command: {command}")
     
@@ -68,7 +99,8 @@ class CommandRunner:
             # Create container config
             config = ContainerConfig(
                 work_dir=workspace_dir,
-                env_dir=workspace_dir / ENV_DIR
+                env_dir=workspace_dir / ENV_DIR,
+                wheelhouse_dir=WHEELHOUSE_DIR  # Installs of pins seen before need no network
             )
             
             # Initialize chat session
@@ -76,6 +108,10 @@ class CommandRunner:
             container = WebContainer(config)
             await container.setup()
             
+            # Start from a pre-built environment with the default template's dependencies
+            venv_pool = VenvPool()
+            await venv_pool.acquire(BasicTemplate().get_dependencies(), config.env_dir)
+            
             chat_session = ChatSession(container, model)
             
             try:
@@ -87,7 +123,7 @@ class CommandRunner:
                 else:
                     self.display.error("Either provide a prompt or use --interactive mode")
             finally:
-                await container.cleanup()
+                await asyncio.gather(container.cleanup(), venv_pool.close())
                 
         except Exception as e:
             logger.error(f"Chat error: {str(e)}")
@@ -161,22 +197,156 @@ class CommandRunner:
             await self._session.stop()
     
     async def _install_package(self, project_path: Path, **kwargs):
-        """Install a package"""
-        package = kwargs.get("package")
-        if not package:
+        """Install packages with a single resolution"""
+        packages = kwargs.get("packages") or ([kwargs["package"]] if kwargs.get("package") else [])
+        if not packages:
             raise ValueError("Package name required")
         
-        with self.display.progress(f"Installing {package}...") as progress:
-            task = progress.add_task("Installing...", total=None)
+        uv = UVManager(self._container.terminal, project_path, wheelhouse=self._container.wheelhouse)
+        installer = InstallCoalescer(uv, window=None)
+        await _install_packages(self.display, installer, packages)
+    
+    async def _host_workspaces(self, workspaces: Path, **kwargs):
+        """Serve each workspace's app under /<workspace>/ on one port"""
+        app_host = AppHost(
+            port=kwargs.get("port", DEFAULT_PORT),
+            max_live=kwargs.get("max_live", HOST_MAX_LIVE_SERVERS),
+            idle_timeout=kwargs.get("idle_timeout", HOST_IDLE_TIMEOUT)
+        )
+        for workspace in sorted(workspaces.iterdir()):
+            entry = find_app_entry(workspace)
+            if entry:
+                app_host.register(workspace.name, workspace.absolute(), entry.name)
+        if not app_host.apps:
+            self.display.error(f"No workspaces with an {' or '.join(APP_ENTRY_FILES)} in {workspaces}")
+            return
+        
+        await app_host.start()
+        for name in app_host.apps:
+            self.display.info(f"{name}: http://localhost:{app_host.port}/{name}/")
+        self.display.success(f"Hosting {len(app_host.apps)} apps, at most {app_host.max_live} running at once")
+        
+        try:
+            # Keep running until interrupted
+            while True:
+                await asyncio.sleep(1)
+        finally:
+            await app_host.stop()
+    
+    async def _profile_project(self, project_path: Path, **kwargs):
+        """Profile every script's reruns and compare with the previous profile"""
+        terminal = Terminal(project_path)
+        profiler = AppProfiler(terminal, project_path)
+        history = profiler.history()
+        try:
+            with self.display.progress("Profiling app...") as progress:
+                task = progress.add_task("Running scripts...", total=None)
+                report = await profiler.profile(rerun_timeout=kwargs.get("rerun_timeout", PROFILE_RERUN_TIMEOUT))
+                progress.update(task, completed=True)
+        finally:
+            await terminal.cleanup()
+        
+        rows = []
+        for script in report.scripts:
+            if script.error:
+                self.display.error(f"{script.script}: {script.error}")
+            for rerun in script.reruns():
+                hotspot = rerun.hotspots[0]["function"] if rerun.hotspots else ""
+                status = rerun.error or "; ".join(rerun.exceptions) or "ok"
+                rows.append([
+                    script.script, rerun.label, f"{rerun.wall_time * 1000:.0f}",
+                    f"{rerun.peak_memory / 2**20:.1f}", hotspot, status
+                ])
+        self.display.table(["Script", "Rerun", "ms", "Peak MiB", "Top hotspot", "Status"], rows, title="Rerun profile")
+        
+        if history:
+            regressions = report.regressions(history[-1])
+            for regression in regressions:
+                self.display.warning(f"Slower than last profile: {regression}")
+            if not regressions:
+                self.display.success(f"No regressions since {history[-1].created}")
+    
+    async def _ingest_data(self, project_path: Path, **kwargs):
+        """Convert data files to Parquet and list the workspace's datasets"""
+        catalog = DatasetCatalog(project_path)
+        files = kwargs.get("files") or []
+        with self.display.progress("Converting data...") as progress:
+            task = progress.add_task("Writing Parquet...", total=None)
+            if files:
+                for path in files:
+                    await catalog.ingest(path.absolute())
+            else:
+                await catalog.ingest_all()
+            progress.update(task, completed=True)
+        
+        datasets = catalog.datasets()
+        if not datasets:
+            self.display.warning(f"No CSV or JSON files in {catalog.data_dir}")
+            return
+        rows = [
+            [info.name, info.source, str(info.rows), str(len(info.columns)),
+             f"{info.source_size / 2**20:.1f}", f"{info.size_bytes / 2**20:.1f}"]
+            for info in datasets.values()
+        ]
+        self.display.table(["Dataset", "Source", "Rows", "Columns", "Source MiB", "Parquet MiB"], rows, title="Datasets")
+    
+    async def _load_test(self, project_path: Path, **kwargs):
+        """Run synthetic viewers against the app and report latency and server load"""
+        port = kwargs.get("port")
+        terminal = Terminal(project_path)
+        streamlit = None
+        try:
+            if port is None:
+                # A private server on a spare port, so a running `run` session isn't disturbed
+                entry = find_app_entry(project_path)
+                if not entry:
+                    raise FileNotFoundError(f"No {' or '.join(APP_ENTRY_FILES)} in {project_path}")
+                streamlit = StreamlitRunner(terminal, project_path)
+                port = free_port()
+                with self.display.progress("Starting Streamlit server...") as progress:
+                    task = progress.add_task("Initializing...", total=None)
+                    await streamlit.start(entry.name, port=port)
+                    progress.update(task, completed=True)
             
-            await self._container.terminal.execute(
-                ["uv", "pip", "install", package],
-                f"install_{package}"
+            tester = LoadTester(
+                port,
+                viewers=kwargs.get("viewers", LOAD_TEST_VIEWERS),
+                duration=kwargs.get("duration", LOAD_TEST_DURATION),
+                think_time=kwargs.get("think_time", LOAD_TEST_THINK_TIME),
+                server_pid=streamlit.pid if streamlit else None,
             )
-            
-            progress.update(task, completed=True)
+            self.display.info(f"Running {tester.viewers} viewers against port {port} for {tester.duration:.0f}s...")
+            report = await tester.run()
+        finally:
+            if streamlit:
+                await streamlit.stop()
+            await terminal.cleanup()
+        
+        rows = []
+        for kind in ("rerun", "widget", None):
+            latencies = report.percentiles(kind)
+            count = len(report.latencies[kind]) if kind else report.completed
+            rows.append([kind or "all", str(count), *(f"{value * 1000:.0f}" for value in latencies.values())])
+        self.display.table(["Run", "Count", "p50 ms", "p90 ms", "p95 ms", "p99 ms", "max ms"], rows, title="Rerun latency")
+        
+        if report.samples:
+            rows = [
+                [f"{sample.elapsed:.0f}", f"{sample.cpu_percent:.0f}", f"{sample.rss_bytes / 2**20:.0f}"]
+                for sample in report.samples
+            ]
+            self.display.table(["Second", "CPU %", "RSS MiB"], rows, title="Server resources")
         
-        self.display.success(f"Package {package} installed")
+        summary = (
+            f"{report.completed} runs in {report.duration:.1f}s ({report.throughput:.1f}/s) by {report.viewers} viewers"
+        )
+        if report.samples:
+            summary += f", mean CPU {report.mean_cpu:.0f}%, peak RSS {report.peak_rss / 2**20:.0f} MiB"
+        self.display.info(summary)
+        problems = report.errors + report.timeouts + report.disconnects
+        if problems:
+            self.display.warning(
+                f"{report.errors} runs with errors, {report.timeouts} timeouts, {report.disconnects} disconnects"
+            )
     
     async def cleanup(self):
         """Cleanup resources"""
@@ -185,6 +355,23 @@ class CommandRunner:
         if self._container:
             await self._container.cleanup()
 
+async def _install_packages(display: Display, installer: InstallCoalescer, packages: List[str]):
+    """Install packages in one uv run and report each one"""
+    with display.progress(f"Installing {', '.join(packages)}...") as progress:
+        task = progress.add_task("Installing...", total=None)
+        
+        futures = [installer.request(package) for package in packages]
+        await installer.flush()
+        
+        progress.update(task, completed=True)
+    
+    for future in futures:
+        result = future.result()
+        if result.success:
+            display.success(f"Package {result.package} installed")
+        else:
+            display.error(f"Package {result.package} failed to install (exit code {result.returncode})")
+
 # Create global command runner
 runner = CommandRunner()
 
@@ -232,18 +419,10 @@ async def run_project(ctx: CommandContext):
 @runner.command("install")
 async def install_package(ctx: CommandContext):
     """Install a package"""
-    package = ctx.config.get("package")
-    if not package:
+    packages = ctx.config.get("packages") or ([ctx.config["package"]] if ctx.config.get("package") else [])
+    if not packages:
         raise ValueError("Package name required")
     
-    with ctx.display.progress(f"Installing {package}...") as progress:
-        task = progress.add_task("Installing...", total=None)
-        
-        await ctx.container.terminal.execute(
-            ["uv", "pip", "install", package],
-            f"install_{package}"
-        )
-        
-        progress.update(task, completed=True)
-    
-    ctx.display.success(f"Package {package} installed") 
\ No newline at end of file
+    uv = UVManager(ctx.container.terminal, ctx.project_path, wheelhouse=ctx.container.wheelhouse)
+    installer = InstallCoalescer(uv, window=None)
+    await _install_packages(ctx.display, installer, packages) 
\ No newline at end of file
@@ -1,8 +1,9 @@
-from typing import Optional
+from typing import List, Optional
 from rich.console import Console
 from rich.theme import Theme
 from rich.progress import Progress, SpinnerColumn, TextColumn
 from rich.panel import Panel
+from rich.table import Table
 from rich.syntax import Syntax
 from rich.traceback import install
 
@@ -58,6 +59,13 @@ class Display:
         """Display content in a panel"""
         self.console.print(Panel(content, title=title))
     
+    def table(self, columns: List[str], rows: List[List[str]], title: Optional[str] = None):
+        """Display rows in a table"""
+        table = Table(*columns, title=title)
+        for row in rows:
+            table.add_row(*row)
+        self.console.print(table)
+    
     def progress(self, message: str) -> Progress:
         """Create and return a progress context"""
         if self._progress:
@@ -1,9 +1,18 @@
 import click
 import asyncio
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Tuple
 
 from .commands import runner
+from ..core.constants import (
+    DEFAULT_PORT,
+    HOST_MAX_LIVE_SERVERS,
+    HOST_IDLE_TIMEOUT,
+    PROFILE_RERUN_TIMEOUT,
+    LOAD_TEST_VIEWERS,
+    LOAD_TEST_DURATION,
+    LOAD_TEST_THINK_TIME,
+)
 from ..utils.logger import logger
 
 @click.group()
@@ -41,13 +50,65 @@ def run(port: int):
         asyncio.run(runner.cleanup())
 
 @cli.command()
-@click.argument("package")
-def install(package: str):
-    """Install a package"""
+@click.argument("workspaces", default="workspaces", type=click.Path(exists=True, file_okay=False, path_type=Path))
+@click.option("--port", default=DEFAULT_PORT, help="Port to serve all apps on")
+@click.option("--max-live", default=HOST_MAX_LIVE_SERVERS, help="Most Streamlit servers running at once")
+@click.option("--idle-timeout", default=HOST_IDLE_TIMEOUT, help="Seconds before an unused app is stopped")
+def host(workspaces: Path, port: int, max_live: int, idle_timeout: float):
+    """Serve every workspace's app behind one port, started on demand"""
+    try:
+        asyncio.run(runner.execute("host", workspaces, port=port, max_live=max_live, idle_timeout=idle_timeout))
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        logger.error(f"Failed to host workspaces: {str(e)}")
+        raise click.Abort()
+
+@cli.command()
+@click.option("--timeout", default=PROFILE_RERUN_TIMEOUT, help="Seconds one script run may take")
+def profile(timeout: float):
+    """Profile the app and its pages, rerun by rerun"""
+    try:
+        asyncio.run(runner.execute("profile", Path.cwd(), rerun_timeout=timeout))
+    except Exception as e:
+        logger.error(f"Failed to profile project: {str(e)}")
+        raise click.Abort()
+
+@cli.command("load-test")
+@click.option("--viewers", default=LOAD_TEST_VIEWERS, help="Concurrent synthetic viewers")
+@click.option("--duration", default=LOAD_TEST_DURATION, help="Seconds of load")
+@click.option("--think-time", default=LOAD_TEST_THINK_TIME, help="Mean seconds between a viewer's interactions")
+@click.option("--port", type=int, default=None, help="Test a server already running on this port")
+def load_test(viewers: int, duration: float, think_time: float, port: Optional[int]):
+    """Drive synthetic viewers against the app and report rerun latency"""
+    try:
+        asyncio.run(runner.execute(
+            "load-test", Path.cwd(), viewers=viewers, duration=duration, think_time=think_time, port=port
+        ))
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        logger.error(f"Load test failed: {str(e)}")
+        raise click.Abort()
+
+@cli.command()
+@click.argument("files", nargs=-1, type=click.Path(exists=True, dir_okay=False, path_type=Path))
+def ingest(files: Tuple[Path, ...]):
+    """Convert CSV/JSON files (default: everything in data/) to Parquet datasets"""
+    try:
+        asyncio.run(runner.execute("ingest", Path.cwd(), files=list(files)))
+    except Exception as e:
+        logger.error(f"Failed to ingest data: {str(e)}")
+        raise click.Abort()
+
+@cli.command()
+@click.argument("packages", nargs=-1, required=True)
+def install(packages: Tuple[str, ...]):
+    """Install one or more packages"""
     project_path = Path.cwd()
     
     try:
-        asyncio.run(runner.execute("install", project_path, package=package))
+        asyncio.run(runner.execute("install", project_path, packages=list(packages)))
     except Exception as e:
         logger.error(f"Failed to install package: {str(e)}")
         raise click.Abort()
@@ -3,7 +3,7 @@ Core constants for the streamlit-builder project.
 All constants should be defined here to maintain a single source of truth.
 """
 from pathlib import Path
-from enum import Enum, auto
+from enum import Enum, IntEnum, auto
 
 # Project Structure
 PROJECT_ROOT = Path(__file__).parent.parent
@@ -15,15 +15,127 @@ DEFAULT_PYTHON_VERSION = "3.12"
 DEFAULT_UV_VERSION = "0.5.3"
 ENV_DIR = ".venv"
 REQUIREMENTS_FILE = "requirements.txt"
+LOCK_FILE = "requirements.lock"  # Snapshot of the applied requirements, `uv pip sync` compatible
+INSTALL_COALESCE_WINDOW = 0.5  # Seconds to collect package requests into one resolver run
+VENV_POOL_DIR = Path.home() / ".cache" / "streamlit_builder" / "venvs"  # Host-wide pre-built environments
+WHEELHOUSE_DIR = Path.home() / ".cache" / "streamlit_builder" / "wheelhouse"  # Wheels for offline installs
+VENV_POOL_QUOTA_BYTES = 5 * 1024 ** 3  # Least recently used environments are evicted beyond this
+
+# Terminal
+OUTPUT_CHUNK_SIZE = 64 * 1024  # Bytes read from a process pipe at a time
+OUTPUT_MAX_LINE_LENGTH = 64 * 1024  # Longer unterminated lines are split
+OUTPUT_BUFFER_MAX_LINES = 5000  # Scrollback kept per process
+OUTPUT_BUFFER_MAX_BYTES = 1024 * 1024
+OUTPUT_BUFFER_MAX_PROCESSES = 64  # Finished processes whose scrollback is kept
+OUTPUT_DISPATCH_QUEUE_SIZE = 32  # Pending handler batches before reads are paused
+SUBSCRIBER_QUEUE_SIZE = 256  # Pending batches per output subscriber before the oldest are dropped
+MEMO_BYPASS_ENV = "STREAMLIT_BUILDER_NO_MEMO"  # Set to 1 to always re-run memoized commands
+SHELL_PROCESS_NAME = "shell"  # The persistent shell, as the ProcessManager knows it
+
+# Process accounting
+RESOURCE_SAMPLE_INTERVAL = 2.0  # Seconds between samples of monitored process trees
+PROC_SCAN_MAX_AGE = 0.5  # Seconds one scan of /proc is shared by every sampler in a tick
+PROCESS_STOP_TIMEOUT = 5.0  # Seconds between SIGTERM and SIGKILL on shutdown
+PROCESS_KILL_TIMEOUT = 2.0  # Seconds to wait for a process to be reaped after SIGKILL
+
+# Command classes for deadline policies
+class CommandClass(str, Enum):
+    INSTALL = "install"
+    RUN = "run"
+    SERVER = "server"
+
+# Default deadline in seconds per command class; None means no deadline
+DEFAULT_COMMAND_TIMEOUTS = {
+    CommandClass.INSTALL: 600.0,
+    CommandClass.RUN: 120.0,
+    CommandClass.SERVER: None,  # Long-running by design
+}
+
+# Bytecode precompilation, most urgent first
+class CompilePriority(IntEnum):
+    ENTRY = 0  # App entry point and the project modules it imports
+    APP = 1  # Other project modules
+    IMPORTED = 2  # Installed packages the entry point imports
+    PACKAGES = 3  # Everything else installed
+
+BYTECODE_COMPILE_TIMEOUT = 600.0  # Seconds allowed for one compileall batch
+BYTECODE_COMPILE_WORKERS = 4  # Most compileall -j workers, so compiling leaves cores for the app
+DEFAULT_APP_FILE = "app.py"
+APP_ENTRY_FILES = (DEFAULT_APP_FILE, "Home.py", "streamlit_app.py")  # Entry point names, in order of preference
 
 # Server Configuration
 DEFAULT_PORT = 8501  # Default Streamlit port
+STREAMLIT_CONFIG_FILE = Path(".streamlit") / "config.toml"  # Only read at server start
+STREAMLIT_START_TIMEOUT = 30.0  # Seconds for a started server to become ready
+STREAMLIT_READY_PATTERN = r"You can now view your Streamlit app"  # Startup banner on stdout
+HEALTH_POLL_INITIAL = 0.02  # First delay between health checks; doubles up to HEALTH_POLL_MAX
+HEALTH_POLL_MAX = 0.25
+PROXY_DRAIN_TIMEOUT = 10.0  # Seconds an old server gets to finish requests after a blue/green switch
+RELOAD_QUIET_PERIOD = 0.5  # Seconds without file changes before a batch of changes is acted on
+
+# Fork server: interpreters with Streamlit and common data libraries already imported
+FORK_POOL_SIZE = 2  # Idle children kept forked ahead of time
+FORK_PRELOAD_MODULES = [
+    "streamlit.web.bootstrap",
+    "streamlit.runtime.scriptrunner",
+    "tornado.web",
+    "pandas",
+    "numpy",
+    "pyarrow",
+    "altair",
+    "plotly.express",
+]  # Imported if installed
+FORK_SERVER_START_TIMEOUT = 60.0  # Seconds for the fork server to import everything and fill its pool
+BUILDER_DIR = ".streamlit_builder"  # Per-workspace directory for logs and other generated files
+
+# File watching
+WATCH_DEBOUNCE = 100  # Milliseconds watchfiles gathers changes into one batch
+WATCH_IGNORE_DIRS = (
+    ENV_DIR, "__pycache__", BUILDER_DIR, ".git", ".hg", ".svn", "node_modules",
+    ".mypy_cache", ".pytest_cache", ".ruff_cache", ".ipynb_checkpoints",
+)  # Changes anywhere below these are dropped
+WATCH_IGNORE_PATTERNS = (
+    r"\.py[cod]$", r"\.sw.$", r"~$", r"^\.#", r"^\.DS_Store$", r"\.partial$",
+)  # Regexes matched against file and directory names
+
+# Profiling generated apps with AppTest
+PROFILE_RERUN_TIMEOUT = 30.0  # Seconds one script run may take before it counts as failed
+PROFILE_TIMEOUT = 600.0  # Seconds for a whole profiling subprocess
+PROFILE_MAX_INTERACTIONS = 10  # Widget interactions rerun per script
+PROFILE_REGRESSION_RATIO = 1.5  # A rerun this many times slower than last turn is a regression...
+PROFILE_REGRESSION_MIN_SECONDS = 0.05  # ...if it is also at least this much slower
+
+# Datasets converted to Parquet in each workspace
+DATASETS_DIR = "data"
+DATASET_CATALOG = "catalog.json"
+DATASET_SOURCE_SUFFIXES = (".csv", ".csv.gz", ".tsv", ".json", ".jsonl", ".ndjson")
+DATASET_BLOCK_SIZE = 16 * 2**20  # Bytes of CSV parsed at a time; types are inferred from the first block
+DATASET_ROW_GROUP_SIZE = 128 * 1024  # Rows per Parquet row group, the unit DuckDB and Arrow filters skip
+DATASET_PROMPT_MAX_COLUMNS = 30  # Columns described per dataset in the prompt
+
+# Remote datasets downloaded by generated apps, shared by every workspace on the host
+DATASET_CACHE_DIR = Path.home() / ".cache" / "streamlit_builder" / "datasets"
+DATASET_CACHE_MAX_BYTES = 2 * 2**30  # Least recently used files are evicted beyond this
+
+# Load testing running apps
+LOAD_TEST_VIEWERS = 10  # Concurrent synthetic viewers
+LOAD_TEST_DURATION = 30.0  # Seconds of load after all viewers connected
+LOAD_TEST_THINK_TIME = 1.0  # Mean seconds a viewer waits between interactions
+LOAD_TEST_RERUN_TIMEOUT = 30.0  # Seconds before a script run counts as timed out
+LOAD_TEST_SAMPLE_INTERVAL = 1.0  # Seconds between server CPU/RSS samples
+
+# Multi-app host
+HOST_PORT_RANGE = (8600, 8999)  # Ports handed to hosted Streamlit servers
+HOST_MAX_LIVE_SERVERS = 8  # Least recently used apps are stopped beyond this
+HOST_IDLE_TIMEOUT = 600.0  # Seconds without requests or open connections before an app is stopped
+HOST_REAP_INTERVAL = 30.0  # Seconds between idle checks
 
 # Claude API Configuration
 MAX_TOKENS = 4096
 DEFAULT_TEMPERATURE = 0.7
 CLAUDE_MODEL_VERSION = "claude-3-5-sonnet-20241022"
 MODEL_NAME = CLAUDE_MODEL_VERSION
+PERF_LINT_FOLLOWUP_TURNS = 1  # Follow-up turns asking the model to fix performance findings per prompt
 
 # Message Roles
 class MessageRole(str, Enum):
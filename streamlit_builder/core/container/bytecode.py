@@ -0,0 +1,178 @@
+import ast
+import asyncio
+import heapq
+import itertools
+import os
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from ...utils.logger import logger
+from ...utils.metrics import metrics
+from ..constants import BYTECODE_COMPILE_TIMEOUT, BYTECODE_COMPILE_WORKERS, CompilePriority
+from .terminal import Terminal
+
+def imported_modules(path: Path) -> Set[str]:
+    """Top-level names of the modules a Python file imports"""
+    try:
+        tree = ast.parse(path.read_text(), str(path))
+    except (OSError, SyntaxError, ValueError):
+        return set()
+    
+    modules = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            modules.update(alias.name.split(".")[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and node.level == 0:
+            modules.add(node.module.split(".")[0])
+    return modules
+
+class BytecodeCompiler:
+    """Compile Python files to bytecode in the background, most urgent first
+    
+    Paths are queued with a CompilePriority and compiled in batches of equal priority
+    by the virtual environment's interpreter, so the .pyc files match the Python that
+    runs the app. compileall spreads each batch over a small pool of worker processes.
+    A submission more urgent than every running batch gets a batch of its own right
+    away instead of queueing behind, say, all of site-packages.
+    
+    Batches run as background processes of their own, never in the terminal's
+    persistent shell, so they don't hold up foreground commands.
+    """
+    
+    def __init__(self, terminal: Terminal, venv_path: Path, workers: Optional[int] = None):
+        self.terminal = terminal
+        self.venv_path = venv_path
+        self.workers = workers or min(BYTECODE_COMPILE_WORKERS, os.cpu_count() or 1)  # compileall -j
+        self._queue: List[Tuple[CompilePriority, int, Path]] = []  # Heap
+        self._pending: Dict[Path, CompilePriority] = {}
+        self._running: List[CompilePriority] = []  # Priorities of the batches compiling now
+        self._order = itertools.count()  # Keeps equal priorities first in, first out
+        self._changed = asyncio.Condition()
+        self._workers: Set[asyncio.Task] = set()
+        self.compiled_batches = 0
+    
+    @property
+    def python(self) -> str:
+        venv_python = self.venv_path / "bin" / "python"
+        return str(venv_python) if venv_python.exists() else sys.executable
+    
+    @property
+    def is_idle(self) -> bool:
+        return not self._pending and not self._running
+    
+    def site_packages(self) -> List[Path]:
+        return sorted(self.venv_path.glob("lib/python*/site-packages"))
+    
+    def submit(self, paths: Iterable[Path], priority: CompilePriority):
+        """Queue files or directories for compilation"""
+        queued_any = False
+        for path in paths:
+            queued = self._pending.get(path)
+            if queued is not None and queued <= priority:
+                continue
+            self._pending[path] = priority
+            heapq.heappush(self._queue, (priority, next(self._order), path))
+            queued_any = True
+        
+        active = [worker for worker in self._workers if not worker.done()]
+        if queued_any and (not active or self._running and all(running > priority for running in self._running)):
+            worker = asyncio.create_task(self._run())
+            self._workers.add(worker)
+            worker.add_done_callback(self._workers.discard)
+    
+    def submit_app(self, entry: Path):
+        """Queue an app entry point and its imports ahead of everything else
+        
+        Project modules it imports share its priority; installed packages it imports go
+        ahead of the rest of site-packages.
+        """
+        project = entry.parent
+        local, installed = [entry], []
+        for module in imported_modules(entry):
+            candidates = [project / f"{module}.py", project / module]
+            found = [path for path in candidates if path.exists()]
+            if found:
+                local.extend(found)
+            else:
+                installed.extend(self._installed(module))
+        self.submit(local, CompilePriority.ENTRY)
+        self.submit(installed, CompilePriority.IMPORTED)
+    
+    def submit_packages(self, entry: Optional[Path] = None):
+        """Queue the virtual environment's packages, those the entry point imports first"""
+        if entry and entry.exists():
+            self.submit([p for m in imported_modules(entry) for p in self._installed(m)], CompilePriority.IMPORTED)
+        self.submit(self.site_packages(), CompilePriority.PACKAGES)
+    
+    def _installed(self, module: str) -> List[Path]:
+        """Locate an importable module in site-packages"""
+        found = []
+        for site_packages in self.site_packages():
+            found.extend(p for p in (site_packages / module, site_packages / f"{module}.py") if p.exists())
+        return found
+    
+    async def _run(self):
+        """Compile queued paths until the queue is empty"""
+        while self._queue:
+            if self._running and self._queue[0][0] >= min(self._running):
+                break  # Leave it to the worker compiling that priority
+            priority, _, path = heapq.heappop(self._queue)
+            if self._pending.get(path) != priority:
+                continue  # Superseded by a more urgent submission
+            batch = [path]
+            while self._queue and self._queue[0][0] == priority:
+                _, _, other = heapq.heappop(self._queue)
+                if self._pending.get(other) == priority:
+                    batch.append(other)
+            
+            for queued in batch:
+                self._pending.pop(queued, None)
+            self._running.append(priority)
+            try:
+                await self._compile(batch, priority)
+            finally:
+                self._running.remove(priority)
+                async with self._changed:
+                    self._changed.notify_all()
+    
+    async def _compile(self, paths: List[Path], priority: CompilePriority):
+        command = [self.python, "-m", "compileall", "-q", "-j", str(self.workers), *map(str, paths)]
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        try:
+            handle = await self.terminal.start(command, f"bytecode_{priority.name.lower()}", timeout=BYTECODE_COMPILE_TIMEOUT)
+            returncode = await handle.wait()
+        except Exception as e:
+            logger.warning(f"Bytecode compilation failed: {str(e)}")
+            return
+        if self.terminal.process_manager.timed_out(handle.process):
+            logger.warning(f"Bytecode compilation of {len(paths)} {priority.name.lower()} paths timed out")
+            return
+        
+        elapsed = loop.time() - start
+        metrics.record(f"bytecode.{priority.name.lower()}", elapsed)
+        self.compiled_batches += 1
+        if returncode != 0:
+            # Usually a syntax error in one file; the rest are still compiled
+            logger.debug(f"compileall exited with {returncode} for {len(paths)} paths")
+        logger.debug(f"Compiled {len(paths)} {priority.name.lower()} paths in {elapsed:.2f}s")
+    
+    async def wait(self, priority: CompilePriority = CompilePriority.PACKAGES):
+        """Wait until nothing at or above the given urgency is queued or compiling"""
+        def done() -> bool:
+            urgent = [p for p in self._pending.values() if p <= priority]
+            return not urgent and all(running > priority for running in self._running)
+        
+        async with self._changed:
+            await self._changed.wait_for(done)
+    
+    async def close(self):
+        """Stop compiling; whatever wasn't compiled yet is compiled on import as usual"""
+        for worker in list(self._workers):
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._queue.clear()
+        self._pending.clear()
+        async with self._changed:
+            self._changed.notify_all()
\ No newline at end of file
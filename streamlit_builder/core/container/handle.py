@@ -0,0 +1,103 @@
+import asyncio
+import re
+from contextlib import aclosing
+from typing import AsyncIterator, List, Optional, Pattern, Union
+
+from ..constants import SUBSCRIBER_QUEUE_SIZE, PROCESS_STOP_TIMEOUT
+from .output import OutputBuffer
+
+class ProcessExitedError(RuntimeError):
+    """Raised when a process exits while something is still waiting on its output"""
+
+class ProcessHandle:
+    """Handle to a process started through the terminal"""
+    
+    def __init__(self, name: str, process: asyncio.subprocess.Process, buffer: OutputBuffer):
+        self.name = name
+        self.process = process
+        self.buffer = buffer
+        self.dropped_batches = 0
+        self._subscribers: List[asyncio.Queue] = []
+        self._output_task: Optional[asyncio.Task] = None
+        self._output_closed = False
+    
+    @property
+    def pid(self) -> int:
+        return self.process.pid
+    
+    @property
+    def returncode(self) -> Optional[int]:
+        return self.process.returncode
+    
+    def send_signal(self, sig: int):
+        """Send a signal to the process"""
+        self.process.send_signal(sig)
+    
+    async def terminate(self, timeout: float = PROCESS_STOP_TIMEOUT) -> int:
+        """Stop the process and its process group, escalating to SIGKILL after timeout"""
+        from .process import terminate_process_group
+        
+        returncode = await terminate_process_group(self.process, timeout)
+        if self._output_task:
+            await self._output_task
+        return returncode
+    
+    async def wait(self) -> int:
+        """Wait until the process exits and all of its output is consumed"""
+        if self._output_task:
+            await self._output_task
+        return await self.process.wait()
+    
+    def _publish(self, lines: List[str]):
+        """Fan a batch of lines out to subscribers without blocking the reader"""
+        for queue in self._subscribers:
+            # A subscriber that falls behind loses its oldest batches; the ring buffer still has them
+            if queue.full():
+                queue.get_nowait()
+                self.dropped_batches += 1
+            queue.put_nowait(lines)
+    
+    def _close_output(self):
+        """Signal end of output to all subscribers"""
+        self._output_closed = True
+        self._publish(None)
+    
+    async def subscribe(self, replay: bool = False) -> AsyncIterator[str]:
+        """Tail process output line by line until the process closes its pipes
+        
+        With replay, lines already in the output buffer are yielded first.
+        """
+        backlog = self.buffer.lines() if replay else []
+        if self._output_closed:
+            for line in backlog:
+                yield line
+            return
+        
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.append(queue)
+        try:
+            for line in backlog:
+                yield line
+            while True:
+                lines = await queue.get()
+                if lines is None:
+                    return
+                for line in lines:
+                    yield line
+        finally:
+            self._subscribers.remove(queue)
+    
+    async def wait_for(self, pattern: Union[str, Pattern[str]], timeout: Optional[float] = None) -> str:
+        """Wait for an output line matching a pattern and return it"""
+        regex = re.compile(pattern) if isinstance(pattern, str) else pattern
+        
+        async def _match() -> str:
+            async with aclosing(self.subscribe(replay=True)) as lines:
+                async for line in lines:
+                    if regex.search(line):
+                        return line
+            raise ProcessExitedError(
+                f"Process {self.name} exited with {self.process.returncode} before printing {regex.pattern!r}"
+            )
+        
+        return await asyncio.wait_for(_match(), timeout)
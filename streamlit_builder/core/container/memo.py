@@ -0,0 +1,130 @@
+import hashlib
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from ..constants import MEMO_BYPASS_ENV
+
+# Commands that converge the environment to a fixed state, so rerunning them
+# with unchanged inputs against the environment they produced is a no-op
+IDEMPOTENT_COMMANDS: List[Tuple[str, ...]] = [
+    ("uv", "pip", "install"),
+    ("uv", "pip", "sync"),
+    ("uv", "pip", "compile"),
+    ("uv", "venv"),
+    ("pip", "install"),
+    ("python", "-m", "pip", "install"),
+]
+
+# Files that describe what `pip install -e .` / `pip install .` installs
+_PROJECT_FILES = ("pyproject.toml", "setup.py", "setup.cfg", "requirements.txt")
+
+@dataclass
+class CachedRun:
+    """Result of a memoized command run"""
+    fingerprint: str
+    returncode: int
+    output: List[str]
+    duration: float
+
+class CommandCache:
+    """Skip re-running idempotent commands whose inputs and environment are unchanged
+    
+    A run is recorded with the fingerprint of its inputs and of the environment
+    it left behind. A later identical command is skipped when the current
+    fingerprint matches, i.e. nothing it depends on has changed since.
+    """
+    
+    def __init__(self, cwd: Path, venv_path: Optional[Path] = None):
+        self.cwd = cwd
+        self.venv_path = venv_path
+        self.idempotent: List[Tuple[str, ...]] = list(IDEMPOTENT_COMMANDS)
+        self._runs: Dict[Tuple[str, ...], CachedRun] = {}
+        self.hits = 0
+        self.misses = 0
+        self.time_saved = 0.0
+    
+    @property
+    def bypassed(self) -> bool:
+        """Memoization is disabled through the environment"""
+        return os.environ.get(MEMO_BYPASS_ENV, "").lower() in ("1", "true", "yes")
+    
+    def declare_idempotent(self, prefix: Sequence[str]):
+        """Declare commands starting with prefix as safe to memoize"""
+        self.idempotent.append(tuple(prefix))
+    
+    def is_idempotent(self, command: Sequence[str]) -> bool:
+        return any(tuple(command[:len(prefix)]) == prefix for prefix in self.idempotent)
+    
+    def input_files(self, command: Sequence[str]) -> List[Path]:
+        """Find files a command reads, from its arguments"""
+        files: List[Path] = []
+        for previous, arg in zip(command, command[1:]):
+            if arg.startswith("-") and "=" in arg:
+                arg = arg.split("=", 1)[1]  # --requirement=requirements.txt
+            path = self.cwd / arg
+            if path.is_file():
+                files.append(path)
+            elif path.is_dir() and (arg in (".", "./") or previous in ("-e", "--editable")):
+                files.extend(p for p in (path / name for name in _PROJECT_FILES) if p.is_file())
+        return sorted(set(files))
+    
+    def environment_state(self) -> str:
+        """Fingerprint the installed distributions of the virtual environment"""
+        digest = hashlib.sha256()
+        if not self.venv_path or not self.venv_path.exists():
+            return "no-venv"
+        
+        config = self.venv_path / "pyvenv.cfg"
+        if config.exists():
+            digest.update(config.read_bytes())
+        for site_packages in sorted(self.venv_path.glob("lib/python*/site-packages")):
+            # dist-info directory names carry both package names and versions
+            for entry in sorted(os.listdir(site_packages)):
+                if entry.endswith((".dist-info", ".egg-info", ".egg-link", ".pth")):
+                    digest.update(entry.encode())
+        return digest.hexdigest()
+    
+    def fingerprint(self, command: Sequence[str], env: Optional[Dict[str, str]] = None) -> str:
+        """Fingerprint a command, the files it reads and the environment"""
+        digest = hashlib.sha256()
+        digest.update("\0".join(command).encode())
+        if env:
+            digest.update(repr(sorted(env.items())).encode())
+        for path in self.input_files(command):
+            digest.update(str(path).encode())
+            digest.update(hashlib.sha256(path.read_bytes()).digest())
+        digest.update(self.environment_state().encode())
+        return digest.hexdigest()
+    
+    def lookup(self, command: Sequence[str], env: Optional[Dict[str, str]] = None) -> Optional[CachedRun]:
+        """Return the recorded run if the command would be a no-op now"""
+        run = self._runs.get(tuple(command))
+        if run and run.fingerprint == self.fingerprint(command, env):
+            self.hits += 1
+            self.time_saved += run.duration
+            return run
+        self.misses += 1
+        return None
+    
+    def store(
+        self,
+        command: Sequence[str],
+        returncode: int,
+        output: List[str],
+        duration: float,
+        env: Optional[Dict[str, str]] = None,
+    ):
+        """Record a finished run; failed runs are never replayed"""
+        if returncode != 0:
+            self._runs.pop(tuple(command), None)
+            return
+        self._runs[tuple(command)] = CachedRun(self.fingerprint(command, env), returncode, output, duration)
+    
+    def report(self) -> str:
+        return f"{self.hits} commands skipped, {self.misses} run, {self.time_saved:.1f}s saved"
+    
+    def invalidate(self):
+        """Forget all recorded runs"""
+        self._runs.clear()
@@ -0,0 +1,75 @@
+import codecs
+from collections import deque
+from typing import Deque, List, Optional
+
+from ..constants import OUTPUT_BUFFER_MAX_BYTES, OUTPUT_BUFFER_MAX_LINES, OUTPUT_MAX_LINE_LENGTH
+
+class LineDecoder:
+    """Incrementally decode byte chunks into complete text lines"""
+    
+    def __init__(self, encoding: str = "utf-8", max_line_length: int = OUTPUT_MAX_LINE_LENGTH):
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        self._pending = ""
+        self.max_line_length = max_line_length
+    
+    def feed(self, chunk: bytes) -> List[str]:
+        """Decode a chunk and return the lines it completed"""
+        text = self._pending + self._decoder.decode(chunk)
+        lines = text.split("\n")
+        self._pending = lines.pop()
+        
+        # Don't let a single unterminated line grow without bound
+        if len(self._pending) >= self.max_line_length:
+            lines.append(self._pending)
+            self._pending = ""
+        
+        return [line.rstrip() for line in lines]
+    
+    def flush(self) -> List[str]:
+        """Return any trailing partial line once the stream has ended"""
+        text = self._pending + self._decoder.decode(b"", final=True)
+        self._pending = ""
+        return [text.rstrip()] if text else []
+
+class OutputBuffer:
+    """Bounded ring buffer of process output lines"""
+    
+    def __init__(self, max_lines: int = OUTPUT_BUFFER_MAX_LINES, max_bytes: int = OUTPUT_BUFFER_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._lines: Deque[str] = deque(maxlen=max_lines)
+        self._size = 0
+        self.total_lines = 0
+        self.total_bytes = 0
+        self.dropped_lines = 0
+    
+    def extend(self, lines: List[str]):
+        """Append lines, evicting the oldest ones when over capacity"""
+        for line in lines:
+            if len(self._lines) == self._lines.maxlen:
+                self._evict()
+            self._lines.append(line)
+            self._size += len(line)
+            self.total_lines += 1
+            self.total_bytes += len(line) + 1
+        
+        while self._size > self.max_bytes and len(self._lines) > 1:
+            self._evict()
+    
+    def _evict(self):
+        self._size -= len(self._lines.popleft())
+        self.dropped_lines += 1
+    
+    def lines(self, last: Optional[int] = None) -> List[str]:
+        """Return buffered lines, optionally only the most recent ones"""
+        if last is None:
+            return list(self._lines)
+        if last <= 0:
+            return []
+        return list(self._lines)[-last:]
+    
+    def text(self) -> str:
+        """Return buffered output as a single string"""
+        return "\n".join(self._lines)
+    
+    def __len__(self) -> int:
+        return len(self._lines)
@@ -1,37 +1,159 @@
 import asyncio
+import os
 import signal
-from typing import Optional, Dict, List
+import weakref
+from dataclasses import dataclass
+from typing import Callable, Optional, Dict, List, Sequence
 from pathlib import Path
 
-from ...utils.logger import logger
+from ...utils.logger import logger, LogLevel
+from ...utils.metrics import metrics
+from ..constants import (
+    RESOURCE_SAMPLE_INTERVAL,
+    PROCESS_STOP_TIMEOUT,
+    PROCESS_KILL_TIMEOUT,
+    DEFAULT_COMMAND_TIMEOUTS,
+    CommandClass,
+)
+from .resources import BreachAction, ProcessStats, ResourceLimits, breached, proc_available, sample_tree, children_map
+
+@dataclass
+class TimeoutEvent:
+    """A command that was stopped because it ran past its deadline"""
+    process_name: str
+    command: List[str]
+    command_class: CommandClass
+    timeout: float
+
+class CommandTimeoutError(TimeoutError):
+    """Raised when a command is stopped for exceeding its deadline"""
+    
+    def __init__(self, event: TimeoutEvent):
+        super().__init__(f"Command {' '.join(event.command)} timed out after {event.timeout:.0f}s")
+        self.event = event
+
+_SERVER_COMMANDS = [("streamlit", "run"), ("python", "-m", "streamlit", "run"), ("python", "-m", "http.server")]
+_INSTALL_COMMANDS = [("uv", "pip"), ("uv", "venv"), ("uv", "add"), ("uv", "sync"), ("pip",), ("python", "-m", "pip")]
+
+def classify_command(command: Sequence[str]) -> CommandClass:
+    """Work out which deadline policy applies to a command"""
+    # Treat `.venv/bin/streamlit` like `streamlit` and `python3.12` like `python`
+    normalized = [Path(command[0]).name.rstrip("0123456789.")] + list(command[1:]) if command else []
+    for prefixes, command_class in ((_SERVER_COMMANDS, CommandClass.SERVER), (_INSTALL_COMMANDS, CommandClass.INSTALL)):
+        if any(tuple(normalized[:len(prefix)]) == prefix for prefix in prefixes):
+            return command_class
+    return CommandClass.RUN
+
+def _signal_group(process: asyncio.subprocess.Process, sig: int) -> bool:
+    """Signal a process's whole group when it leads one, else just the process
+    
+    Returns False if nothing was left to signal.
+    """
+    try:
+        if os.getpgid(process.pid) == process.pid:
+            os.killpg(process.pid, sig)
+        else:
+            process.send_signal(sig)
+        return True
+    except ProcessLookupError:
+        # Leader is gone, but members of its group may still be alive
+        try:
+            os.killpg(process.pid, sig)
+            return True
+        except (ProcessLookupError, PermissionError):
+            return False
+
+async def terminate_process_group(
+    process: asyncio.subprocess.Process,
+    timeout: float = PROCESS_STOP_TIMEOUT,
+) -> int:
+    """SIGTERM a process group, escalating to SIGKILL after a deadline
+    
+    Group members still alive once the leader has exited are killed too, so
+    grandchildren such as Streamlit workers are not orphaned. A leader that was
+    already reaped is left alone: its pid, and so its group id, may since belong to
+    an unrelated session.
+    """
+    if process.returncode is not None:
+        return process.returncode
+    
+    _signal_group(process, signal.SIGTERM)
+    try:
+        await asyncio.wait_for(process.wait(), timeout)
+    except asyncio.TimeoutError:
+        logger.warning(f"Process {process.pid} ignored SIGTERM for {timeout}s, sending SIGKILL")
+    
+    # Anything left in the group gets no second chance
+    _signal_group(process, signal.SIGKILL)
+    return await asyncio.wait_for(process.wait(), PROCESS_KILL_TIMEOUT)
 
 class ProcessManager:
     """Manages running processes"""
     
-    def __init__(self, cwd: Optional[Path] = None):
+    def __init__(
+        self,
+        cwd: Optional[Path] = None,
+        limits: Optional[ResourceLimits] = None,
+        sample_interval: float = RESOURCE_SAMPLE_INTERVAL,
+        timeouts: Optional[Dict[CommandClass, Optional[float]]] = None,
+    ):
         self._processes: Dict[str, asyncio.subprocess.Process] = {}
         self.cwd = cwd
+        self.timeouts: Dict[CommandClass, Optional[float]] = {**DEFAULT_COMMAND_TIMEOUTS, **(timeouts or {})}
+        self.timeout_handlers: List[Callable[[TimeoutEvent], None]] = []
+        self._deadlines: Dict[asyncio.subprocess.Process, asyncio.Task] = {}
+        # Weak, so the event outlives removal of the process until its last handle is gone
+        self._expired: "weakref.WeakKeyDictionary[asyncio.subprocess.Process, TimeoutEvent]" = weakref.WeakKeyDictionary()
+        self._reapers: set = set()
+        self.limits = limits
+        self.sample_interval = sample_interval
+        self._limits: Dict[str, ResourceLimits] = {}
+        self._stats: Dict[str, ProcessStats] = {}
+        self._throttled: set = set()
+        self._monitor_task: Optional[asyncio.Task] = None
     
     def add_process(self, name: str, process: asyncio.subprocess.Process):
-        """Add a process to manage"""
+        """Add a process to manage until it has exited and been reaped"""
+        if self._processes.get(name) is process:
+            return
         self._processes[name] = process
+        reaper = asyncio.create_task(self._forget_when_reaped(name, process))
+        self._reapers.add(reaper)
+        reaper.add_done_callback(self._reapers.discard)
+    
+    async def _forget_when_reaped(self, name: str, process: asyncio.subprocess.Process):
+        """Drop a finished process, so nothing signals its pid once the kernel reuses it"""
+        await process.wait()
+        if self._processes.get(name) is process:
+            self.remove_process(name)
+    
+    def watch(self, name: str, process: asyncio.subprocess.Process, limits: Optional[ResourceLimits] = None):
+        """Manage a process started elsewhere, monitoring its tree against the limits"""
+        limits = limits or self.limits
+        self.add_process(name, process)
+        if limits and limits.is_monitored:
+            self._limits[name] = limits
+            self._ensure_monitor()
     
     def remove_process(self, name: str):
         """Remove a process from management"""
         if name in self._processes:
-            del self._processes[name]
+            process = self._processes.pop(name)
+            deadline = self._deadlines.pop(process, None)
+            if deadline and not deadline.done():
+                deadline.cancel()
+        self._limits.pop(name, None)
+        self._stats.pop(name, None)
+        self._throttled.discard(name)
+    
+    def _stop_monitor(self):
+        if self._monitor_task and not self._monitor_task.done():
+            self._monitor_task.cancel()
+        self._monitor_task = None
     
-    async def cleanup(self):
+    async def cleanup(self, timeout: float = PROCESS_STOP_TIMEOUT) -> float:
         """Clean up all managed processes"""
-        for name, process in list(self._processes.items()):
-            try:
-                process.send_signal(signal.SIGTERM)
-                await process.wait()
-                logger.debug(f"Process {name} terminated")
-            except Exception as e:
-                logger.error(f"Error terminating process {name}: {str(e)}")
-            finally:
-                self.remove_process(name)
+        return await self.stop_all(timeout)
 
     async def run(
         self,
@@ -39,47 +161,175 @@ class ProcessManager:
         process_name: str,
         env: Optional[Dict[str, str]] = None,
         shell: bool = False,
+        limits: Optional[ResourceLimits] = None,
+        timeout: Optional[float] = None,
     ) -> asyncio.subprocess.Process:
-        """Run a command asynchronously"""
+        """Run a command asynchronously
+        
+        limits overrides the manager-wide ResourceLimits for this process. timeout overrides
+        the deadline policy of the command's class; pass float("inf") for no deadline. A process
+        past its deadline is stopped with its whole process group.
+        """
+        limits = limits or self.limits
         try:
             process = await asyncio.create_subprocess_exec(
                 *command,
                 cwd=str(self.cwd) if self.cwd else None,
                 env=env,
                 stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
+                stderr=asyncio.subprocess.PIPE,
+                preexec_fn=limits.preexec_fn() if limits else None,
+                start_new_session=True  # Own process group, so shutdown reaches grandchildren
             )
             
-            self.add_process(process_name, process)
+            self.watch(process_name, process, limits)
             logger.debug(f"Started process {process_name}: {' '.join(command)}")
             
+            command_class = classify_command(command)
+            deadline = timeout if timeout is not None else self.timeouts.get(command_class)
+            if deadline is not None and deadline != float("inf"):
+                event = TimeoutEvent(process_name, list(command), command_class, deadline)
+                self._deadlines[process] = asyncio.create_task(self._enforce_deadline(process, event))
+            
             return process
             
         except Exception as e:
             logger.error(f"Failed to run command {' '.join(command)}: {str(e)}")
             raise
     
-    async def stop(self, process_name: str):
-        """Stop a running process"""
+    async def _enforce_deadline(self, process: asyncio.subprocess.Process, event: TimeoutEvent):
+        """Stop a process tree once it runs past its deadline"""
+        try:
+            await asyncio.wait_for(process.wait(), event.timeout)
+            return
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            self._deadlines.pop(process, None)
+        
+        self._expired[process] = event
+        metrics.increment(f"process.timeouts.{event.command_class.value}")
+        logger.warning(f"Process {event.process_name} exceeded its {event.timeout:.0f}s deadline, stopping it")
+        await terminate_process_group(process)
+        self.notify_timeout(event)
+    
+    def notify_timeout(self, event: TimeoutEvent):
+        """Call every timeout handler; one that fails doesn't keep the others from running"""
+        for handler in self.timeout_handlers:
+            try:
+                handler(event)
+            except Exception as e:
+                logger.error(f"Timeout handler error: {str(e)}")
+    
+    def timed_out(self, process: asyncio.subprocess.Process) -> Optional[TimeoutEvent]:
+        """Return the timeout event if a process was stopped for exceeding its deadline"""
+        return self._expired.get(process)
+    
+    async def stop(self, process_name: str, timeout: float = PROCESS_STOP_TIMEOUT):
+        """Stop a running process and its process group"""
         process = self._processes.get(process_name)
         if process:
             try:
-                process.send_signal(signal.SIGTERM)
-                await process.wait()
+                await terminate_process_group(process, timeout)
                 logger.debug(f"Stopped process: {process_name}")
             except Exception as e:
                 logger.error(f"Failed to stop process {process_name}: {str(e)}")
             finally:
                 self.remove_process(process_name)
     
-    async def stop_all(self):
-        """Stop all running processes"""
-        for process_name in list(self._processes.keys()):
-            await self.stop(process_name)
+    async def stop_all(self, timeout: float = PROCESS_STOP_TIMEOUT) -> float:
+        """Stop all running processes concurrently and return the teardown time in seconds
+        
+        Bounded by timeout plus the SIGKILL grace period, however the processes behave.
+        """
+        self._stop_monitor()
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        
+        names = list(self._processes.keys())
+        await asyncio.gather(*(self.stop(name, timeout) for name in names))
+        
+        elapsed = loop.time() - start
+        metrics.record("process.teardown", elapsed)
+        if names:
+            logger.debug(f"Stopped {len(names)} processes in {elapsed:.2f}s")
+        return elapsed
     
     async def is_running(self, process_name: str) -> bool:
         """Check if a process is running"""
         process = self._processes.get(process_name)
         if not process:
             return False
-        return process.returncode is None 
\ No newline at end of file
+        return process.returncode is None 
+    
+    def get_stats(self, process_name: str) -> Optional[ProcessStats]:
+        """Sample CPU, memory and open FDs of a managed process and its descendants"""
+        return self.stats([process_name]).get(process_name)
+    
+    def stats(self, process_names: Optional[List[str]] = None) -> Dict[str, ProcessStats]:
+        """Sample resource usage of managed process trees, all of them by default"""
+        if not proc_available():
+            return {}
+        
+        children = children_map()
+        result: Dict[str, ProcessStats] = {}
+        for name in process_names if process_names is not None else list(self._processes):
+            process = self._processes.get(name)
+            if not process or process.returncode is not None:
+                continue
+            sample = sample_tree(process.pid, self._stats.get(name), children)
+            if sample:
+                self._stats[name] = sample
+                result[name] = sample
+        return result
+    
+    def _ensure_monitor(self):
+        """Start the resource monitor if it isn't running"""
+        if not proc_available():
+            logger.warning("Resource monitoring needs /proc; limits will only be enforced through rlimits")
+            return
+        if self._monitor_task is None or self._monitor_task.done():
+            self._monitor_task = asyncio.create_task(self._monitor())
+    
+    async def _monitor(self):
+        """Periodically sample monitored process trees and act on limit breaches"""
+        while self._limits:
+            await asyncio.sleep(self.sample_interval)
+            
+            for name, stats in self.stats(list(self._limits)).items():
+                if logger.is_enabled_for(LogLevel.DEBUG):
+                    logger.debug(f"Process {name}: {stats.summary()}")
+                
+                limits = self._limits.get(name)
+                reason = breached(stats, limits) if limits else None
+                if reason:
+                    self._handle_breach(name, stats, limits, reason)
+            
+            # Forget processes that exited on their own
+            for name in list(self._limits):
+                process = self._processes.get(name)
+                if not process or process.returncode is not None:
+                    self._limits.pop(name, None)
+    
+    def _handle_breach(self, name: str, stats: ProcessStats, limits: ResourceLimits, reason: str):
+        """Apply the configured breach action to a process tree"""
+        if limits.on_breach == BreachAction.KILL:
+            logger.warning(f"Process {name} exceeded limits ({reason}), killing it")
+            for pid in reversed(stats.pids):
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+            self._limits.pop(name, None)
+        elif limits.on_breach == BreachAction.THROTTLE:
+            if name in self._throttled:
+                return
+            logger.warning(f"Process {name} exceeded limits ({reason}), lowering its priority")
+            for pid in stats.pids:
+                try:
+                    os.setpriority(os.PRIO_PROCESS, pid, 19)
+                except (ProcessLookupError, PermissionError):
+                    pass
+            self._throttled.add(name)
+        else:
+            logger.warning(f"Process {name} exceeded limits ({reason})")
\ No newline at end of file
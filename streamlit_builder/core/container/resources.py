@@ -0,0 +1,159 @@
+import os
+import resource
+import time
+from dataclasses import dataclass, field
+from enum import Enum
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ..constants import PROC_SCAN_MAX_AGE
+
+PROC_ROOT = Path("/proc")
+_CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+class BreachAction(str, Enum):
+    """What to do when a monitored process tree exceeds its limits"""
+    LOG = "log"
+    THROTTLE = "throttle"  # Drop the tree to the lowest CPU priority
+    KILL = "kill"
+
+@dataclass
+class ResourceLimits:
+    """Resource caps for managed processes
+    
+    cpu_seconds and memory_bytes are applied per process with setrlimit at spawn and
+    enforced by the kernel. max_rss_bytes and max_cpu_percent are checked against the
+    whole process tree by the ProcessManager monitor, which then applies on_breach.
+    """
+    cpu_seconds: Optional[int] = None
+    memory_bytes: Optional[int] = None
+    max_rss_bytes: Optional[int] = None
+    max_cpu_percent: Optional[float] = None
+    on_breach: BreachAction = BreachAction.LOG
+    
+    @property
+    def is_monitored(self) -> bool:
+        return self.max_rss_bytes is not None or self.max_cpu_percent is not None
+    
+    def preexec_fn(self) -> Optional[Callable[[], None]]:
+        """Return a function that applies the rlimits in the child before exec"""
+        rlimits = []
+        if self.cpu_seconds is not None:
+            rlimits.append((resource.RLIMIT_CPU, self.cpu_seconds))
+        if self.memory_bytes is not None:
+            rlimits.append((resource.RLIMIT_AS, self.memory_bytes))
+        if not rlimits:
+            return None
+        
+        def apply():
+            for limit, value in rlimits:
+                resource.setrlimit(limit, (value, value))
+        
+        return apply
+
+@dataclass
+class ProcessStats:
+    """Resource usage of a process and all of its descendants"""
+    pid: int
+    pids: List[int] = field(default_factory=list)
+    cpu_seconds: float = 0.0
+    cpu_percent: float = 0.0
+    rss_bytes: int = 0
+    open_fds: int = 0
+    sampled_at: float = 0.0
+    
+    @property
+    def num_processes(self) -> int:
+        return len(self.pids)
+    
+    def summary(self) -> str:
+        return (
+            f"pids={self.num_processes} cpu={self.cpu_seconds:.2f}s ({self.cpu_percent:.0f}%) "
+            f"rss={self.rss_bytes / (1024 * 1024):.1f}MiB fds={self.open_fds}"
+        )
+
+def proc_available() -> bool:
+    """Check whether /proc based accounting works on this host"""
+    return (PROC_ROOT / "self" / "stat").exists()
+
+def _read_stat(pid: int) -> Optional[List[str]]:
+    """Return the /proc/<pid>/stat fields that follow the command name"""
+    try:
+        data = (PROC_ROOT / str(pid) / "stat").read_text()
+    except OSError:
+        return None
+    # The command name may itself contain spaces and parentheses
+    return data[data.rindex(")") + 2:].split()
+
+_scan: Tuple[float, Dict[int, List[int]]] = (float("-inf"), {})
+
+def children_map(max_age: float = PROC_SCAN_MAX_AGE) -> Dict[int, List[int]]:
+    """Map every pid on the host to its direct children
+    
+    Reading every /proc/<pid>/stat is the expensive part of sampling, so a scan
+    younger than max_age is reused by the other samplers of the same tick.
+    """
+    global _scan
+    scanned_at, cached = _scan
+    if time.monotonic() - scanned_at < max_age:
+        return cached
+    children: Dict[int, List[int]] = {}
+    for entry in PROC_ROOT.iterdir():
+        if not entry.name.isdigit():
+            continue
+        fields = _read_stat(int(entry.name))
+        if fields:
+            children.setdefault(int(fields[1]), []).append(int(entry.name))
+    _scan = (time.monotonic(), children)
+    return children
+
+def process_tree(pid: int, children: Optional[Dict[int, List[int]]] = None) -> List[int]:
+    """Return a pid followed by all of its descendants"""
+    children = children if children is not None else children_map()
+    tree, pending = [], [pid]
+    while pending:
+        current = pending.pop()
+        tree.append(current)
+        pending.extend(children.get(current, []))
+    return tree
+
+def sample_tree(
+    pid: int,
+    previous: Optional[ProcessStats] = None,
+    children: Optional[Dict[int, List[int]]] = None,
+) -> Optional[ProcessStats]:
+    """Sample CPU time, RSS and open FDs of a process tree
+    
+    Returns None if the root process is gone. cpu_percent is computed against the
+    previous sample of the same tree, if given.
+    """
+    if _read_stat(pid) is None:
+        return None
+    
+    stats = ProcessStats(pid=pid, sampled_at=time.monotonic())
+    for member in process_tree(pid, children):
+        fields = _read_stat(member)
+        if fields is None:
+            continue  # Exited between listing and reading
+        stats.pids.append(member)
+        stats.cpu_seconds += (int(fields[11]) + int(fields[12])) / _CLOCK_TICKS
+        stats.rss_bytes += int(fields[21]) * _PAGE_SIZE
+        try:
+            stats.open_fds += len(os.listdir(PROC_ROOT / str(member) / "fd"))
+        except OSError:
+            pass
+    
+    if previous and stats.sampled_at > previous.sampled_at:
+        elapsed = stats.sampled_at - previous.sampled_at
+        stats.cpu_percent = max(0.0, stats.cpu_seconds - previous.cpu_seconds) / elapsed * 100
+    
+    return stats
+
+def breached(stats: ProcessStats, limits: ResourceLimits) -> Optional[str]:
+    """Describe which monitored limit a sample exceeds, if any"""
+    if limits.max_rss_bytes is not None and stats.rss_bytes > limits.max_rss_bytes:
+        return f"rss {stats.rss_bytes} > {limits.max_rss_bytes} bytes"
+    if limits.max_cpu_percent is not None and stats.cpu_percent > limits.max_cpu_percent:
+        return f"cpu {stats.cpu_percent:.0f}% > {limits.max_cpu_percent:.0f}%"
+    return None
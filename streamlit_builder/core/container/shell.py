@@ -0,0 +1,179 @@
+import asyncio
+import os
+import pty
+import shlex
+import signal
+import termios
+import uuid
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from ...utils.logger import logger
+from .handle import ProcessExitedError
+from .output import LineDecoder
+from .resources import ResourceLimits
+
+OutputCallback = Callable[[List[str]], None]
+
+class ShellSession:
+    """Long-lived PTY-backed shell that commands are multiplexed through
+    
+    Commands run one at a time in the same shell, so the working directory and
+    exported variables persist between them. stdout and stderr share the PTY.
+    """
+    
+    def __init__(
+        self,
+        cwd: Path,
+        venv_path: Optional[Path] = None,
+        shell: str = "/bin/bash",
+        limits: Optional[ResourceLimits] = None,
+        on_start: Optional[Callable[[asyncio.subprocess.Process], None]] = None,
+    ):
+        self.cwd = cwd
+        self.venv_path = venv_path
+        self.shell = shell
+        self.limits = limits  # rlimits are inherited by every command the shell runs
+        self.on_start = on_start  # Called with each shell process once spawned
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._master_fd: Optional[int] = None
+        self._decoder = LineDecoder()
+        self._lock = asyncio.Lock()
+        self._marker: Optional[str] = None
+        self._on_output: Optional[OutputCallback] = None
+        self._done: Optional[asyncio.Future] = None
+    
+    @property
+    def is_alive(self) -> bool:
+        return self._process is not None and self._process.returncode is None
+    
+    def _environment(self) -> Dict[str, str]:
+        """Build the shell environment with the virtual environment activated"""
+        env = dict(os.environ)
+        env.update({"PS1": "", "PS2": "", "TERM": "dumb", "PYTHONUNBUFFERED": "1"})
+        env.pop("PYTHONHOME", None)
+        env.pop("PROMPT_COMMAND", None)
+        if self.venv_path:
+            env["VIRTUAL_ENV"] = str(self.venv_path)
+            env["PATH"] = f"{self.venv_path / 'bin'}{os.pathsep}{env.get('PATH', '')}"
+        return env
+    
+    async def start(self):
+        """Spawn the shell on a fresh PTY"""
+        if self.is_alive:
+            return
+        
+        master_fd, slave_fd = pty.openpty()
+        self._decoder = LineDecoder()
+        
+        # No echo of the commands we write, and no CRLF translation of output
+        attrs = termios.tcgetattr(slave_fd)
+        attrs[1] &= ~termios.ONLCR
+        attrs[3] &= ~termios.ECHO
+        termios.tcsetattr(slave_fd, termios.TCSANOW, attrs)
+        
+        try:
+            self._process = await asyncio.create_subprocess_exec(
+                self.shell, "--noprofile", "--norc",
+                stdin=slave_fd,
+                stdout=slave_fd,
+                stderr=slave_fd,
+                cwd=str(self.cwd),
+                env=self._environment(),
+                preexec_fn=self.limits.preexec_fn() if self.limits else None,
+                start_new_session=True,
+            )
+        except Exception:
+            os.close(master_fd)
+            raise
+        finally:
+            os.close(slave_fd)
+        
+        self._master_fd = master_fd
+        os.set_blocking(master_fd, False)
+        asyncio.get_running_loop().add_reader(master_fd, self._on_readable)
+        
+        # The shell is interactive on a PTY; turn off history expansion and job control
+        os.write(master_fd, b"set +H +m\n")
+        logger.debug(f"Started persistent shell (pid {self._process.pid}) in {self.cwd}")
+        if self.on_start:
+            self.on_start(self._process)
+    
+    def _on_readable(self):
+        """Read available PTY output and route it to the running command"""
+        try:
+            chunk = os.read(self._master_fd, 65536)
+        except BlockingIOError:
+            return
+        except OSError:
+            # EIO once the shell side of the PTY is closed
+            chunk = b""
+        
+        if not chunk:
+            self._detach_reader()
+            if self._done and not self._done.done():
+                self._done.set_exception(ProcessExitedError("Persistent shell exited"))
+            return
+        
+        lines = self._decoder.feed(chunk)
+        output: List[str] = []
+        for line in lines:
+            if self._marker and self._marker in line:
+                before, _, status = line.partition(self._marker)
+                if before:
+                    output.append(before)
+                self._emit(output)
+                output = []
+                if self._done and not self._done.done():
+                    self._done.set_result(int(status.strip() or 1))
+            else:
+                output.append(line)
+        self._emit(output)
+    
+    def _emit(self, lines: List[str]):
+        if lines and self._on_output:
+            self._on_output(lines)
+    
+    def _detach_reader(self):
+        if self._master_fd is not None:
+            asyncio.get_running_loop().remove_reader(self._master_fd)
+            os.close(self._master_fd)
+            self._master_fd = None
+    
+    async def run(self, command: List[str], on_output: Optional[OutputCallback] = None) -> int:
+        """Run a command in the shell and return its exit code"""
+        async with self._lock:
+            if not self.is_alive:
+                await self.start()
+            
+            marker = f"__streamlit_builder_{uuid.uuid4().hex}__"
+            self._marker = marker
+            self._on_output = on_output
+            self._done = asyncio.get_running_loop().create_future()
+            
+            # Rehash PATH in case the venv appeared since the last command, and keep stdin
+            # away from the PTY so a command waiting for input can't swallow the sentinel
+            script = f"hash -r; {{ {shlex.join(command)} ; }} </dev/null; printf '%s %d\\n' '{marker}' \"$?\"\n"
+            os.write(self._master_fd, script.encode())
+            
+            try:
+                return await self._done
+            finally:
+                self._marker = None
+                self._on_output = None
+                self._done = None
+    
+    async def close(self):
+        """Terminate the shell"""
+        if self._process is None:
+            return
+        
+        self._detach_reader()
+        if self._process.returncode is None:
+            try:
+                os.killpg(self._process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        await self._process.wait()
+        logger.debug("Persistent shell closed")
+        self._process = None
@@ -1,17 +1,37 @@
 import asyncio
-from typing import Optional, Dict, Callable, List
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Callable, List, Union
 from pathlib import Path
 
-from ...utils.logger import logger
-from .process import ProcessManager
+from ...utils.logger import logger, LogLevel
+from ...utils.metrics import metrics
+from ..constants import OUTPUT_CHUNK_SIZE, OUTPUT_DISPATCH_QUEUE_SIZE, OUTPUT_BUFFER_MAX_PROCESSES, SHELL_PROCESS_NAME
+from .handle import ProcessHandle
+from .memo import CommandCache
+from .output import LineDecoder, OutputBuffer
+from .process import ProcessManager, CommandTimeoutError, TimeoutEvent, classify_command
+from .resources import ResourceLimits
+from .shell import ShellSession
 
 class Terminal:
     """Terminal emulation for command execution"""
     
-    def __init__(self, cwd: Path):
+    def __init__(
+        self,
+        cwd: Path,
+        persistent_shell: bool = False,
+        venv_path: Optional[Path] = None,
+        limits: Optional[ResourceLimits] = None,
+    ):
         self.cwd = cwd
-        self.process_manager = ProcessManager(cwd)
+        self.process_manager = ProcessManager(cwd, limits=limits)
+        self.persistent_shell = persistent_shell
+        self.venv_path = venv_path
+        self._shell: Optional[ShellSession] = None
+        self.command_cache = CommandCache(cwd, venv_path)
         self._output_handlers: Dict[str, List[Callable[[str], None]]] = {}
+        self._buffers: "OrderedDict[str, OutputBuffer]" = OrderedDict()
     
     def add_output_handler(self, process_name: str, handler: Callable[[str], None]):
         """Add handler for process output"""
@@ -19,37 +39,208 @@ class Terminal:
             self._output_handlers[process_name] = []
         self._output_handlers[process_name].append(handler)
     
+    def get_output(self, process_name: str, last: Optional[int] = None) -> List[str]:
+        """Get buffered output lines of a running or finished process"""
+        buffer = self._buffers.get(process_name)
+        return buffer.lines(last) if buffer else []
+    
+    def get_buffer(self, process_name: str) -> Optional[OutputBuffer]:
+        """Get the output buffer of a process"""
+        return self._buffers.get(process_name)
+    
+    def _new_buffer(self, process_name: str) -> OutputBuffer:
+        """Create a fresh output buffer, dropping the oldest ones over the limit"""
+        self._buffers.pop(process_name, None)
+        buffer = self._buffers[process_name] = OutputBuffer()
+        while len(self._buffers) > OUTPUT_BUFFER_MAX_PROCESSES:
+            self._buffers.popitem(last=False)
+        return buffer
+    
     async def execute(
         self,
         command: List[str],
         process_name: str,
         env: Optional[Dict[str, str]] = None,
-    ):
-        """Execute a command and handle its output"""
-        process = await self.process_manager.run(command, process_name, env)
-        
-        async def handle_output(stream: asyncio.StreamReader, prefix: str):
-            while True:
-                line = await stream.readline()
-                if not line:
-                    break
-                    
-                decoded = line.decode().rstrip()
-                logger.debug(f"{prefix} {decoded}")
-                
-                # Notify handlers
-                handlers = self._output_handlers.get(process_name, [])
-                for handler in handlers:
-                    handler(decoded)
-        
-        # Handle both stdout and stderr
-        await asyncio.gather(
-            handle_output(process.stdout, "[stdout]"),
-            handle_output(process.stderr, "[stderr]")
+        wait: bool = True,
+        memoize: bool = False,
+        timeout: Optional[float] = None,
+    ) -> Union[int, ProcessHandle]:
+        """Execute a command and handle its output
+        
+        Returns the exit code, or with wait=False a ProcessHandle as soon as the process has started.
+        With a persistent shell, foreground commands without a custom environment run in that shell.
+        With memoize, idempotent commands whose inputs are unchanged are skipped and their output replayed.
+        
+        timeout overrides the deadline policy of the command's class. A foreground command that
+        runs past its deadline is stopped with its process tree and raises CommandTimeoutError.
+        """
+        if memoize and wait and self.command_cache.is_idempotent(command) and not self.command_cache.bypassed:
+            return await self._execute_memoized(command, process_name, env, timeout)
+        
+        if wait and self.persistent_shell and env is None:
+            return await self._execute_in_shell(command, process_name, timeout)
+        
+        handle = await self.start(command, process_name, env, timeout)
+        if not wait:
+            return handle
+        
+        returncode = await handle.wait()
+        event = self.process_manager.timed_out(handle.process)
+        if event:
+            raise CommandTimeoutError(event)
+        return returncode
+    
+    async def start(
+        self,
+        command: List[str],
+        process_name: str,
+        env: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+    ) -> ProcessHandle:
+        """Start a command in the background and begin capturing its output"""
+        process = await self.process_manager.run(command, process_name, env, timeout=timeout)
+        handle = ProcessHandle(process_name, process, self._new_buffer(process_name))
+        handle._output_task = asyncio.create_task(self._capture_output(handle))
+        return handle
+    
+    async def _execute_memoized(
+        self,
+        command: List[str],
+        process_name: str,
+        env: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+    ) -> int:
+        """Run an idempotent command unless a matching earlier run can be replayed"""
+        cached = self.command_cache.lookup(command, env)
+        if cached:
+            buffer = self._new_buffer(process_name)
+            buffer.extend(cached.output)
+            for handler in self._output_handlers.get(process_name, []):
+                try:
+                    for line in cached.output:
+                        handler(line)
+                except Exception as e:
+                    logger.error(f"Output handler error for {process_name}: {str(e)}")
+            
+            metrics.increment("command.memo_hits")
+            metrics.record("command.memo_saved", cached.duration)
+            logger.info(f"Skipped unchanged command {' '.join(command)} (saved {cached.duration:.2f}s)")
+            return cached.returncode
+        
+        metrics.increment("command.memo_misses")
+        start = time.perf_counter()
+        returncode = await self.execute(command, process_name, env, timeout=timeout)
+        self.command_cache.store(
+            command, returncode, self.get_output(process_name), time.perf_counter() - start, env
         )
+        return returncode
+    
+    async def _execute_in_shell(self, command: List[str], process_name: str, timeout: Optional[float] = None) -> int:
+        """Run a command through the persistent shell session
+        
+        On timeout the whole shell is killed, taking the command with it, and a fresh one
+        is started for the next command.
+        """
+        if self._shell is None:
+            # Commands in the shell get the same limits as processes spawned on their own
+            self._shell = ShellSession(
+                self.cwd,
+                self.venv_path,
+                limits=self.process_manager.limits,
+                on_start=lambda process: self.process_manager.watch(SHELL_PROCESS_NAME, process),
+            )
+        buffer = self._new_buffer(process_name)
+        
+        def on_output(lines: List[str]):
+            buffer.extend(lines)
+            if logger.is_enabled_for(LogLevel.DEBUG):
+                logger.debug("\n".join(f"[shell] {line}" for line in lines))
+            for handler in self._output_handlers.get(process_name, []):
+                try:
+                    for line in lines:
+                        handler(line)
+                except Exception as e:
+                    logger.error(f"Output handler error for {process_name}: {str(e)}")
         
-        return await process.wait()
+        logger.debug(f"Running in persistent shell {process_name}: {' '.join(command)}")
+        command_class = classify_command(command)
+        deadline = timeout if timeout is not None else self.process_manager.timeouts.get(command_class)
+        if deadline is None or deadline == float("inf"):
+            return await self._shell.run(command, on_output)
+        
+        try:
+            return await asyncio.wait_for(self._shell.run(command, on_output), deadline)
+        except asyncio.TimeoutError:
+            await self._shell.close()
+            self._shell = None
+            event = TimeoutEvent(process_name, list(command), command_class, deadline)
+            metrics.increment(f"process.timeouts.{command_class.value}")
+            logger.warning(f"Process {process_name} exceeded its {deadline:.0f}s deadline, stopping it")
+            self.process_manager.notify_timeout(event)
+            raise CommandTimeoutError(event) from None
+    
+    async def _capture_output(self, handle: ProcessHandle):
+        """Pump both pipes of a process into its buffer, subscribers and handlers"""
+        # Bounded so a slow handler pauses the pipe readers instead of queueing without limit
+        batches: asyncio.Queue = asyncio.Queue(maxsize=OUTPUT_DISPATCH_QUEUE_SIZE)
+        dispatcher = asyncio.create_task(self._dispatch_output(handle.name, batches))
+        
+        try:
+            await asyncio.gather(
+                self._read_output(handle.process.stdout, "[stdout]", handle, batches),
+                self._read_output(handle.process.stderr, "[stderr]", handle, batches)
+            )
+        finally:
+            handle._close_output()
+            await batches.put(None)
+            await dispatcher
+    
+    async def _read_output(
+        self,
+        stream: asyncio.StreamReader,
+        prefix: str,
+        handle: ProcessHandle,
+        batches: asyncio.Queue,
+    ):
+        """Read a pipe in chunks and queue complete lines for dispatch"""
+        decoder = LineDecoder()
+        
+        while True:
+            chunk = await stream.read(OUTPUT_CHUNK_SIZE)
+            lines = decoder.feed(chunk) if chunk else decoder.flush()
+            
+            if lines:
+                handle.buffer.extend(lines)
+                handle._publish(lines)
+                if logger.is_enabled_for(LogLevel.DEBUG):
+                    logger.debug("\n".join(f"{prefix} {line}" for line in lines))
+                if self._output_handlers.get(handle.name):
+                    await batches.put(lines)
+            
+            if not chunk:
+                break
+    
+    async def _dispatch_output(self, process_name: str, batches: asyncio.Queue):
+        """Deliver queued output batches to the process handlers"""
+        while True:
+            lines = await batches.get()
+            if lines is None:
+                break
+            
+            for handler in self._output_handlers.get(process_name, []):
+                try:
+                    for line in lines:
+                        handler(line)
+                except Exception as e:
+                    logger.error(f"Output handler error for {process_name}: {str(e)}")
+            
+            # Give the loop a chance to run other tasks between batches
+            await asyncio.sleep(0)
     
     async def cleanup(self):
         """Clean up all running processes"""
-        await self.process_manager.stop_all() 
\ No newline at end of file
+        if self._shell:
+            await asyncio.gather(self.process_manager.stop_all(), self._shell.close())
+            self._shell = None
+        else:
+            await self.process_manager.stop_all()
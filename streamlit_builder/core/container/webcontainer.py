@@ -1,17 +1,25 @@
+import asyncio
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Optional
 
 from ...utils.logger import logger
+from ...utils.metrics import metrics
+from ...package.wheelhouse import Wheelhouse
+from .bytecode import BytecodeCompiler
 from .filesystem import FileSystem
 from .terminal import Terminal
 from .process import ProcessManager
+from .resources import ResourceLimits
 
 @dataclass
 class ContainerConfig:
     """Configuration for WebContainer"""
     work_dir: Path
     env_dir: Path
+    persistent_shell: bool = False  # Run foreground commands through one long-lived shell
+    resource_limits: Optional[ResourceLimits] = None  # Applied to every process the terminal spawns
+    wheelhouse_dir: Optional[Path] = None  # Shared wheels that installs try offline first; off when None
 
 class WebContainer:
     """Container for web development environment"""
@@ -19,8 +27,15 @@ class WebContainer:
     def __init__(self, config: ContainerConfig):
         self.config = config
         self.fs = FileSystem(config.work_dir)
-        self.terminal = Terminal(config.work_dir)
+        self.terminal = Terminal(
+            config.work_dir,
+            persistent_shell=config.persistent_shell,
+            venv_path=config.env_dir,
+            limits=config.resource_limits
+        )
         self.process = ProcessManager()
+        self.bytecode = BytecodeCompiler(self.terminal, config.env_dir)  # Background .pyc compilation
+        self.wheelhouse = Wheelhouse(config.wheelhouse_dir) if config.wheelhouse_dir else None
         
     async def setup(self):
         """Set up container environment"""
@@ -37,8 +52,16 @@ class WebContainer:
     async def cleanup(self):
         """Clean up container resources"""
         try:
-            await self.process.cleanup()
-            logger.info("Container cleanup complete")
+            # Both stop their processes concurrently with SIGKILL escalation, so this is bounded
+            with metrics.timer("container.cleanup"):
+                await self.bytecode.close()
+                terminals = [self.terminal.cleanup()]
+                if self.wheelhouse:
+                    terminals.append(self.wheelhouse.terminal.cleanup())
+                await asyncio.gather(self.process.cleanup(), *terminals)
+            if self.terminal.command_cache.hits:
+                logger.info(f"Command memoization: {self.terminal.command_cache.report()}")
+            logger.info(f"Container cleanup complete in {metrics.timings('container.cleanup')[-1]:.2f}s")
         except Exception as e:
             logger.error(f"Error during container cleanup: {str(e)}")
             raise 
\ No newline at end of file
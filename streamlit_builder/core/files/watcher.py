@@ -1,29 +1,168 @@
 import asyncio
 import os
+import re
 from pathlib import Path
-from typing import Callable, Dict, List, Set
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
 from watchfiles import awatch, Change
 
 from ...utils.logger import logger
+from ...utils.metrics import metrics
+from ..constants import WATCH_DEBOUNCE, WATCH_IGNORE_DIRS, WATCH_IGNORE_PATTERNS
+
+class WatchFilter:
+    """Drops changes below ignored directories or to files with ignored names, counting them
+    
+    Only the part of a path below the watched root is checked, so a project that
+    itself lives under, say, a .git directory is still watched.
+    """
+    
+    def __init__(
+        self,
+        root: Path,
+        ignore_dirs: Iterable[str] = WATCH_IGNORE_DIRS,
+        ignore_patterns: Iterable[str] = WATCH_IGNORE_PATTERNS,
+    ):
+        self.root = root
+        self.ignore_dirs: Set[str] = set(ignore_dirs)
+        self.ignore_patterns = [re.compile(pattern) for pattern in ignore_patterns]
+        self.dropped = 0
+    
+    def __call__(self, change: Change, path: str) -> bool:
+        try:
+            parts = Path(path).relative_to(self.root).parts
+        except ValueError:
+            parts = Path(path).parts
+        ignored = any(part in self.ignore_dirs for part in parts) or (
+            bool(parts) and any(pattern.search(parts[-1]) for pattern in self.ignore_patterns)
+        )
+        if ignored:
+            self.dropped += 1
+            metrics.increment("watcher.dropped")
+        return not ignored
+
+def _coalesce(changes: Set[Tuple[Change, str]]) -> Dict[Path, Change]:
+    """One change per path for a batch, whose order watchfiles doesn't keep"""
+    seen: Dict[Path, Set[Change]] = {}
+    for change_type, file_path in changes:
+        seen.setdefault(Path(file_path).absolute(), set()).add(change_type)
+    
+    coalesced = {}
+    for path, kinds in seen.items():
+        if len(kinds) == 1:
+            coalesced[path] = next(iter(kinds))
+        elif path.exists():
+            # Created and written is new; removed and written again (an atomic save) is modified
+            coalesced[path] = Change.added if Change.added in kinds and Change.deleted not in kinds else Change.modified
+        elif Change.added not in kinds:
+            coalesced[path] = Change.deleted
+        # Otherwise created and removed again within the batch, e.g. a temporary file
+    return coalesced
+
+def _merge(pending: Dict[Path, Change], path: Path, change: Change):
+    """Fold a later change to a path into one still waiting to be handled"""
+    previous = pending.get(path)
+    if previous == Change.added and change == Change.deleted:
+        del pending[path]
+    elif previous == Change.added and change == Change.modified:
+        pass  # Still new to the handler
+    elif previous == Change.deleted and change == Change.added:
+        pending[path] = Change.modified
+    else:
+        pending[path] = change
+
+class _HandlerLane:
+    """Runs one handler on batches in order, off the watch loop
+    
+    Batches that arrive while the handler is still busy are merged and handed to
+    it as one once it finishes, so a slow handler never queues up stale work.
+    """
+    
+    def __init__(self, run: Callable[[Set[Tuple[Change, Path]]], Awaitable]):
+        self.run = run
+        self.pending: Dict[Path, Change] = {}
+        self.task: Optional[asyncio.Task] = None
+        self.errors = 0
+    
+    def submit(self, changes: Dict[Path, Change]) -> bool:
+        """Queue a batch; returns whether it was merged into one already waiting"""
+        merged = bool(self.pending)
+        for path, change in changes.items():
+            _merge(self.pending, path, change)
+        if self.task is None and self.pending:
+            self.task = asyncio.create_task(self._drain())
+        return merged
+    
+    async def _drain(self):
+        try:
+            while self.pending:
+                batch, self.pending = self.pending, {}
+                try:
+                    await self.run({(change, path) for path, change in batch.items()})
+                except Exception as e:
+                    self.errors += 1
+                    logger.error(f"Handler error: {str(e)}")
+        finally:
+            self.task = None
 
 class FileWatcher:
-    """Watch for file changes in a directory"""
+    """Watch for file changes in a directory
+    
+    Changes below ignored directories (the venv, __pycache__, VCS metadata) and to
+    ignored names (bytecode, editor swap files) are dropped before dispatch. Each
+    batch is de-duplicated to one change per path, and every handler runs in its
+    own task, so a slow handler doesn't hold up the watch loop or other handlers.
+    """
     
-    def __init__(self, path: Path):
+    def __init__(
+        self,
+        path: Path,
+        ignore_dirs: Iterable[str] = WATCH_IGNORE_DIRS,
+        ignore_patterns: Iterable[str] = WATCH_IGNORE_PATTERNS,
+        debounce: int = WATCH_DEBOUNCE,
+    ):
         self.path = path.absolute()  # Use absolute path
         self.handlers: Dict[Change, List[Callable]] = {
             change: [] for change in Change
         }
+        self.batch_handlers: List[Callable] = []
+        self.filter = WatchFilter(self.path, ignore_dirs, ignore_patterns)
+        self.debounce = debounce
+        self._lanes: Dict[tuple, _HandlerLane] = {}
         self._task: asyncio.Task | None = None
         self._running = False
+        self.events = 0  # Changes dispatched, after filtering
+        self.batches = 0
+        self.duplicates = 0  # Changes folded into another change to the same path
+        self.merged = 0  # Batches merged into one still waiting for a busy handler
         
         # Create directory if it doesn't exist
         os.makedirs(str(self.path), exist_ok=True)
     
     def on_change(self, change_type: Change, handler: Callable):
-        """Register a handler for a specific change type"""
+        """Register a handler for a specific change type, called once per changed path"""
         self.handlers[change_type].append(handler)
     
+    def on_batch(self, handler: Callable):
+        """Register a handler for every batch of changes
+        
+        The handler receives a set of (Change, Path) pairs with one change per path,
+        once per debounced batch instead of once per file.
+        """
+        self.batch_handlers.append(handler)
+    
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Counts of dispatched, dropped and coalesced changes"""
+        return {
+            "events": self.events,
+            "batches": self.batches,
+            "dropped": self.filter.dropped,
+            "duplicates": self.duplicates,
+            "merged": self.merged,
+            "handler_errors": sum(lane.errors for lane in self._lanes.values()),
+            "busy_handlers": sum(lane.task is not None for lane in self._lanes.values()),
+        }
+    
     async def start(self):
         """Start watching for changes"""
         if self._running:
@@ -36,7 +175,7 @@ class FileWatcher:
         logger.info(f"Started watching {self.path}")
     
     async def stop(self):
-        """Stop watching for changes"""
+        """Stop watching for changes and cancel handlers still running"""
         if not self._running:
             return
         
@@ -48,17 +187,48 @@ class FileWatcher:
             except asyncio.CancelledError:
                 pass
             self._task = None
-        logger.info("Stopped file watcher")
+        tasks = [lane.task for lane in self._lanes.values() if lane.task]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        logger.info(f"Stopped file watcher: {self.stats}")
+    
+    async def wait_idle(self):
+        """Wait until every handler has handled every batch dispatched so far"""
+        while tasks := [lane.task for lane in self._lanes.values() if lane.task]:
+            await asyncio.gather(*tasks, return_exceptions=True)
+    
+    def _lane(self, key: tuple, run: Callable) -> _HandlerLane:
+        if key not in self._lanes:
+            self._lanes[key] = _HandlerLane(run)
+        return self._lanes[key]
+    
+    def _dispatch(self, changes: Dict[Path, Change]):
+        """Hand a batch to every handler without waiting for any of them"""
+        lanes = [self._lane((None, handler), handler) for handler in self.batch_handlers]
+        for change_type, handlers in self.handlers.items():
+            for handler in handlers:
+                lanes.append(self._lane((change_type, handler), self._per_path(change_type, handler)))
+        for lane in lanes:
+            self.merged += lane.submit(changes)
+    
+    @staticmethod
+    def _per_path(change_type: Change, handler: Callable) -> Callable:
+        async def run(batch: Set[Tuple[Change, Path]]):
+            for change, path in sorted(batch, key=lambda item: str(item[1])):
+                if change == change_type:
+                    await handler(path)
+        return run
     
     async def _watch(self):
         """Watch for file changes"""
         try:
             watch_gen = awatch(
                 self.path,
-                debounce=100,  # Increased debounce time
+                debounce=self.debounce,
                 recursive=True,
                 yield_on_timeout=True,
-                watch_filter=None  # Watch all files
+                watch_filter=self.filter
             )
             
             async for changes in watch_gen:
@@ -67,23 +237,17 @@ class FileWatcher:
                 
                 if not changes:  # Skip empty changes (from timeout)
                     continue
-                    
-                for change_type, file_path in changes:
-                    try:
-                        abs_path = Path(file_path).absolute()
-                        handlers = self.handlers.get(change_type, [])
-                        
-                        for handler in handlers:
-                            try:
-                                await handler(abs_path)
-                                logger.debug(f"Handler called for {change_type} on {abs_path}")
-                            except Exception as e:
-                                logger.error(f"Handler error: {str(e)}")
-                                
-                    except Exception as e:
-                        logger.error(f"Error processing change {change_type} for {file_path}: {str(e)}")
-                            
+                
+                batch = _coalesce(changes)
+                self.batches += 1
+                self.events += len(batch)
+                self.duplicates += len(changes) - len(batch)
+                metrics.increment("watcher.events", len(batch))
+                metrics.record("watcher.batch_size", len(batch))
+                if batch:
+                    self._dispatch(batch)
+        
         except Exception as e:
             logger.error(f"Error in file watcher: {str(e)}")
             if self._running:
-                raise 
\ No newline at end of file
+                raise
@@ -3,6 +3,8 @@ from pathlib import Path
 
 from .parser import Action, ActionType
 from ..container.webcontainer import WebContainer
+from ...package.coalescer import InstallCoalescer
+from ...package.uv_manager import UVManager
 from ...utils.logger import logger
 
 class ActionRunner:
@@ -10,6 +12,9 @@ class ActionRunner:
     
     def __init__(self, container: WebContainer):
         self.container = container
+        # Package installs are queued and resolved together at the end of the turn
+        uv = UVManager(container.terminal, container.config.work_dir, wheelhouse=container.wheelhouse)
+        self.installer = InstallCoalescer(uv, window=None)
     
     async def execute_actions(self, actions: List[Action]):
         """Execute a list of actions in order"""
@@ -19,6 +24,7 @@ class ActionRunner:
             except Exception as e:
                 logger.error(f"Failed to execute action: {str(e)}")
                 raise
+        await self.installer.flush_and_report()
     
     async def _execute_action(self, action: Action):
         """Execute a single action"""
@@ -42,17 +48,16 @@ class ActionRunner:
         if not action.package_name:
             raise ValueError("Package action missing package name")
         
-        await self.container.terminal.execute(
-            ["uv", "pip", "install", action.package_name],
-            f"install_{action.package_name}"
-        )
-        logger.info(f"Installed package: {action.package_name}")
+        self.installer.request(action.package_name)
+        logger.debug(f"Queued package: {action.package_name}")
     
     async def _handle_command_action(self, action: Action):
         """Handle command execution"""
         if not action.command:
             raise ValueError("Command action missing command")
         
+        # Commands may import packages queued earlier in the turn
+        await self.installer.flush_and_report()
         await self.container.terminal.execute(
             action.command,
             f"run_{'_'.join(action.command)}"
@@ -1,17 +1,33 @@
-import asyncio
 from pathlib import Path
 from typing import List
 import re
 
 from ...utils.logger import logger
+from ...utils.metrics import metrics
+from ..constants import CommandClass, CompilePriority
+from ..container.process import classify_command
 from ..container.webcontainer import WebContainer
+from ...package.coalescer import InstallCoalescer
+from ...package.uv_manager import UVManager
+from ...project.entry import find_app_entry
 from .artifact_parser import Artifact, ArtifactType
+from .perf_linter import Finding, lint_source
 
 class ArtifactExecutor:
     """Execute artifacts in a safe environment"""
     
-    def __init__(self, container: WebContainer):
+    def __init__(self, container: WebContainer, memoize: bool = True, lint: bool = True):
         self.container = container
+        self.memoize = memoize  # Skip idempotent commands like installs when nothing they use changed
+        self.lint = lint  # Check Python files for rerun performance problems before writing them
+        self.findings: List[Finding] = []  # Since the last take_findings, newest file version only
+        uv = UVManager(
+            container.terminal,
+            container.config.work_dir,
+            wheelhouse=container.wheelhouse,
+            bytecode=container.bytecode
+        )
+        self.installer = InstallCoalescer(uv, window=None, memoize=memoize)
         
     async def execute_artifacts(self, artifacts: List[Artifact]):
         """Execute a list of artifacts in order"""
@@ -49,18 +65,61 @@ class ArtifactExecutor:
         
         # Create parent directories if needed
         file_path = Path(file_path)
+        if self.lint and file_path.suffix == ".py":
+            self._lint(file_path, content)
         if file_path.parent != Path('.'):
             await self.container.fs.create_dir(str(file_path.parent))
         
         # Write file
         await self.container.fs.write_file(str(file_path), content)
         logger.info(f"Created file: {file_path}")
+        
+        # Compile it now rather than when Streamlit first imports it
+        if file_path.suffix == ".py":
+            full_path = self.container.config.work_dir / file_path
+            if full_path == find_app_entry(self.container.config.work_dir):
+                self.container.bytecode.submit_app(full_path)
+            else:
+                self.container.bytecode.submit([full_path], CompilePriority.APP)
+    
+    def _lint(self, file_path: Path, content: str):
+        findings = lint_source(content, str(file_path))
+        # A rewrite of the file replaces the findings of the earlier version
+        self.findings = [f for f in self.findings if f.path != str(file_path)] + findings
+        for finding in findings:
+            metrics.increment(f"perf_lint.{finding.rule}")
+        if findings:
+            logger.info(f"{len(findings)} performance findings in {file_path}")
+    
+    def take_findings(self) -> List[Finding]:
+        """Return and clear the findings collected since the last call"""
+        findings, self.findings = self.findings, []
+        return findings
     
     async def _handle_command_artifact(self, artifact: Artifact):
         """Handle command execution"""
         # Extract command from content (remove $ prefix)
         command = artifact.content.strip().lstrip('$ ').split()
         
+        # Plain `uv pip install <packages>` is queued and resolved with the turn's other installs
+        packages = command[3:]
+        if command[:3] == ["uv", "pip", "install"] and packages and not any(p.startswith("-") for p in packages):
+            for package in packages:
+                self.installer.request(package)
+            logger.info(f"Queued packages: {' '.join(packages)}")
+            return
+        
+        # Later commands may import packages queued earlier in the turn
+        await self.installer.flush_and_report()
+        
+        # Servers never exit on their own; start them in the background instead of blocking the turn
+        if classify_command(command) == CommandClass.SERVER:
+            await self.container.terminal.execute(command, f"command_{artifact.id}", wait=False)
+            logger.info(f"Started command: {' '.join(command)}")
+            return
+        
         # Execute command
-        await self.container.terminal.execute(command, f"command_{artifact.id}")
-        logger.info(f"Executed command: {' '.join(command)}") 
\ No newline at end of file
+        returncode = await self.container.terminal.execute(command, f"command_{artifact.id}", memoize=self.memoize)
+        logger.info(f"Executed command: {' '.join(command)}")
+        if returncode == 0 and classify_command(command) == CommandClass.INSTALL:
+            self.container.bytecode.submit_packages(find_app_entry(self.container.config.work_dir))
\ No newline at end of file
@@ -1,14 +1,18 @@
-from typing import Optional, AsyncGenerator
+from collections import Counter
+from typing import Optional, AsyncGenerator, List
 from pathlib import Path
 
-from ..constants import ActionType
+from ..constants import ActionType, PERF_LINT_FOLLOWUP_TURNS
 from .model import ClaudeModel
 from .parser import MessageParser, Action
 from .prompts import get_system_prompt
 from ...utils.logger import logger
 from ..container.webcontainer import WebContainer
+from ..container.process import CommandTimeoutError, TimeoutEvent
 from .artifact_parser import ArtifactParser, ArtifactType
 from .artifact_executor import ArtifactExecutor
+from .perf_linter import format_findings
+from ...project.datasets import DatasetCatalog, install_dataset_cache
 
 class ChatSession:
     """Manages an AI chat session for Streamlit development"""
@@ -20,39 +24,82 @@ class ChatSession:
         self.messages = []
         self.artifact_executor = ArtifactExecutor(container)
         self.current_response = []  # Store current response chunks
+        self.timeouts: List[TimeoutEvent] = []  # Commands stopped for running past their deadline
+        self.perf_findings: Counter = Counter()  # Performance findings in written files, by rule
+        self.datasets = DatasetCatalog(container.config.work_dir)
     
     async def process_prompt(self, prompt: str) -> AsyncGenerator[str, None]:
         """Process a single prompt and stream the response"""
         try:
             # Add user message
             self.messages.append({"role": "user", "content": prompt})
-            self.current_response = []
             
-            # Get streaming response
-            async for chunk in self.model.stream_chat(
-                messages=self.messages,
-                system_prompt=self.system_prompt
-            ):
-                self.current_response.append(chunk)
-                # Don't yield chunks - we'll display only message artifacts
+            # Data files added since the last prompt are converted and described by schema, not samples
+            await self.datasets.ingest_all()
+            install_dataset_cache(self.container.config.work_dir)
+            self.system_prompt = get_system_prompt(self.datasets.prompt_context())
+            self.artifact_executor.take_findings()  # Only this prompt's files are reviewed
+            async for text in self._respond():
+                yield text
             
-            # Parse and execute artifacts
-            response = "".join(self.current_response)
-            artifacts = ArtifactParser.parse_artifacts(response)
-            
-            # Execute artifacts and display messages
-            for artifact in artifacts:
-                await self.artifact_executor.execute_artifacts([artifact])
-                if artifact.type == ArtifactType.MESSAGE:
-                    yield f"\n{artifact.content}\n"
-            
-            # Add assistant response to history
-            self.messages.append({"role": "assistant", "content": response})
+            # Performance problems in the files just written go back to the model in a short follow-up turn
+            followups = 0
+            while True:
+                findings = self.artifact_executor.take_findings()
+                self.perf_findings.update(finding.rule for finding in findings)
+                if not findings or followups >= PERF_LINT_FOLLOWUP_TURNS:
+                    break
+                followups += 1
+                yield f"\nReviewing {len(findings)} performance findings...\n"
+                self.messages.append({"role": "user", "content": format_findings(findings)})
+                async for text in self._respond():
+                    yield text
                 
         except Exception as e:
             logger.error(f"Error processing prompt: {str(e)}")
             raise
     
+    async def _respond(self) -> AsyncGenerator[str, None]:
+        """Get one model response to the conversation so far and execute its artifacts"""
+        self.current_response = []
+        
+        # Get streaming response
+        async for chunk in self.model.stream_chat(
+            messages=self.messages,
+            system_prompt=self.system_prompt
+        ):
+            self.current_response.append(chunk)
+            # Don't yield chunks - we'll display only message artifacts
+        
+        # Parse and execute artifacts
+        response = "".join(self.current_response)
+        artifacts = ArtifactParser.parse_artifacts(response)
+        
+        # Execute artifacts and display messages
+        for artifact in artifacts:
+            try:
+                await self.artifact_executor.execute_artifacts([artifact])
+            except CommandTimeoutError as e:
+                # A hung command shouldn't sink the rest of the turn
+                yield self._record_timeout(e)
+                continue
+            if artifact.type == ArtifactType.MESSAGE:
+                yield f"\n{artifact.content}\n"
+        
+        # Packages requested during the turn are installed together
+        try:
+            await self.artifact_executor.installer.flush_and_report()
+        except CommandTimeoutError as e:
+            yield self._record_timeout(e)
+        
+        # Add assistant response to history
+        self.messages.append({"role": "assistant", "content": response})
+    
+    def _record_timeout(self, error: CommandTimeoutError) -> str:
+        """Record a timed-out command and describe it for the user"""
+        self.timeouts.append(error.event)
+        return f"\nCommand `{' '.join(error.event.command)}` timed out after {error.event.timeout:.0f}s and was stopped\n"
+    
     async def _execute_action(self, action: Action):
         """Execute a single action from the LLM response"""
         try:
@@ -0,0 +1,257 @@
+import ast
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+# Calls that read data; their results belong in st.cache_data
+IO_CALLS = {
+    "numpy.load", "numpy.loadtxt", "numpy.genfromtxt", "json.load", "pickle.load",
+    "requests.get", "requests.post", "requests.request", "httpx.get", "httpx.post",
+    "urllib.request.urlopen", "yfinance.download", "duckdb.sql", "duckdb.query",
+}
+IO_PREFIXES = ("pandas.read_", "polars.read_", "polars.scan_", "geopandas.read_")
+
+# Calls that build clients, connections or models; they belong in st.cache_resource
+RESOURCE_CALLS = {
+    "sqlalchemy.create_engine", "sqlite3.connect", "psycopg2.connect", "pymysql.connect",
+    "duckdb.connect", "boto3.client", "boto3.resource", "openai.OpenAI", "anthropic.Anthropic",
+    "pymongo.MongoClient", "redis.Redis", "transformers.pipeline",
+    "sentence_transformers.SentenceTransformer", "spacy.load", "torch.load", "joblib.load",
+    "tensorflow.keras.models.load_model", "keras.models.load_model",
+}
+RESOURCE_ATTRIBUTES = {"from_pretrained"}
+
+CACHE_DECORATORS = {
+    "streamlit.cache_data": "data", "streamlit.experimental_memo": "data", "streamlit.cache": "data",
+    "functools.lru_cache": "data", "functools.cache": "data",
+    "streamlit.cache_resource": "resource", "streamlit.experimental_singleton": "resource",
+}
+FRAGMENT_DECORATORS = {"streamlit.fragment", "streamlit.experimental_fragment"}
+
+WIDGETS = {
+    "button", "checkbox", "toggle", "radio", "selectbox", "multiselect", "slider", "select_slider",
+    "text_input", "text_area", "number_input", "date_input", "time_input", "color_picker",
+    "data_editor", "pills", "segmented_control", "feedback",
+}
+# Layout blocks a section of widgets and output can live in
+SECTIONS = {"container", "expander", "popover", "form", "tabs", "columns", "empty"}
+ROW_INDEXERS = {"iloc", "loc", "at", "iat"}
+# Lines ending in this comment are never reported, e.g. the loaders of a caching library
+IGNORE_COMMENT = "# perf: ignore"
+
+@dataclass(frozen=True)
+class Finding:
+    """One performance problem in a generated file"""
+    rule: str  # uncached-io, uncached-resource, row-loop or fragment
+    path: str
+    line: int
+    message: str
+    
+    def __str__(self) -> str:
+        return f"{self.path}:{self.line} [{self.rule}] {self.message}"
+
+def _dotted(node: ast.AST) -> Optional[str]:
+    """a.b.c for a chain of attributes on a name"""
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return None
+    parts.append(node.id)
+    return ".".join(reversed(parts))
+
+class _PerfVisitor(ast.NodeVisitor):
+    """Collects findings while tracking whether code runs cached on every rerun"""
+    
+    def __init__(self, path: str):
+        self.path = path
+        self.findings: Dict[tuple, Finding] = {}
+        self.aliases: Dict[str, str] = {}  # Local name -> module or qualified name
+        self.cache: List[Optional[str]] = [None]  # Cache kind of each enclosing function
+        self.uses_fragments = False
+        self.imports_streamlit = False
+        self.module_level: Set[tuple] = set()  # Findings outside any function
+        self.sections: List[tuple] = []  # (node, description, names its widgets set) of fragment candidates
+        self._section_depth = 0
+    
+    def add(self, rule: str, node: ast.AST, message: str):
+        key = (rule, node.lineno)
+        if key not in self.findings and len(self.cache) == 1:
+            self.module_level.add(key)
+        self.findings.setdefault(key, Finding(rule, self.path, node.lineno, message))
+    
+    def resolve(self, node: ast.AST) -> Optional[str]:
+        name = _dotted(node)
+        if name is None:
+            return None
+        head, _, rest = name.partition(".")
+        head = self.aliases.get(head, head)
+        return f"{head}.{rest}" if rest else head
+    
+    def visit_Import(self, node: ast.Import):
+        for alias in node.names:
+            self.imports_streamlit |= alias.name.split(".")[0] == "streamlit"
+            if alias.asname:
+                self.aliases[alias.asname] = alias.name
+    
+    def visit_ImportFrom(self, node: ast.ImportFrom):
+        self.imports_streamlit |= (node.module or "").split(".")[0] == "streamlit"
+        for alias in node.names:
+            if node.module and not node.level:
+                self.aliases[alias.asname or alias.name] = f"{node.module}.{alias.name}"
+    
+    def _decorators(self, node) -> Set[str]:
+        names = set()
+        for decorator in node.decorator_list:
+            target = decorator.func if isinstance(decorator, ast.Call) else decorator
+            names.add(self.resolve(target) or "")
+        return names
+    
+    def visit_FunctionDef(self, node):
+        decorators = self._decorators(node)
+        if decorators & FRAGMENT_DECORATORS:
+            self.uses_fragments = True
+        kinds = [CACHE_DECORATORS[name] for name in decorators if name in CACHE_DECORATORS]
+        # Nested functions run under their enclosing function's cache
+        self.cache.append(kinds[0] if kinds else self.cache[-1])
+        self.generic_visit(node)
+        self.cache.pop()
+        
+        if len(self.cache) == 1 and not kinds and not decorators & FRAGMENT_DECORATORS:
+            returns_value = any(isinstance(n, ast.Return) and n.value is not None for n in ast.walk(node))
+            if not returns_value and self._widget_names(node.body) is not None:
+                self.sections.append((node, f"`{node.name}()`", set()))
+    
+    visit_AsyncFunctionDef = visit_FunctionDef
+    
+    def visit_Call(self, node: ast.Call):
+        name = self.resolve(node.func)
+        cache = self.cache[-1]
+        if name:
+            short = _dotted(node.func)
+            if self._is_resource(name) and cache != "resource":
+                hint = "st.cache_resource instead of st.cache_data, which pickles and copies it" if cache else "a function decorated with @st.cache_resource"
+                self.add("uncached-resource", node, f"`{short}(...)` builds a client or model on every rerun; create it in {hint}")
+            elif self._is_io(name, node) and cache is None:
+                self.add("uncached-io", node, f"`{short}(...)` reads data on every rerun; load it in a function decorated with @st.cache_data")
+            elif name.endswith(".apply") and any(k.arg == "axis" and getattr(k.value, "value", None) in (1, "columns") for k in node.keywords):
+                self.add("row-loop", node, f"`{short}(..., axis=1)` calls Python once per row; use vectorized column operations")
+        self.generic_visit(node)
+    
+    def _is_resource(self, name: str) -> bool:
+        return name in RESOURCE_CALLS or name.rsplit(".", 1)[-1] in RESOURCE_ATTRIBUTES
+    
+    def _is_io(self, name: str, node: ast.Call) -> bool:
+        if name == "open":
+            mode = node.args[1] if len(node.args) > 1 else next((k.value for k in node.keywords if k.arg == "mode"), None)
+            return mode is None or (isinstance(mode, ast.Constant) and "r" in str(mode.value))
+        return name in IO_CALLS or name.startswith(IO_PREFIXES)
+    
+    def _check_iteration(self, iterable: ast.AST, body: List[ast.AST], node: ast.AST):
+        if isinstance(iterable, ast.Call) and isinstance(iterable.func, ast.Attribute):
+            method = iterable.func.attr
+            if method in ("iterrows", "itertuples"):
+                self.add("row-loop", node, f"`{_dotted(iterable.func) or method}()` loops over rows in Python; use vectorized column operations")
+                return
+        # for i in range(len(df)): ... df.iloc[i] ...
+        if isinstance(iterable, ast.Call) and _dotted(iterable.func) == "range" and iterable.args:
+            length = iterable.args[-1]
+            if isinstance(length, ast.Call) and _dotted(length.func) == "len" and length.args:
+                frame = _dotted(length.args[0])
+                for child in (n for stmt in body for n in ast.walk(stmt)):
+                    if isinstance(child, ast.Attribute) and child.attr in ROW_INDEXERS and _dotted(child.value) == frame:
+                        self.add("row-loop", node, f"indexing `{frame}` row by row loops in Python; use vectorized column operations")
+                        return
+    
+    def visit_For(self, node: ast.For):
+        self._check_iteration(node.iter, node.body, node)
+        self.generic_visit(node)
+    
+    def _visit_comprehension(self, node):
+        for generator in node.generators:
+            self._check_iteration(generator.iter, [node], node)
+        self.generic_visit(node)
+    
+    visit_ListComp = visit_SetComp = visit_DictComp = visit_GeneratorExp = _visit_comprehension
+    
+    def visit_With(self, node: ast.With):
+        section = None
+        if len(self.cache) == 1 and not self._section_depth:
+            section = next((s for s in map(self._section, (i.context_expr for i in node.items)) if s), None)
+            names = self._widget_names(node.body) if section else None
+            if names is not None:
+                self.sections.append((node, f"the `with {section}` block", names))
+        # Only the outermost section is suggested, not every block nested in it
+        self._section_depth += bool(section)
+        self.generic_visit(node)
+        self._section_depth -= bool(section)
+    
+    def _section(self, expr: ast.AST) -> Optional[str]:
+        """Name a layout block unless it's the sidebar or a form, which rerun the page anyway"""
+        if isinstance(expr, ast.Call):
+            name = self.resolve(expr.func) or ""
+            method = name.rsplit(".", 1)[-1]
+            if method in SECTIONS and method != "form" and "sidebar" not in name:
+                return _dotted(expr.func)
+            return None
+        # Columns and tabs are usually unpacked first: `with col1:`
+        return _dotted(expr) if isinstance(expr, (ast.Name, ast.Subscript)) and _dotted(expr) else None
+    
+    def _widget_names(self, body: List[ast.stmt]) -> Optional[Set[str]]:
+        """Names assigned from widgets in a block, None if it has no widgets"""
+        found, names = False, set()
+        for node in (n for stmt in body for n in ast.walk(stmt)):
+            if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr in WIDGETS:
+                found = True
+            elif isinstance(node, (ast.Assign, ast.AnnAssign, ast.NamedExpr)) and isinstance(node.value, ast.Call):
+                func = node.value.func
+                if isinstance(func, ast.Attribute) and func.attr in WIDGETS:
+                    targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+                    names.update(n.id for t in targets for n in ast.walk(t) if isinstance(n, ast.Name))
+        return names if found else None
+    
+    def finish(self, tree: ast.Module):
+        """Suggest fragments for widget sections whose values aren't used elsewhere on the page"""
+        if self.uses_fragments:
+            return
+        for section, what, names in self.sections:
+            inside = {id(n) for n in ast.walk(section)}
+            escapes = any(
+                isinstance(n, ast.Name) and n.id in names and isinstance(n.ctx, ast.Load) and id(n) not in inside
+                for n in ast.walk(tree)
+            )
+            if not escapes:
+                self.add("fragment", section, f"widgets in {what} rerun the whole page; move it into a function decorated with @st.fragment so only it reruns")
+
+def lint_source(source: str, path: str = "app.py") -> List[Finding]:
+    """Find code that makes every rerun of a Streamlit script slower than it needs to be"""
+    parts = Path(path).parts
+    if "tests" in parts or parts[-1].startswith("test_"):
+        return []
+    try:
+        tree = ast.parse(source, filename=path)
+    except SyntaxError:
+        return []  # Streamlit reports those itself
+    visitor = _PerfVisitor(path)
+    visitor.visit(tree)
+    if not visitor.imports_streamlit:
+        # A plain module's top level runs once per process when imported, not on every
+        # rerun; its functions still run whenever the page calls them
+        for key in visitor.module_level:
+            del visitor.findings[key]
+    visitor.finish(tree)
+    lines = source.splitlines()
+    return sorted(
+        (finding for finding in visitor.findings.values() if not lines[finding.line - 1].rstrip().endswith(IGNORE_COMMENT)),
+        key=lambda finding: finding.line
+    )
+
+def format_findings(findings: List[Finding]) -> str:
+    """Compact follow-up message asking the model to fix the findings"""
+    lines = [str(finding) for finding in findings]
+    return (
+        "A performance check of the files you just wrote found:\n"
+        + "\n".join(f"- {line}" for line in lines)
+        + "\nRewrite the affected files with these fixed, or reply briefly if a finding is intended."
+    )
\ No newline at end of file
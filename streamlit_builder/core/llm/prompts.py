@@ -57,6 +57,9 @@ Your responses should be formatted as artifacts that describe actions to take.
   - Follow Streamlit's execution flow (top-to-bottom)
   - Implement proper state management using st.session_state
   - Split complex applications into multiple pages using multipage app structure
+  - Fetch remote files (URLs) with dataset_cache.read_csv(url), dataset_cache.read_parquet(url) or
+    dataset_cache.fetch(url) -> local path; dataset_cache.py is already in the project and keeps one
+    revalidated copy per URL for every app on the machine. Wrap loaders in @st.cache_data.
 </streamlit_guidelines>
 
 Example response:
@@ -103,9 +106,22 @@ Create a new Streamlit project named '{project_name}'. Please:
 Make sure to include proper documentation and comments.
 """
 
-def get_system_prompt() -> str:
-    """Returns the system prompt for the LLM"""
-    return SYSTEM_PROMPT
+def get_datasets_prompt(datasets: str) -> str:
+    return f"""
+<datasets>
+  The workspace has these datasets, converted to Parquet in data/:
+{datasets}
+
+  Read them through data_loader.py instead of pd.read_csv on the raw files:
+  - data_loader.query("SELECT ... FROM <dataset> ...") runs SQL with DuckDB (add duckdb to requirements.txt)
+  - data_loader.load("<dataset>", columns=[...], filters=[("col", ">", 0)]) reads only what it needs with Arrow
+  Both are cached; filter and aggregate in the query rather than in pandas.
+</datasets>
+"""
+
+def get_system_prompt(datasets: str = "") -> str:
+    """Returns the system prompt for the LLM, describing the workspace's datasets if any"""
+    return SYSTEM_PROMPT + get_datasets_prompt(datasets) if datasets else SYSTEM_PROMPT
 
 # Export the function
 __all__ = ['get_system_prompt', 'SYSTEM_PROMPT'] 
\ No newline at end of file
@@ -0,0 +1,129 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from ..utils.logger import logger
+from ..utils.metrics import metrics
+from ..core.constants import INSTALL_COALESCE_WINDOW
+from .requirements import parse_requirements, requirement_name
+from .uv_manager import UVManager
+
+@dataclass
+class InstallResult:
+    """Outcome of one requested package"""
+    package: str
+    success: bool
+    returncode: int
+    batch_size: int  # Packages resolved together in the same uv run
+    conflict: Optional[str] = None  # Spec already queued for the same package, if this one wasn't installed
+
+class InstallCoalescer:
+    """Collect package requests and install them with one resolver run
+    
+    Requests made within the coalescing window, or before an explicit flush, share a
+    single `uv pip install`. If that run fails, the packages are retried one by one so
+    each caller learns whether its own package was the problem.
+    """
+    
+    def __init__(self, uv: UVManager, window: Optional[float] = INSTALL_COALESCE_WINDOW, memoize: bool = False):
+        self.uv = uv
+        self.window = window  # None waits for an explicit flush
+        self.memoize = memoize
+        self._pending: Dict[str, str] = {}  # Requirement name -> spec
+        self._futures: Dict[str, asyncio.Future] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._lock = asyncio.Lock()
+    
+    @property
+    def pending(self) -> List[str]:
+        return list(self._pending.values())
+    
+    def request(self, package: str, version: Optional[str] = None) -> asyncio.Future:
+        """Queue a package and return a future for its InstallResult"""
+        spec = f"{package}=={version}" if version else package
+        name = requirement_name(spec)
+        loop = asyncio.get_running_loop()
+        if name in self._futures:
+            queued = self._pending[name]
+            if parse_requirements([spec]) == parse_requirements([queued]):
+                return self._futures[name]  # Already queued; share the result
+            # Installing both would leave whichever ran last; the caller must not assume its own
+            logger.warning(f"Not installing {spec}: {queued} is already queued")
+            metrics.increment("install.conflicts")
+            conflict = loop.create_future()
+            conflict.set_result(InstallResult(spec, False, 1, 0, conflict=queued))
+            return conflict
+        
+        self._pending[name] = spec
+        self._futures[name] = loop.create_future()
+        if self.window is not None and self._timer is None:
+            self._timer = loop.call_later(self.window, lambda: asyncio.ensure_future(self._flush_window()))
+        return self._futures[name]
+    
+    async def install(self, package: str, version: Optional[str] = None) -> InstallResult:
+        """Install a package together with whatever else is requested meanwhile"""
+        return await self.request(package, version)
+    
+    async def flush(self) -> List[InstallResult]:
+        """Install everything queued so far in one run"""
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        
+        async with self._lock:
+            pending, futures = self._pending, self._futures
+            self._pending, self._futures = {}, {}
+            if not pending:
+                return []
+            
+            try:
+                results = await self._install(list(pending.values()))
+            except Exception as e:
+                logger.error(f"Failed to install {', '.join(pending.values())}: {str(e)}")
+                for future in futures.values():
+                    if not future.done():
+                        future.set_exception(e)
+                raise
+            
+            for name, result in zip(pending, results):
+                if not futures[name].done():
+                    futures[name].set_result(result)
+            return results
+    
+    async def flush_and_report(self) -> List[InstallResult]:
+        """Flush and log the outcome of each queued package"""
+        results = await self.flush()
+        for result in results:
+            if result.success:
+                logger.info(f"Installed package: {result.package}")
+            else:
+                logger.error(f"Failed to install {result.package} (exit code {result.returncode})")
+        return results
+    
+    async def _flush_window(self):
+        """Flush when the coalescing window closes; failures reach callers through their futures"""
+        try:
+            await self.flush()
+        except Exception:
+            pass
+    
+    async def _install(self, specs: List[str]) -> List[InstallResult]:
+        """Resolve specs together, falling back to one run per package on failure"""
+        metrics.increment("install.resolves")
+        metrics.increment("install.packages", len(specs))
+        with metrics.timer("install.batch"):
+            returncode = await self.uv.install_packages(specs, memoize=self.memoize)
+        
+        if returncode == 0:
+            logger.info(f"Installed {len(specs)} packages in one run: {', '.join(specs)}")
+            return [InstallResult(spec, True, 0, len(specs)) for spec in specs]
+        if len(specs) == 1:
+            return [InstallResult(specs[0], False, returncode, 1)]
+        
+        logger.warning(f"Installing {', '.join(specs)} together failed, retrying one at a time")
+        results = []
+        for spec in specs:
+            metrics.increment("install.resolves")
+            returncode = await self.uv.install_packages([spec], memoize=self.memoize)
+            results.append(InstallResult(spec, returncode == 0, returncode, 1))
+        return results
\ No newline at end of file
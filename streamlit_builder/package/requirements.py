@@ -0,0 +1,91 @@
+import hashlib
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Union
+
+# Requirements as a name -> version specifier mapping, or as requirement lines
+Requirements = Union[Dict[str, str], List[str]]
+
+_NAME_END = re.compile(r"[\s\[<>=!~;@]")
+
+def requirement_name(spec: str) -> str:
+    """Return the normalized project name of a requirement like `Pandas[excel]>=2`"""
+    return re.sub(r"[-_.]+", "-", _NAME_END.split(spec.strip(), 1)[0]).lower()
+
+def format_requirement(package: str, version: str) -> str:
+    """Join a package and a version specifier; a bare version means an exact pin"""
+    return f"{package}=={version}" if version[:1].isdigit() else f"{package}{version}"
+
+def _normalize_tail(rest: str) -> str:
+    """Normalize what follows a requirement's name: extras and version operators, not URLs or markers"""
+    rest = rest.strip()
+    extras = ""
+    if rest.startswith("["):
+        extras, _, rest = rest.partition("]")
+        extras = re.sub(r"\s+", "", extras).lower() + "]"
+        rest = rest.strip()
+    if rest.startswith("@"):
+        # Direct reference; the URL ends at whitespace and may be case-sensitive
+        url, _, marker = rest[1:].strip().partition(" ")
+        spec = f" @ {url}"
+        marker = marker.strip().removeprefix(";")
+    else:
+        spec, _, marker = rest.partition(";")
+        spec = re.sub(r"\s+", "", spec)
+    marker = marker.strip()
+    return extras + spec + (f"; {marker}" if marker else "")
+
+def parse_requirements(requirements: Requirements) -> Dict[str, str]:
+    """Map normalized names to normalized specs, skipping comments and blank lines"""
+    if isinstance(requirements, dict):
+        lines: Iterable[str] = [format_requirement(pkg, ver) for pkg, ver in requirements.items()]
+    else:
+        # A comment starts a line or follows whitespace; a URL's #fragment is kept
+        lines = [re.sub(r"(^|\s)#.*", "", line) for line in requirements]
+    
+    parsed = {}
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        match = _NAME_END.search(line)
+        rest = line[match.start():] if match else ""
+        name = requirement_name(line)
+        parsed[name] = name + _normalize_tail(rest)
+    return parsed
+
+def requirement_specs(requirements: Requirements) -> List[str]:
+    """Normalize requirements into sorted, de-duplicated requirement specs"""
+    return sorted(parse_requirements(requirements).values())
+
+def requirements_key(requirements: Requirements, python: Optional[str] = None) -> str:
+    """Hash requirements so equivalent sets, in any order or spelling, share a key"""
+    digest = hashlib.sha256("\n".join(requirement_specs(requirements)).encode())
+    digest.update(f"\0python={python or ''}".encode())
+    return digest.hexdigest()[:16]
+
+@dataclass
+class RequirementsDiff:
+    """Specifier changes between two sets of requirements"""
+    added: List[str] = field(default_factory=list)  # Specs of new packages
+    removed: List[str] = field(default_factory=list)  # Names of dropped packages
+    changed: List[str] = field(default_factory=list)  # New specs of packages whose specifier changed
+    
+    @property
+    def is_empty(self) -> bool:
+        return not (self.added or self.removed or self.changed)
+    
+    @property
+    def to_install(self) -> List[str]:
+        return self.added + self.changed
+    
+    def __str__(self) -> str:
+        return f"+{len(self.added)} -{len(self.removed)} ~{len(self.changed)}"
+
+def diff_requirements(old: Dict[str, str], new: Dict[str, str]) -> RequirementsDiff:
+    """Compare two outputs of parse_requirements"""
+    return RequirementsDiff(
+        added=sorted(new[name] for name in new.keys() - old.keys()),
+        removed=sorted(old.keys() - new.keys()),
+        changed=sorted(new[name] for name in new.keys() & old.keys() if new[name] != old[name]),
+    )
\ No newline at end of file
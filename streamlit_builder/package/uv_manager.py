@@ -4,19 +4,56 @@ import tomli
 import tomli_w
 
 from ..utils.logger import logger
+from ..core.constants import REQUIREMENTS_FILE, LOCK_FILE
+from ..core.container.bytecode import BytecodeCompiler
 from ..core.container.terminal import Terminal
+from ..project.entry import find_app_entry
+from .requirements import (
+    Requirements,
+    RequirementsDiff,
+    diff_requirements,
+    format_requirement,
+    parse_requirements,
+    requirement_name,
+)
+from .venv_pool import VenvPool
+from .wheelhouse import Wheelhouse
+
+# Lock lines recording the specifiers the snapshot was taken for; comments to `uv pip sync`
+LOCK_REQUIREMENT_PREFIX = "# requirement: "
+# Full resolution of requirements.txt, kept in the venv so watchers ignore it
+RESOLVED_FILE = "requirements.resolved.txt"
 
 class UVManager:
     """Manages UV virtual environments and package installation"""
     
-    def __init__(self, terminal: Terminal, project_root: Path):
+    def __init__(
+        self,
+        terminal: Terminal,
+        project_root: Path,
+        pool: Optional[VenvPool] = None,
+        wheelhouse: Optional[Wheelhouse] = None,
+        bytecode: Optional[BytecodeCompiler] = None,
+    ):
         self.terminal = terminal
         self.project_root = project_root
         self.venv_path = project_root / ".venv"
+        self.pool = pool  # Source of pre-built environments
+        self.wheelhouse = wheelhouse  # Local wheels to install from without network
+        self.bytecode = bytecode  # Precompiles packages after installs
+        self.lock_path = project_root / LOCK_FILE  # Applied requirements plus exact installed versions
     
-    async def create_venv(self):
-        """Create a new virtual environment"""
+    async def create_venv(self, requirements: Optional[Requirements] = None):
+        """Create a new virtual environment
+        
+        With a pool and known requirements, a pre-built environment is cloned instead when one is ready.
+        """
         try:
+            if not self.venv_path.exists() and self.pool and requirements is not None:
+                if await self.pool.acquire(requirements, self.venv_path):
+                    logger.info("Created virtual environment from pool")
+                    return
+            
             if not self.venv_path.exists():
                 await self.terminal.execute(
                     ["uv", "venv", str(self.venv_path)],
@@ -27,42 +64,163 @@ class UVManager:
             logger.error(f"Failed to create virtual environment: {str(e)}")
             raise
     
-    async def install_requirements(self, requirements: Dict[str, str]):
-        """Install packages from requirements dictionary"""
+    async def install_requirements(self, requirements: Optional[Dict[str, str]] = None) -> Optional[RequirementsDiff]:
+        """Install packages from a requirements dictionary, or from requirements.txt if not given"""
         try:
-            # Create requirements.txt
-            requirements_content = "\n".join(
-                f"{pkg}=={ver}" if ver.startswith("==") else f"{pkg}{ver}"
-                for pkg, ver in requirements.items()
-            )
-            requirements_path = self.project_root / "requirements.txt"
-            requirements_path.write_text(requirements_content)
+            requirements_path = self.project_root / REQUIREMENTS_FILE
+            if requirements is not None:
+                requirements_path.write_text("\n".join(
+                    format_requirement(pkg, ver) for pkg, ver in requirements.items()
+                ))
+            return await self.sync_requirements()
             
-            # Install requirements
-            await self.terminal.execute(
+        except Exception as e:
+            logger.error(f"Failed to install requirements: {str(e)}")
+            raise
+    
+    async def sync_requirements(self) -> Optional[RequirementsDiff]:
+        """Apply only what changed in requirements.txt since the lock snapshot
+        
+        Added and changed specifiers are installed in one run. When packages are removed,
+        the remaining requirements are resolved and the environment synced to that set,
+        so dependencies nothing needs any more go too. Without a snapshot, or when requirements.txt uses pip options, the
+        whole file is installed instead and None is returned.
+        """
+        requirements_path = self.project_root / REQUIREMENTS_FILE
+        lines = requirements_path.read_text().splitlines() if requirements_path.exists() else []
+        applied = self._read_lock_requirements()
+        
+        if applied is None or any(line.strip().startswith("-") for line in lines):
+            await self._check(
                 ["uv", "pip", "install", "-r", str(requirements_path)],
                 "install_requirements"
             )
             logger.info("Installed requirements")
-            
-        except Exception as e:
-            logger.error(f"Failed to install requirements: {str(e)}")
-            raise
+            self._precompile()
+            await self._write_lock(lines)
+            return None
+        
+        diff = diff_requirements(applied, parse_requirements(lines))
+        if diff.is_empty:
+            logger.debug("Requirements unchanged")
+            return diff
+        
+        if diff.to_install:
+            await self._check(["uv", "pip", "install", *diff.to_install], "install_requirements")
+        if diff.removed:
+            await self._remove_orphans(requirements_path)
+        logger.info(f"Applied requirements changes ({diff}): {', '.join(diff.to_install + diff.removed)}")
+        self._precompile()
+        await self._write_lock(lines)
+        return diff
+    
+    async def _remove_orphans(self, requirements_path: Path):
+        """Sync the environment to the resolution of requirements.txt
+        
+        The resolution starts from the locked versions, so packages that are still
+        needed keep theirs and only the ones nothing requires are uninstalled.
+        """
+        resolved_path = self.venv_path / RESOLVED_FILE
+        resolved_path.parent.mkdir(parents=True, exist_ok=True)
+        pins = [line for line in self.lock_path.read_text().splitlines() if not line.startswith("#")]
+        resolved_path.write_text("\n".join(pins) + "\n")  # uv prefers versions already in the output file
+        try:
+            await self._check(
+                ["uv", "pip", "compile", str(requirements_path), "--no-header", "-o", str(resolved_path)],
+                "resolve_requirements"
+            )
+            await self._check(["uv", "pip", "sync", str(resolved_path)], "sync_requirements")
+        finally:
+            resolved_path.unlink(missing_ok=True)
+    
+    async def sync_lock(self):
+        """Converge the environment exactly to the lock snapshot, removing anything else"""
+        if not self.lock_path.exists():
+            raise FileNotFoundError(f"No lock snapshot at {self.lock_path}")
+        await self._check(["uv", "pip", "sync", str(self.lock_path)], "sync_requirements")
+        logger.info("Synced environment to lock snapshot")
+        self._precompile()
+    
+    def _precompile(self):
+        """Compile installed packages in the background, the app's imports first"""
+        if self.bytecode:
+            self.bytecode.submit_packages(find_app_entry(self.project_root))
+    
+    async def _check(self, command: List[str], process_name: str):
+        """Run a uv command, raising if it fails"""
+        returncode = await self._run(command, process_name)
+        if returncode != 0:
+            raise RuntimeError(f"{' '.join(command)} exited with {returncode}")
+    
+    async def _run(self, command: List[str], process_name: str, **kwargs) -> int:
+        """Run a uv command; installs are tried offline from the wheelhouse first"""
+        if not self.wheelhouse or command[:3] not in (["uv", "pip", "install"], ["uv", "pip", "sync"], ["uv", "pip", "compile"]):
+            return await self.terminal.execute(command, process_name, **kwargs)
+        
+        returncode = await self.terminal.execute(command + self.wheelhouse.offline_args(), f"{process_name}_offline", **kwargs)
+        self.wheelhouse.record(returncode == 0)
+        if returncode == 0 or self.wheelhouse.offline_only:
+            return returncode
+        
+        logger.info(f"Wheelhouse is missing packages for {process_name}, installing from the index")
+        return await self.terminal.execute(command, process_name, **kwargs)
+    
+    async def _write_lock(self, lines: List[str]):
+        """Snapshot the applied requirements and the exact versions installed for them"""
+        if await self.terminal.execute(["uv", "pip", "freeze"], "freeze_requirements") != 0:
+            logger.warning("Could not freeze the environment, lock snapshot not updated")
+            return
+        
+        pins = [line for line in self.terminal.get_output("freeze_requirements") if "==" in line or " @ " in line]
+        requirements = parse_requirements([line for line in lines if not line.strip().startswith("-")])
+        header = [f"{LOCK_REQUIREMENT_PREFIX}{spec}" for spec in sorted(requirements.values())]
+        self.lock_path.write_text("\n".join(header + pins) + "\n")
+        
+        # Cache the locked versions so the next install of this lock needs no network
+        if self.wheelhouse and not self.wheelhouse.offline_only:
+            try:
+                await self.wheelhouse.populate(pins, self.python_version())
+            except Exception as e:
+                logger.warning(f"Failed to populate wheelhouse: {str(e)}")
+    
+    def python_version(self) -> Optional[str]:
+        """Return the major.minor Python version of the virtual environment"""
+        config = self.venv_path / "pyvenv.cfg"
+        if not config.exists():
+            return None
+        for line in config.read_text().splitlines():
+            key, _, value = line.partition("=")
+            if key.strip() in ("version_info", "version"):
+                return ".".join(value.strip().split(".")[:2])
+        return None
+    
+    def _read_lock_requirements(self) -> Optional[Dict[str, str]]:
+        """Read the requirements the lock snapshot was taken for"""
+        if not self.lock_path.exists():
+            return None
+        lines = self.lock_path.read_text().splitlines()
+        return parse_requirements([
+            line[len(LOCK_REQUIREMENT_PREFIX):] for line in lines if line.startswith(LOCK_REQUIREMENT_PREFIX)
+        ])
     
     async def install_package(self, package: str, version: Optional[str] = None):
         """Install a single package"""
         try:
-            cmd = ["uv", "pip", "install", package]
-            if version:
-                cmd[-1] = f"{package}=={version}"
-            
-            await self.terminal.execute(cmd, f"install_{package}")
+            await self.install_packages([f"{package}=={version}" if version else package])
             logger.info(f"Installed package: {package}")
             
         except Exception as e:
             logger.error(f"Failed to install {package}: {str(e)}")
             raise
     
+    async def install_packages(self, specs: List[str], memoize: bool = False) -> int:
+        """Install several packages with a single resolution and return uv's exit code"""
+        name = f"install_{requirement_name(specs[0])}" if len(specs) == 1 else "install_packages"
+        returncode = await self._run(["uv", "pip", "install", *specs], name, memoize=memoize)
+        if returncode == 0:
+            self._precompile()
+        return returncode
+    
     async def uninstall_package(self, package: str):
         """Uninstall a package"""
         try:
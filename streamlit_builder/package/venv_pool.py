@@ -0,0 +1,239 @@
+import asyncio
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from ..utils.logger import logger
+from ..utils.metrics import metrics
+from ..core.constants import VENV_POOL_DIR, VENV_POOL_QUOTA_BYTES
+from ..core.container.terminal import Terminal
+from .requirements import Requirements, requirement_specs, requirements_key
+
+def clone_venv(template: Path, dest: Path):
+    """Clone a virtual environment as hardlinks, rewriting files that embed its path
+    
+    Falls back to copying files that can't be linked, e.g. across filesystems. Scripts in
+    bin/ carry the venv's absolute path in shebangs and activate scripts, so they are
+    rewritten as fresh files that no longer share an inode with the template.
+    """
+    dest.mkdir(parents=True, exist_ok=True)
+    for dirpath, dirnames, filenames in os.walk(template):
+        source_dir = Path(dirpath)
+        target_dir = dest / source_dir.relative_to(template)
+        target_dir.mkdir(exist_ok=True)
+        
+        for name in dirnames + filenames:
+            source, target = source_dir / name, target_dir / name
+            if source.is_symlink():
+                os.symlink(os.readlink(source), target)
+            elif source.is_file():
+                try:
+                    os.link(source, target)
+                except OSError:
+                    shutil.copy2(source, target)
+    
+    old, new = str(template).encode(), str(dest).encode()
+    bin_dir = dest / "bin"
+    for path in [*(bin_dir.iterdir() if bin_dir.is_dir() else []), dest / "pyvenv.cfg"]:
+        if path.is_symlink() or not path.is_file():
+            continue
+        data = path.read_bytes()
+        if old in data:
+            rewritten = path.with_name(f".{path.name}.tmp")
+            rewritten.write_bytes(data.replace(old, new))
+            shutil.copymode(path, rewritten)
+            os.replace(rewritten, path)
+
+def disk_usage(path: Path) -> int:
+    """Bytes allocated under a directory, counting hardlinked files once"""
+    seen, total = set(), 0
+    for dirpath, _, filenames in os.walk(path):
+        for name in filenames:
+            try:
+                stat = os.lstat(os.path.join(dirpath, name))
+            except OSError:
+                continue
+            if stat.st_ino not in seen:
+                seen.add(stat.st_ino)
+                total += stat.st_blocks * 512
+    return total
+
+class VenvPool:
+    """Host-wide pool of ready virtual environments keyed by their requirements
+    
+    Each key holds one template venv. Workspaces receive hardlink clones of it, which
+    take milliseconds and almost no disk. A miss builds the template in the background
+    for the next workspace, and the least recently used templates are evicted to keep
+    the pool under its disk quota.
+    
+    Clones share file contents with the template. Installing, upgrading or removing
+    packages in a clone replaces files rather than editing them, so the template is
+    unaffected; editing an installed file in place would leak into it.
+    """
+    
+    def __init__(
+        self,
+        root: Path = VENV_POOL_DIR,
+        quota_bytes: int = VENV_POOL_QUOTA_BYTES,
+        python: Optional[str] = None,
+    ):
+        self.root = root
+        self.quota_bytes = quota_bytes
+        self.python = python  # Interpreter passed to `uv venv --python`, uv's default if None
+        self.terminal = Terminal(root)
+        self._builds: Dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+    
+    def _template(self, key: str) -> Path:
+        return self.root / key / "venv"
+    
+    def _meta_path(self, key: str) -> Path:
+        return self.root / key / "meta.json"
+    
+    def _read_meta(self, key: str) -> Optional[Dict]:
+        try:
+            return json.loads(self._meta_path(key).read_text())
+        except (OSError, ValueError):
+            return None
+    
+    def _touch(self, key: str):
+        """Mark a template as just used"""
+        meta = self._read_meta(key)
+        if meta:
+            meta["last_used"] = time.time()
+            self._meta_path(key).write_text(json.dumps(meta))
+    
+    def is_ready(self, requirements: Requirements) -> bool:
+        """Check whether a venv for requirements can be handed out right now"""
+        return self._read_meta(requirements_key(requirements, self.python)) is not None
+    
+    async def acquire(self, requirements: Requirements, dest: Path) -> bool:
+        """Clone a ready venv for requirements into dest
+        
+        dest must be missing or empty. Returns False on a miss, after starting a
+        background build so the next request for the same requirements hits.
+        """
+        key = requirements_key(requirements, self.python)
+        if self._read_meta(key) is None:
+            self.misses += 1
+            metrics.increment("venv_pool.misses")
+            self.prewarm(requirements)
+            return False
+        
+        if dest.exists() and any(dest.iterdir()):
+            logger.warning(f"Not cloning pooled venv into non-empty {dest}")
+            return False
+        
+        start = time.perf_counter()
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, clone_venv, self._template(key), dest)
+        except Exception as e:
+            logger.error(f"Failed to clone pooled venv {key}: {str(e)}")
+            shutil.rmtree(dest, ignore_errors=True)
+            raise
+        
+        elapsed = time.perf_counter() - start
+        metrics.record("venv_pool.clone", elapsed)
+        self.hits += 1
+        metrics.increment("venv_pool.hits")
+        self._touch(key)
+        logger.info(f"Cloned pooled venv {key} into {dest} in {elapsed:.2f}s")
+        return True
+    
+    def prewarm(self, requirements: Requirements) -> asyncio.Task:
+        """Build the venv for requirements in the background unless it's ready or building"""
+        key = requirements_key(requirements, self.python)
+        task = self._builds.get(key)
+        if task is None or task.done():
+            task = asyncio.create_task(self._refill(key, requirement_specs(requirements)))
+            self._builds[key] = task
+        return task
+    
+    async def _refill(self, key: str, specs: List[str]) -> bool:
+        """Build a template, then evict others if the pool is over quota"""
+        try:
+            if self._read_meta(key) is None:
+                with metrics.timer("venv_pool.build"):
+                    if not await self._build(key, specs):
+                        return False
+            await asyncio.get_running_loop().run_in_executor(None, self.evict, key)
+            return True
+        except Exception as e:
+            logger.error(f"Failed to build pooled venv {key}: {str(e)}")
+            return False
+        finally:
+            self._builds.pop(key, None)
+    
+    async def _build(self, key: str, specs: List[str]) -> bool:
+        """Create and populate a template venv; it becomes visible once its metadata is written"""
+        template = self._template(key)
+        shutil.rmtree(template, ignore_errors=True)  # Leftover of an interrupted build
+        template.parent.mkdir(parents=True, exist_ok=True)
+        
+        command = ["uv", "venv", str(template)]
+        if self.python:
+            command += ["--python", self.python]
+        if await self.terminal.execute(command, f"pool_venv_{key}") != 0:
+            logger.error(f"Failed to create pooled venv {key}")
+            return False
+        
+        if specs:
+            command = ["uv", "pip", "install", "--python", str(template / "bin" / "python"), *specs]
+            if await self.terminal.execute(command, f"pool_install_{key}") != 0:
+                logger.error(f"Failed to install {', '.join(specs)} into pooled venv {key}")
+                shutil.rmtree(template, ignore_errors=True)
+                return False
+        
+        now = time.time()
+        meta = {"requirements": specs, "python": self.python, "created": now, "last_used": now}
+        self._meta_path(key).write_text(json.dumps(meta))
+        logger.info(f"Built pooled venv {key} for {', '.join(specs) or 'no requirements'}")
+        return True
+    
+    def evict(self, keep: Optional[str] = None) -> List[str]:
+        """Remove least recently used templates until the pool fits its quota"""
+        if not self.root.exists():
+            return []
+        
+        entries = []
+        for entry in self.root.iterdir():
+            meta = self._read_meta(entry.name)
+            if meta is not None:
+                entries.append((meta.get("last_used", 0), entry.name, disk_usage(entry)))
+        
+        total = sum(size for _, _, size in entries)
+        evicted = []
+        for _, key, size in sorted(entries):
+            if total <= self.quota_bytes:
+                break
+            if key == keep:
+                continue
+            # Drop the metadata first so the template stops being handed out
+            self._meta_path(key).unlink(missing_ok=True)
+            shutil.rmtree(self.root / key, ignore_errors=True)
+            total -= size
+            evicted.append(key)
+        
+        if evicted:
+            metrics.increment("venv_pool.evictions", len(evicted))
+            logger.info(f"Evicted {len(evicted)} pooled venvs to stay under {self.quota_bytes} bytes")
+        return evicted
+    
+    async def close(self, cancel: bool = False):
+        """Let background builds finish, or stop them with cancel, then release the terminal
+        
+        A build started by a miss is what makes the next session hit, so it is
+        only thrown away on an explicit cancel.
+        """
+        tasks = list(self._builds.values())
+        if cancel:
+            for task in tasks:
+                task.cancel()
+        elif tasks:
+            logger.info(f"Waiting for {len(tasks)} pooled venv builds to finish")
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self.terminal.cleanup()
\ No newline at end of file
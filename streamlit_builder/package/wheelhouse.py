@@ -0,0 +1,95 @@
+import importlib.util
+import re
+import sys
+from pathlib import Path
+from typing import List, Optional, Set, Tuple
+
+from ..utils.logger import logger
+from ..utils.metrics import metrics
+from ..core.constants import WHEELHOUSE_DIR
+from ..core.container.terminal import Terminal
+
+def _wheel_key(name: str, version: str) -> Tuple[str, str]:
+    """Normalize a distribution name and version the way wheel filenames spell them"""
+    return re.sub(r"[-_.]+", "_", name).lower(), version.lower()
+
+def _pip_available() -> bool:
+    """Whether this interpreter can run `pip download`; uv-managed environments often lack pip"""
+    return importlib.util.find_spec("pip") is not None
+
+class Wheelhouse:
+    """Shared local directory of wheels that installs can use without network access
+    
+    Installs first run with `--offline --no-index --find-links` against this directory.
+    When that fails because something isn't cached, the install goes to the index and
+    the pins it produced are downloaded here afterwards, so the next install is offline.
+    """
+    
+    def __init__(self, root: Path = WHEELHOUSE_DIR, offline_only: bool = False):
+        self.root = root
+        self.offline_only = offline_only  # Never fall back to the index
+        self.terminal = Terminal(root)
+        self.hits = 0
+        self.misses = 0
+        self._warned_no_pip = False
+    
+    def offline_args(self) -> List[str]:
+        """uv pip arguments that restrict resolution to the wheelhouse"""
+        return ["--offline", "--no-index", "--find-links", str(self.root)]
+    
+    def cached(self) -> Set[Tuple[str, str]]:
+        """(name, version) of every wheel in the wheelhouse"""
+        if not self.root.exists():
+            return set()
+        return {_wheel_key(*path.name.split("-")[:2]) for path in self.root.glob("*.whl")}
+    
+    def missing(self, pins: List[str]) -> List[str]:
+        """Return the `name==version` pins that have no wheel here"""
+        cached = self.cached()
+        missing = []
+        for pin in pins:
+            name, sep, version = pin.partition("==")
+            if sep and " @ " not in pin and _wheel_key(name.strip(), version.strip()) not in cached:
+                missing.append(pin)
+        return missing
+    
+    def record(self, hit: bool):
+        """Count an install that was or wasn't served from the wheelhouse"""
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        metrics.increment("wheelhouse.hits" if hit else "wheelhouse.misses")
+    
+    async def populate(self, pins: List[str], python_version: Optional[str] = None) -> List[str]:
+        """Download wheels for pins not cached yet and return the ones that couldn't be fetched
+        
+        Only binary wheels are fetched; packages published as sdists only stay uncached.
+        """
+        missing = self.missing(pins)
+        if not missing:
+            return []
+        
+        if not _pip_available():
+            if not self._warned_no_pip:
+                logger.warning(f"Wheelhouse not populated: pip is not installed in {sys.executable}")
+                self._warned_no_pip = True
+            metrics.increment("wheelhouse.no_pip")
+            return missing
+        
+        self.root.mkdir(parents=True, exist_ok=True)
+        command = [sys.executable, "-m", "pip", "download", "--quiet", "--no-deps", "--only-binary", ":all:", "-d", str(self.root)]
+        if python_version:
+            command += ["--python-version", python_version]
+        
+        if await self.terminal.execute(command + missing, "wheelhouse_download") != 0:
+            # One unavailable wheel fails the whole batch; fetch the rest one by one
+            for pin in missing:
+                await self.terminal.execute(command + [pin], "wheelhouse_download")
+        
+        failed = self.missing(missing)
+        logger.info(f"Wheelhouse: cached {len(missing) - len(failed)} new wheels, {len(failed)} unavailable")
+        return failed
+    
+    def report(self) -> str:
+        return f"{self.hits} installs served offline, {self.misses} needed the index, {len(self.cached())} wheels cached"
\ No newline at end of file
@@ -0,0 +1,219 @@
+"""Shared on-disk cache for remote datasets
+
+Copied into generated projects as dataset_cache.py; needs only the standard
+library. Every app on the host resolves URLs through the same cache directory:
+
+    import dataset_cache
+    df = dataset_cache.read_csv("https://example.com/data.csv.gz")
+    path = dataset_cache.fetch("https://example.com/model.bin")
+
+A cached copy is used as is for max_age seconds (the server's Cache-Control
+max-age, or DEFAULT_MAX_AGE), then revalidated with If-None-Match and
+If-Modified-Since, so an unchanged file costs one 304 instead of a download.
+Concurrent fetches of a URL, from threads or other processes, wait on a file lock
+and reuse the one download. The directory is kept under its size limit by evicting
+the least recently used files. If the server can't be reached, a stale copy is
+served rather than failing the app.
+
+STREAMLIT_BUILDER_DATASET_CACHE and STREAMLIT_BUILDER_DATASET_CACHE_BYTES override
+the directory and the size limit.
+"""
+import fcntl
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from contextlib import contextmanager
+from pathlib import Path
+
+DEFAULT_DIR = Path.home() / ".cache" / "streamlit_builder" / "datasets"
+DEFAULT_MAX_BYTES = 2 * 2**30
+DEFAULT_MAX_AGE = 300.0  # Seconds a copy is used before revalidating, unless the server says otherwise
+TIMEOUT = 60.0
+
+stats = {"hits": 0, "revalidated": 0, "downloads": 0, "stale": 0, "evictions": 0}
+
+def cache_dir() -> Path:
+    path = Path(os.environ.get("STREAMLIT_BUILDER_DATASET_CACHE", DEFAULT_DIR))
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+def max_bytes() -> int:
+    return int(os.environ.get("STREAMLIT_BUILDER_DATASET_CACHE_BYTES", DEFAULT_MAX_BYTES))
+
+def meta_dir() -> Path:
+    """Metadata and locks live apart from data files, whose names end in any URL suffix"""
+    path = cache_dir() / "meta"
+    path.mkdir(exist_ok=True)
+    return path
+
+def _paths(url: str):
+    """Data file, metadata and lock file of a URL; the data file keeps the URL's suffixes"""
+    key = hashlib.sha256(url.encode()).hexdigest()[:32]
+    name = Path(urllib.parse.urlparse(url).path).name
+    suffix = "".join(re.findall(r"\.[A-Za-z0-9]{1,8}", name)[-2:])
+    meta = meta_dir()
+    return cache_dir() / f"{key}{suffix}", meta / f"{key}.json", meta / f"{key}.lock"
+
+def _read_meta(path: Path):
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+
+def _write_meta(path: Path, meta: dict):
+    tmp = path.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(meta))
+    os.replace(tmp, path)
+
+def _fresh(meta: dict, data: Path, max_age) -> bool:
+    if not data.exists():
+        return False
+    age = meta.get("max_age", DEFAULT_MAX_AGE) if max_age is None else max_age
+    return time.time() - meta.get("checked", 0) < age
+
+def _server_max_age(headers):
+    control = headers.get("Cache-Control", "")
+    if "no-cache" in control or "no-store" in control:
+        return 0.0
+    match = re.search(r"max-age=(\d+)", control)
+    return float(match.group(1)) if match else DEFAULT_MAX_AGE
+
+@contextmanager
+def _locked(lock_path: Path, blocking: bool = True):
+    """Exclusive lock shared by threads and processes; yields False if not blocking and taken"""
+    with open(lock_path, "a") as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+def _touch(data: Path):
+    """Mark a copy as used; eviction goes by modification time"""
+    try:
+        os.utime(data)
+    except OSError:
+        pass
+
+def fetch(url: str, max_age=None, headers=None) -> Path:
+    """Local path of an up-to-date copy of url, downloading or revalidating as needed"""
+    data, meta_path, lock_path = _paths(url)
+    meta = _read_meta(meta_path)
+    if meta and _fresh(meta, data, max_age):
+        stats["hits"] += 1
+        _touch(data)
+        return data
+    
+    with _locked(lock_path):
+        # Another thread or process may have refreshed it while we waited
+        meta = _read_meta(meta_path)
+        if meta and _fresh(meta, data, max_age):
+            stats["hits"] += 1
+            _touch(data)
+            return data
+        
+        request = urllib.request.Request(url, headers=dict(headers or {}))
+        if meta and data.exists():
+            if meta.get("etag"):
+                request.add_header("If-None-Match", meta["etag"])
+            if meta.get("last_modified"):
+                request.add_header("If-Modified-Since", meta["last_modified"])
+        try:
+            response = urllib.request.urlopen(request, timeout=TIMEOUT)  # perf: ignore
+        except urllib.error.HTTPError as e:
+            if e.code == 304 and meta:
+                meta.update(checked=time.time(), max_age=_server_max_age(e.headers))
+                _write_meta(meta_path, meta)
+                stats["revalidated"] += 1
+                _touch(data)
+                return data
+            if meta and data.exists() and e.code >= 500:
+                stats["stale"] += 1
+                return data
+            raise
+        except (urllib.error.URLError, OSError):
+            if meta and data.exists():
+                stats["stale"] += 1
+                return data
+            raise
+        
+        with response:
+            fd, tmp = tempfile.mkstemp(dir=data.parent, prefix=".download-")
+            try:
+                with os.fdopen(fd, "wb") as out:
+                    shutil.copyfileobj(response, out, 1024 * 1024)
+                os.replace(tmp, data)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+            _write_meta(meta_path, {
+                "url": url,
+                "file": data.name,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "size": data.stat().st_size,
+                "checked": time.time(),
+                "max_age": _server_max_age(response.headers),
+            })
+        stats["downloads"] += 1
+    
+    evict(keep=data)
+    return data
+
+def evict(keep=None):
+    """Remove least recently used copies until the cache fits its size limit"""
+    root = cache_dir()
+    entries = []
+    for meta_path in meta_dir().glob("*.json"):
+        meta = _read_meta(meta_path)
+        if not meta or not meta.get("file"):
+            continue
+        data = root / meta["file"]
+        try:
+            stat = data.stat()
+        except FileNotFoundError:
+            continue  # Evicted by another process meanwhile
+        entries.append((stat.st_mtime, stat.st_size, data, meta_path))
+    total = sum(size for _, size, _, _ in entries)
+    limit = max_bytes()
+    for _, size, data, meta_path in sorted(entries, key=lambda entry: entry[0]):
+        if total <= limit:
+            break
+        if data == keep:
+            continue
+        with _locked(meta_path.with_suffix(".lock"), blocking=False) as acquired:
+            if not acquired:
+                continue  # Being downloaded or revalidated right now
+            data.unlink(missing_ok=True)
+            meta_path.unlink(missing_ok=True)
+        total -= size
+        stats["evictions"] += 1
+
+def read_csv(url: str, max_age=None, **kwargs):
+    """pandas.read_csv of a cached copy; compression is inferred from the URL's suffix"""
+    import pandas as pd
+    
+    return pd.read_csv(fetch(url, max_age=max_age), **kwargs)  # perf: ignore
+
+def read_parquet(url: str, max_age=None, **kwargs):
+    import pandas as pd
+    
+    return pd.read_parquet(fetch(url, max_age=max_age), **kwargs)  # perf: ignore
+
+def clear():
+    """Remove every cached copy"""
+    for directory in (cache_dir(), meta_dir()):
+        for path in directory.iterdir():
+            if path.is_file():
+                path.unlink(missing_ok=True)
\ No newline at end of file
@@ -0,0 +1,303 @@
+import asyncio
+import json
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from ..utils.logger import logger
+from ..utils.metrics import metrics
+from ..core.constants import (
+    DATASETS_DIR,
+    DATASET_CATALOG,
+    DATASET_SOURCE_SUFFIXES,
+    DATASET_BLOCK_SIZE,
+    DATASET_ROW_GROUP_SIZE,
+    DATASET_PROMPT_MAX_COLUMNS,
+)
+from .templates import DATA_LOADER_CONTENT, DATASET_CACHE_CONTENT
+
+DATA_LOADER_FILE = "data_loader.py"
+DATASET_CACHE_FILE = "dataset_cache.py"
+
+def _write_if_changed(path: Path, content: str):
+    if not path.exists() or path.read_text() != content:
+        path.write_text(content)
+
+def install_dataset_cache(project_root: Path):
+    """Put dataset_cache.py next to the app so generated code can fetch remote files through the shared cache"""
+    _write_if_changed(project_root / DATASET_CACHE_FILE, DATASET_CACHE_CONTENT)
+
+@dataclass
+class ColumnInfo:
+    name: str
+    type: str  # Arrow type, e.g. int64, string, timestamp[s]
+    null_count: int = 0
+    min: Optional[str] = None  # Rendered as text so any type fits in the catalog
+    max: Optional[str] = None
+
+@dataclass
+class DatasetInfo:
+    """A source file converted to Parquet, with its schema and statistics"""
+    name: str  # Table name in data_loader.query and file stem of the Parquet file
+    source: str  # Relative to the workspace
+    path: str  # Parquet file, relative to the workspace
+    rows: int
+    size_bytes: int  # Parquet size
+    source_size: int
+    source_mtime: float
+    columns: List[ColumnInfo] = field(default_factory=list)
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> "DatasetInfo":
+        return cls(**{**data, "columns": [ColumnInfo(**column) for column in data.get("columns", [])]})
+    
+    def describe(self, max_columns: int = DATASET_PROMPT_MAX_COLUMNS) -> str:
+        """Schema and statistics in a few lines for the model's prompt"""
+        lines = [f"{self.name}: {self.rows} rows from {self.source} ({self.size_bytes / 2**20:.1f} MiB Parquet)"]
+        for column in self.columns[:max_columns]:
+            stats = [f"{column.null_count} nulls"] if column.null_count else []
+            if column.min is not None:
+                stats.append(f"{column.min} .. {column.max}")
+            lines.append(f"  - {column.name}: {column.type}" + (f" ({', '.join(stats)})" if stats else ""))
+        if len(self.columns) > max_columns:
+            lines.append(f"  - ... {len(self.columns) - max_columns} more columns")
+        return "\n".join(lines)
+
+def _render(value) -> Optional[str]:
+    if value is None:
+        return None
+    text = str(value) if value != "" else '""'
+    return text if len(text) <= 40 else text[:37] + "..."
+
+class _ColumnStats:
+    """Null counts and min/max accumulated over record batches"""
+    
+    def __init__(self, schema):
+        self.schema = schema
+        self.nulls = [0] * len(schema)
+        self.bounds: List[Optional[tuple]] = [None] * len(schema)
+    
+    def update(self, batch):
+        import pyarrow.compute as pc
+        
+        for index, array in enumerate(batch.columns):
+            self.nulls[index] += array.null_count
+            try:
+                low, high = pc.min_max(array).values()
+            except Exception:
+                continue  # Nested or binary types have no ordering
+            if not low.is_valid:
+                continue
+            low, high = low.as_py(), high.as_py()
+            current = self.bounds[index]
+            self.bounds[index] = (low, high) if current is None else (min(current[0], low), max(current[1], high))
+    
+    def columns(self) -> List[ColumnInfo]:
+        return [
+            ColumnInfo(
+                name=column.name,
+                type=str(column.type),
+                null_count=self.nulls[index],
+                min=_render(self.bounds[index][0]) if self.bounds[index] else None,
+                max=_render(self.bounds[index][1]) if self.bounds[index] else None,
+            )
+            for index, column in enumerate(self.schema)
+        ]
+
+def _read_json(source: Path):
+    """Newline-delimited JSON, or a JSON array of records"""
+    import pyarrow as pa
+    import pyarrow.json as pj
+    
+    try:
+        return pj.read_json(source)
+    except pa.ArrowInvalid:
+        records = json.loads(source.read_text())
+        if isinstance(records, dict):
+            records = next((v for v in records.values() if isinstance(v, list)), [records])
+        return pa.Table.from_pylist(records)
+
+def convert_to_parquet(source: Path, target: Path) -> tuple:
+    """Write a CSV or JSON file as Parquet; returns (rows, column infos)
+    
+    CSV is streamed in blocks so memory stays bounded for large files; if a later
+    block doesn't fit the types inferred from the first, the file is read whole so
+    inference sees every row.
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pc
+    import pyarrow.parquet as pq
+    
+    target.parent.mkdir(parents=True, exist_ok=True)
+    partial = target.with_suffix(".parquet.partial")
+    
+    def write(batches, schema) -> tuple:
+        stats, rows = _ColumnStats(schema), 0
+        with pq.ParquetWriter(partial, schema, compression="zstd") as writer:
+            for batch in batches:
+                stats.update(batch)
+                rows += batch.num_rows
+                writer.write_table(pa.Table.from_batches([batch], schema), row_group_size=DATASET_ROW_GROUP_SIZE)
+        return rows, stats.columns()
+    
+    suffixes = "".join(source.suffixes[-2:]).lower()
+    parse = pc.ParseOptions(delimiter="\t" if ".tsv" in suffixes else ",")
+    try:
+        if ".csv" in suffixes or ".tsv" in suffixes:
+            try:
+                reader = pc.open_csv(
+                    str(source), read_options=pc.ReadOptions(block_size=DATASET_BLOCK_SIZE), parse_options=parse
+                )
+                result = write(reader, reader.schema)
+            except pa.ArrowInvalid as e:
+                logger.debug(f"Streaming {source.name} failed, reading it whole: {str(e)}")
+                table = pc.read_csv(str(source), parse_options=parse)
+                result = write(table.to_batches(DATASET_ROW_GROUP_SIZE), table.schema)
+        else:
+            table = _read_json(source)
+            result = write(table.to_batches(DATASET_ROW_GROUP_SIZE), table.schema)
+        partial.replace(target)
+        return result
+    finally:
+        partial.unlink(missing_ok=True)
+
+class DatasetCatalog:
+    """Parquet copies of a workspace's CSV and JSON files, described for the model
+    
+    Source files dropped into data/ are converted once to data/<name>.parquet, and
+    again only when they change; deleting a source drops its dataset. The catalog in data/catalog.json keeps each
+    dataset's schema and statistics, which go into the prompt in place of raw
+    samples. Generated code reads the Parquet through data_loader.py, written next
+    to the app, which queries it lazily with DuckDB or memory-maps it with Arrow.
+    """
+    
+    def __init__(self, project_root: Path):
+        self.project_root = project_root
+        self.data_dir = project_root / DATASETS_DIR
+        self.catalog_path = self.data_dir / DATASET_CATALOG
+    
+    def datasets(self) -> Dict[str, DatasetInfo]:
+        if not self.catalog_path.exists():
+            return {}
+        try:
+            entries = json.loads(self.catalog_path.read_text())
+            return {entry["name"]: DatasetInfo.from_dict(entry) for entry in entries}
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable dataset catalog: {str(e)}")
+            return {}
+    
+    def _save(self, datasets: Dict[str, DatasetInfo]):
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.catalog_path.write_text(json.dumps([asdict(info) for info in datasets.values()], indent=2))
+    
+    def sources(self) -> List[Path]:
+        """CSV and JSON files in data/ that can be ingested, leaving out the ones written here"""
+        if not self.data_dir.exists():
+            return []
+        return sorted(
+            path for path in self.data_dir.rglob("*")
+            if path.is_file() and not self._is_generated(path)
+            and any(path.name.lower().endswith(suffix) for suffix in DATASET_SOURCE_SUFFIXES)
+        )
+    
+    def _is_generated(self, path: Path) -> bool:
+        """The catalog itself and hidden temporary files"""
+        return path == self.catalog_path or path.name.startswith(".")
+    
+    def _relative(self, source: Path) -> str:
+        """How the catalog records a source: relative to the workspace when it's inside"""
+        return str(source.relative_to(self.project_root)) if source.is_relative_to(self.project_root) else str(source)
+    
+    def dataset_name(self, source: Path, datasets: Optional[Dict[str, DatasetInfo]] = None) -> str:
+        """Table name for a source: its path below data/ as an identifier, unique in the catalog
+        
+        A source the catalog already has keeps its name. A name another source took
+        first gets a numeric suffix, so data/sales.csv and data/sales.json both load.
+        """
+        datasets = self.datasets() if datasets is None else datasets
+        relative = self._relative(source)
+        for info in datasets.values():
+            if info.source == relative:
+                return info.name
+        
+        parts = source.relative_to(self.data_dir).parts if source.is_relative_to(self.data_dir) else (source.name,)
+        stem = "_".join([*parts[:-1], parts[-1].split(".", 1)[0]])
+        base = "".join(c if c.isalnum() else "_" for c in stem.lower()).strip("_")
+        base = base if base and not base[0].isdigit() else f"t_{base}"
+        name, suffix = base, 2
+        while name in datasets:
+            name, suffix = f"{base}_{suffix}", suffix + 1
+        return name
+    
+    def prune(self) -> Dict[str, DatasetInfo]:
+        """Drop datasets whose source file is gone, with their Parquet; returns the rest"""
+        datasets = self.datasets()
+        removed = [name for name, info in datasets.items() if not (self.project_root / info.source).exists()]
+        for name in removed:
+            (self.project_root / datasets.pop(name).path).unlink(missing_ok=True)
+        if removed:
+            self._save(datasets)
+            logger.info(f"Dropped datasets whose source was deleted: {', '.join(removed)}")
+        return datasets
+    
+    async def ingest(self, source: Path, name: Optional[str] = None) -> DatasetInfo:
+        """Convert a source file to Parquet unless the catalog already has it up to date"""
+        source = source if source.is_absolute() else self.project_root / source
+        datasets = self.prune()
+        name = name or self.dataset_name(source, datasets)
+        stat = source.stat()
+        current = datasets.get(name)
+        target = self.data_dir / f"{name}.parquet"
+        if (
+            current and current.source_size == stat.st_size and current.source_mtime == stat.st_mtime
+            and current.source == self._relative(source) and target.exists()
+        ):
+            return current
+        
+        start = time.perf_counter()
+        rows, columns = await asyncio.get_running_loop().run_in_executor(None, convert_to_parquet, source, target)
+        info = DatasetInfo(
+            name=name,
+            source=self._relative(source),
+            path=str(target.relative_to(self.project_root)),
+            rows=rows,
+            size_bytes=target.stat().st_size,
+            source_size=stat.st_size,
+            source_mtime=stat.st_mtime,
+            columns=columns,
+        )
+        datasets = self.datasets()  # Another ingest may have finished meanwhile
+        datasets[name] = info
+        self._save(datasets)
+        self.write_loader()
+        
+        elapsed = time.perf_counter() - start
+        metrics.record("datasets.ingest", elapsed)
+        logger.info(
+            f"Converted {info.source} to {info.path}: {rows} rows, "
+            f"{stat.st_size / 2**20:.1f} -> {info.size_bytes / 2**20:.1f} MiB in {elapsed:.2f}s"
+        )
+        return info
+    
+    async def ingest_all(self) -> List[DatasetInfo]:
+        """Ingest every new or changed source file in data/ and drop the deleted ones"""
+        self.prune()
+        infos = []
+        for source in self.sources():
+            try:
+                infos.append(await self.ingest(source))
+            except Exception as e:
+                logger.error(f"Failed to ingest {source.name}: {str(e)}")
+        return infos
+    
+    def write_loader(self):
+        """Put data_loader.py next to the app so generated code can import it"""
+        _write_if_changed(self.project_root / DATA_LOADER_FILE, DATA_LOADER_CONTENT)
+    
+    def prompt_context(self) -> str:
+        """Describe the datasets for the system prompt; empty if there are none"""
+        datasets = self.datasets()
+        if not datasets:
+            return ""
+        return "\n".join(info.describe() for info in datasets.values())
\ No newline at end of file
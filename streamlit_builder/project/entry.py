@@ -0,0 +1,12 @@
+from pathlib import Path
+from typing import Optional
+
+from ..core.constants import APP_ENTRY_FILES
+
+def find_app_entry(project_root: Path) -> Optional[Path]:
+    """The app's entry point: the first of APP_ENTRY_FILES in the project, if any"""
+    for name in APP_ENTRY_FILES:
+        entry = project_root / name
+        if entry.is_file():
+            return entry
+    return None
\ No newline at end of file
@@ -5,6 +5,7 @@ import tomli_w
 from ..utils.logger import logger
 from ..core.container.webcontainer import WebContainer
 from .templates import Template, BasicTemplate
+from .templates.performance import DashboardTemplate, SQLDashboardTemplate
 
 class ProjectManager:
     """Manages project creation and configuration"""
@@ -12,7 +13,9 @@ class ProjectManager:
     def __init__(self, container: WebContainer):
         self.container = container
         self.templates: Dict[str, Template] = {
-            "basic": BasicTemplate()
+            "basic": BasicTemplate(),
+            "dashboard": DashboardTemplate(),
+            "sql": SQLDashboardTemplate(),
         }
     
     async def create_project(
@@ -1,6 +1,76 @@
 from pathlib import Path
 from typing import Dict, Any
 
+# Standalone module apps fetch remote files through; see its docstring
+DATASET_CACHE_CONTENT = (Path(__file__).parent.parent / "_dataset_cache.py").read_text()
+
+DATA_LOADER_CONTENT = '''
+\"\"\"Read the Parquet datasets in data/ without loading whole files
+
+Datasets are listed in data/catalog.json. query() runs SQL over them with DuckDB,
+each dataset being a table named after it, so only the rows and columns the query
+needs are read. load() memory-maps one dataset with Arrow, optionally reading just
+some columns or rows matching filters. Results are cached until a dataset changes.
+\"\"\"
+import json
+from pathlib import Path
+
+import pandas as pd
+import streamlit as st
+
+DATA_DIR = Path(__file__).parent / "data"
+CATALOG = DATA_DIR / "catalog.json"
+
+def _version() -> float:
+    return CATALOG.stat().st_mtime if CATALOG.exists() else 0.0
+
+def datasets() -> dict:
+    \"\"\"Dataset name -> catalog entry with its schema and statistics\"\"\"
+    if not CATALOG.exists():
+        return {}
+    return {entry["name"]: entry for entry in json.loads(CATALOG.read_text())}
+
+def dataset_path(name: str) -> Path:
+    path = DATA_DIR / f"{name}.parquet"
+    if not path.exists():
+        raise FileNotFoundError(f"No dataset {name!r}; available: {', '.join(datasets()) or 'none'}")
+    return path
+
+@st.cache_resource(max_entries=1)
+def _connection(version: float):
+    import duckdb
+    
+    connection = duckdb.connect()
+    for name in datasets():
+        path = dataset_path(name).as_posix().replace("'", "''")
+        connection.execute(f'CREATE VIEW "{name}" AS SELECT * FROM read_parquet(\\'{path}\\')')
+    return connection
+
+@st.cache_data(show_spinner=False)
+def _query(sql: str, params: tuple, version: float) -> pd.DataFrame:
+    try:
+        cursor = _connection(version).cursor()
+    except ImportError:
+        raise ImportError("query() needs duckdb; install it or use load() with columns and filters") from None
+    return cursor.execute(sql, list(params)).df()
+
+def query(sql: str, params: tuple = ()) -> pd.DataFrame:
+    \"\"\"Run SQL over the datasets with DuckDB, e.g. query("SELECT city, count(*) FROM trips GROUP BY city")\"\"\"
+    return _query(sql, tuple(params), _version())
+
+@st.cache_data(show_spinner=False)
+def _load(name: str, columns: tuple | None, filters: tuple | None, version: float) -> pd.DataFrame:
+    import pyarrow.parquet as pq
+    
+    return pq.read_table(
+        dataset_path(name), columns=list(columns) if columns else None, filters=list(filters) if filters else None, memory_map=True
+    ).to_pandas()
+
+def load(name: str, columns: list | None = None, filters: list | None = None) -> pd.DataFrame:
+    \"\"\"Read a dataset, optionally only some columns and rows, e.g. filters=[("year", ">=", 2020)]\"\"\"
+    return _load(name, tuple(columns) if columns else None, tuple(map(tuple, filters)) if filters else None, _version())
+'''.strip()
+
 class Template:
     """Base class for project templates"""
     def __init__(self, name: str, description: str):
@@ -28,6 +98,8 @@ class BasicTemplate(Template):
             "app.py": self._get_app_content(),
             "utils.py": self._get_utils_content(),
             "config.py": self._get_config_content(),
+            "data_loader.py": DATA_LOADER_CONTENT,
+            "dataset_cache.py": DATASET_CACHE_CONTENT,
         }
     
     def get_dependencies(self) -> Dict[str, str]:
@@ -35,6 +107,7 @@ class BasicTemplate(Template):
             "streamlit": ">=1.32.0",
             "pandas": ">=2.2.0",
             "plotly": ">=5.18.0",
+            "pyarrow": ">=14.0.0",
         }
     
     def _get_app_content(self) -> str:
@@ -60,20 +133,20 @@ if __name__ == "__main__":
     def _get_utils_content(self) -> str:
         return '''
 import pandas as pd
-from pathlib import Path
 import streamlit as st
 
-@st.cache_data
-def load_data(filepath: Path | str | None = None):
-    """Load and cache data"""
+import data_loader
+
+def load_data(name: str | None = None, columns: list | None = None):
+    """Load a dataset from data/, converted to Parquet by the builder"""
     try:
-        if filepath is None:
-            # Generate sample data if no file provided
+        if name is None:
+            # Generate sample data if no dataset given
             return pd.DataFrame({
                 'x': range(10),
                 'y': range(10)
             })
-        return pd.read_csv(filepath)
+        return data_loader.load(name, columns=columns)
     except Exception as e:
         st.error(f"Error loading data: {str(e)}")
         return None
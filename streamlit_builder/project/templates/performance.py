@@ -0,0 +1,338 @@
+from typing import Dict, List, Tuple
+
+from . import Template, DATA_LOADER_CONTENT, DATASET_CACHE_CONTENT
+
+class PerformanceTemplate(Template):
+    """Base for templates that start data-heavy apps from a fast baseline
+    
+    Every project gets a .streamlit/config.toml tuned for reruns and a
+    tests/test_performance.py that times the first run and a rerun after each of
+    the template's interactions with AppTest, failing when they exceed a budget.
+    """
+    first_run_budget = 5.0  # Seconds; loads and caches data
+    rerun_budget = 0.5  # Seconds once everything is cached
+    
+    def get_files(self) -> Dict[str, str]:
+        return {
+            **self._get_app_files(),
+            ".streamlit/config.toml": self._get_streamlit_config(),
+            "tests/test_performance.py": self._get_timing_test(),
+        }
+    
+    def _get_app_files(self) -> Dict[str, str]:
+        raise NotImplementedError
+    
+    def _get_interactions(self) -> List[Tuple[str, str]]:
+        """(test name, AppTest statement changing a widget) for each timed rerun"""
+        raise NotImplementedError
+    
+    def _get_streamlit_config(self) -> str:
+        return '''
+[runner]
+# Bare expressions aren't written to the page, so nothing is serialized by accident
+magicEnabled = false
+# A widget change stops the running script instead of queueing behind it
+fastReruns = true
+
+[browser]
+# No usage statistics request on every page load
+gatherUsageStats = false
+
+[client]
+toolbarMode = "minimal"
+
+[logger]
+level = "warning"
+'''.strip()
+    
+    def _get_timing_test(self) -> str:
+        tests = "\n".join(
+            f'''
+def test_rerun_after_{name}_within_budget():
+    at = started()
+    {statement}
+    elapsed = timed_run(at)
+    assert not at.exception
+    assert elapsed < RERUN_BUDGET, f"Rerun took {{elapsed:.2f}}s"
+'''
+            for name, statement in self._get_interactions()
+        )
+        return f'''
+"""Timing budget for the app, so a change that slows reruns down fails a test
+
+Run with `pytest tests`. Budgets are wall-clock seconds; raise them deliberately,
+not to make a slow change pass.
+"""
+import time
+from pathlib import Path
+
+from streamlit.testing.v1 import AppTest
+
+APP = str(Path(__file__).parent.parent / "app.py")
+FIRST_RUN_BUDGET = {self.first_run_budget}
+RERUN_BUDGET = {self.rerun_budget}
+
+def timed_run(at: AppTest) -> float:
+    start = time.perf_counter()
+    at.run(timeout=30)
+    return time.perf_counter() - start
+
+def started() -> AppTest:
+    at = AppTest.from_file(APP)
+    at.run(timeout=30)
+    return at
+
+def test_first_run_within_budget():
+    at = AppTest.from_file(APP)
+    elapsed = timed_run(at)
+    assert not at.exception
+    assert elapsed < FIRST_RUN_BUDGET, f"First run took {{elapsed:.2f}}s"
+{tests}'''.strip()
+
+class DashboardTemplate(PerformanceTemplate):
+    """Dashboard over a large event table with cached aggregates and a paged table"""
+    def __init__(self):
+        super().__init__(
+            name="dashboard",
+            description="Data-heavy dashboard: cached loading and aggregates, fragment-scoped paged table"
+        )
+    
+    def get_dependencies(self) -> Dict[str, str]:
+        return {
+            "streamlit": ">=1.37.0",
+            "pandas": ">=2.2.0",
+            "numpy": ">=1.26.0",
+            "pyarrow": ">=14.0.0",
+        }
+    
+    def _get_interactions(self) -> List[Tuple[str, str]]:
+        return [
+            ("filter", 'at.slider(key="days").set_value(30)'),
+            ("paging", 'at.number_input(key="page").set_value(2)'),
+        ]
+    
+    def _get_app_files(self) -> Dict[str, str]:
+        return {
+            "app.py": self._get_app_content(),
+            "data.py": self._get_data_content(),
+            "components.py": self._get_components_content(),
+            "data_loader.py": DATA_LOADER_CONTENT,
+            "dataset_cache.py": DATASET_CACHE_CONTENT,
+        }
+    
+    def _get_app_content(self) -> str:
+        return '''
+import streamlit as st
+
+from components import kpi_row, paginated_table
+from data import daily_totals, load_events, summary
+
+st.set_page_config(page_title="Dashboard", layout="wide")
+st.title("Dashboard")
+
+events = load_events()
+
+# Filters rerun the whole page, so everything they feed is cached by the filter values
+with st.sidebar:
+    regions = tuple(st.multiselect("Region", sorted(events["region"].unique()), key="regions"))
+    days = st.slider("Days", 7, 365, 90, key="days")
+
+kpi_row(summary(regions, days))
+st.line_chart(daily_totals(regions, days), x="day", y="revenue")
+paginated_table(regions, days)
+'''.strip()
+    
+    def _get_data_content(self) -> str:
+        return '''
+"""Data access; everything the page shows is computed once per filter combination
+
+Cached functions take filter values, not DataFrames, so cache keys are cheap to
+hash, and return small results: aggregates and single pages, never the filtered
+table, which cache_data would copy on every call.
+"""
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import data_loader
+
+SAMPLE_ROWS = 200_000
+
+@st.cache_data(show_spinner="Loading data...")
+def load_events() -> pd.DataFrame:
+    """The whole table, once per server process; data/events.csv replaces the sample"""
+    if "events" in data_loader.datasets():
+        return data_loader.load("events")
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "day": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 365, SAMPLE_ROWS), unit="D"),
+        "region": rng.choice(["north", "south", "east", "west"], SAMPLE_ROWS),
+        "product": rng.choice([f"product {i}" for i in range(20)], SAMPLE_ROWS),
+        "revenue": rng.gamma(2.0, 50.0, SAMPLE_ROWS).round(2),
+    })
+
+def _filtered(regions: tuple, days: int) -> pd.DataFrame:
+    events = load_events()
+    mask = events["day"] > events["day"].max() - pd.Timedelta(days=days)
+    if regions:
+        mask &= events["region"].isin(regions)
+    return events[mask]
+
+@st.cache_data
+def summary(regions: tuple, days: int) -> dict:
+    events = _filtered(regions, days)
+    return {
+        "Orders": f"{len(events):,}",
+        "Revenue": f"${events['revenue'].sum():,.0f}",
+        "Average order": f"${events['revenue'].mean() if len(events) else 0:,.2f}",
+    }
+
+@st.cache_data
+def daily_totals(regions: tuple, days: int) -> pd.DataFrame:
+    """One row per day, so the chart sends hundreds of points instead of every event"""
+    return _filtered(regions, days).groupby("day", as_index=False)["revenue"].sum()
+
+@st.cache_data
+def page_of_events(regions: tuple, days: int, page: int, page_size: int) -> tuple:
+    """(rows of one page, total row count)"""
+    events = _filtered(regions, days).sort_values("day", ascending=False)
+    start = (page - 1) * page_size
+    return events.iloc[start:start + page_size], len(events)
+'''.strip()
+    
+    def _get_components_content(self) -> str:
+        return '''
+import streamlit as st
+
+from data import page_of_events
+
+def kpi_row(values: dict):
+    for column, (label, value) in zip(st.columns(len(values)), values.items()):
+        column.metric(label, value)
+
+@st.fragment
+def paginated_table(regions: tuple, days: int, page_size: int = 50):
+    """Paging reruns only this fragment, not the charts above it"""
+    _, total = page_of_events(regions, days, 1, page_size)
+    pages = max(1, -(-total // page_size))
+    if st.session_state.get("page", 1) > pages:
+        st.session_state.page = pages  # The filters shrank the table
+    page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, key="page")
+    rows, _ = page_of_events(regions, days, page, page_size)
+    st.dataframe(rows, hide_index=True)
+'''.strip()
+
+class SQLDashboardTemplate(PerformanceTemplate):
+    """Dashboard over a SQL database with one shared connection and aggregation in SQL"""
+    def __init__(self):
+        super().__init__(
+            name="sql",
+            description="SQL dashboard: cached shared connection, queries aggregated and paged in the database"
+        )
+    
+    def get_dependencies(self) -> Dict[str, str]:
+        return {
+            "streamlit": ">=1.37.0",
+            "pandas": ">=2.2.0",
+        }
+    
+    def _get_interactions(self) -> List[Tuple[str, str]]:
+        return [
+            ("filter", 'at.selectbox(key="status").set_value("shipped")'),
+            ("paging", 'at.number_input(key="page").set_value(2)'),
+        ]
+    
+    def _get_app_files(self) -> Dict[str, str]:
+        return {
+            "app.py": self._get_app_content(),
+            "db.py": self._get_db_content(),
+        }
+    
+    def _get_app_content(self) -> str:
+        return '''
+import streamlit as st
+
+from db import query
+
+PAGE_SIZE = 50
+
+st.set_page_config(page_title="Orders", layout="wide")
+st.title("Orders")
+
+with st.sidebar:
+    status = st.selectbox("Status", ["all", "open", "shipped", "returned"], key="status")
+
+# Aggregated by the database; only one row per region reaches Python
+by_region = query(
+    "SELECT region, COUNT(*) AS orders, SUM(amount) AS revenue FROM orders "
+    "WHERE :status = 'all' OR status = :status GROUP BY region ORDER BY revenue DESC",
+    {"status": status},
+)
+st.bar_chart(by_region, x="region", y="revenue")
+
+@st.fragment
+def order_browser(status: str):
+    """Paging reruns only this fragment and reads one page with LIMIT/OFFSET"""
+    total = query("SELECT COUNT(*) AS n FROM orders WHERE :status = 'all' OR status = :status", {"status": status})["n"][0]
+    pages = max(1, -(-int(total) // PAGE_SIZE))
+    if st.session_state.get("page", 1) > pages:
+        st.session_state.page = pages
+    page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, key="page")
+    rows = query(
+        "SELECT * FROM orders WHERE :status = 'all' OR status = :status ORDER BY id DESC LIMIT :limit OFFSET :offset",
+        {"status": status, "limit": PAGE_SIZE, "offset": (page - 1) * PAGE_SIZE},
+    )
+    st.dataframe(rows, hide_index=True)
+
+order_browser(status)
+'''.strip()
+    
+    def _get_db_content(self) -> str:
+        return '''
+"""Database access: one connection per server process and cached query results
+
+Uses SQLite with sample data; point connection() at your database's driver, e.g.
+sqlalchemy.create_engine(st.secrets["db_url"]), and keep it in st.cache_resource.
+"""
+import random
+import sqlite3
+import threading
+from pathlib import Path
+
+import pandas as pd
+import streamlit as st
+
+DATABASE = Path(__file__).parent / "data" / "app.db"
+SAMPLE_ROWS = 100_000
+
+_lock = threading.Lock()  # Sessions run in threads; a SQLite connection serves one at a time
+
+@st.cache_resource
+def connection() -> sqlite3.Connection:
+    """Shared by every session instead of connecting on each rerun"""
+    DATABASE.parent.mkdir(exist_ok=True)
+    conn = sqlite3.connect(DATABASE, check_same_thread=False)
+    if not conn.execute("SELECT name FROM sqlite_master WHERE name = 'orders'").fetchone():
+        _create_sample(conn)
+    return conn
+
+def _create_sample(conn: sqlite3.Connection):
+    rng = random.Random(0)
+    conn.execute("CREATE TABLE orders (id INTEGER PRIMARY KEY, region TEXT, status TEXT, amount REAL)")
+    conn.executemany(
+        "INSERT INTO orders (region, status, amount) VALUES (?, ?, ?)",
+        (
+            (rng.choice(["north", "south", "east", "west"]), rng.choice(["open", "shipped", "returned"]), round(rng.gammavariate(2, 50), 2))
+            for _ in range(SAMPLE_ROWS)
+        ),
+    )
+    # Filters and aggregates on status read the index instead of scanning
+    conn.execute("CREATE INDEX orders_status ON orders (status, region, amount)")
+    conn.commit()
+
+@st.cache_data(ttl=60, show_spinner=False)
+def query(sql: str, params: dict | None = None) -> pd.DataFrame:
+    """Results are shared by all sessions for a minute"""
+    with _lock:
+        return pd.read_sql_query(sql, connection(), params=params or {})
+'''.strip()
\ No newline at end of file
@@ -0,0 +1,152 @@
+"""Profile Streamlit scripts headlessly with AppTest
+
+Run by AppProfiler with the workspace venv's interpreter, as a plain script:
+
+    python _profile_app.py OUTPUT_JSON TIMEOUT MAX_INTERACTIONS SCRIPT [SCRIPT ...]
+
+Each script gets an initial run, then one rerun per widget interaction. Every rerun
+is timed with cProfile attached to the script thread and tracemalloc tracking its
+peak memory, so timings include profiler overhead but compare between runs.
+"""
+import cProfile
+import json
+import os
+import pstats
+import sys
+import time
+import tracemalloc
+
+HOTSPOTS = 10
+
+_profiler = None  # Profiler for the rerun in progress, enabled in the script thread
+
+def _patch_script_thread():
+    """Profile AppTest's script thread, which is where the app code runs"""
+    from streamlit.testing.v1.local_script_runner import LocalScriptRunner
+    
+    original = LocalScriptRunner._run_script_thread
+    
+    def profiled(self):
+        profiler = _profiler
+        if profiler:
+            profiler.enable()
+        try:
+            original(self)
+        finally:
+            if profiler:
+                profiler.disable()
+    
+    LocalScriptRunner._run_script_thread = profiled
+
+def _location(filename: str, root: str) -> str:
+    if filename.startswith(root + os.sep):
+        return os.path.relpath(filename, root)
+    marker = f"site-packages{os.sep}"
+    return filename.split(marker, 1)[1] if marker in filename else filename
+
+def _hotspots(profiler: cProfile.Profile, root: str) -> list:
+    """Functions with the most self time"""
+    entries = sorted(pstats.Stats(profiler).stats.items(), key=lambda item: item[1][2], reverse=True)
+    return [
+        {
+            "function": f"{_location(filename, root)}:{line}({name})",
+            "calls": calls,
+            "self_time": self_time,
+            "cumulative_time": cumulative,
+        }
+        for (filename, line, name), (_, calls, self_time, cumulative, _) in entries[:HOTSPOTS]
+    ]
+
+def _rerun(at, label: str, timeout: float, root: str) -> dict:
+    global _profiler
+    _profiler = cProfile.Profile()
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    error = None
+    start = time.perf_counter()
+    try:
+        at.run(timeout=timeout)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    wall_time = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    profiler, _profiler = _profiler, None
+    return {
+        "label": label,
+        "wall_time": wall_time,
+        "peak_memory": peak,
+        "hotspots": _hotspots(profiler, root),
+        "error": error,
+        "exceptions": [] if error else [e.message for e in at.exception],
+    }
+
+def _interact(widget_type: str, widget):
+    """Change a widget the way a viewer would; returns False if it can't be changed"""
+    if widget_type == "button":
+        widget.click()
+    elif widget_type == "checkbox":
+        widget.uncheck() if widget.value else widget.check()
+    elif widget_type == "toggle":
+        widget.set_value(not widget.value)
+    elif widget_type in ("radio", "selectbox") and len(widget.options) > 1:
+        widget.set_value(widget.options[-1] if widget.value != widget.options[-1] else widget.options[0])
+    elif widget_type == "multiselect" and widget.options:
+        widget.select(widget.options[0])
+    elif widget_type == "slider":
+        widget.set_value(widget.max if widget.value != widget.max else widget.min)
+    elif widget_type == "number_input":
+        widget.increment()
+    elif widget_type in ("text_input", "text_area"):
+        widget.input("profile")
+    else:
+        return False
+    return True
+
+WIDGET_TYPES = [
+    "button", "checkbox", "toggle", "radio", "selectbox", "multiselect",
+    "slider", "number_input", "text_input", "text_area",
+]
+
+def profile_script(path: str, timeout: float, max_interactions: int, root: str) -> dict:
+    from streamlit.testing.v1 import AppTest
+    
+    at = AppTest.from_file(path, default_timeout=timeout)
+    result = {"script": os.path.relpath(path, root), "initial": _rerun(at, "initial run", timeout, root), "interactions": []}
+    if result["initial"]["error"]:
+        return result
+    
+    for widget_type in WIDGET_TYPES:
+        for index in range(len(getattr(at, widget_type, []))):
+            if len(result["interactions"]) >= max_interactions:
+                return result
+            try:
+                widgets = getattr(at, widget_type)  # Rebuilt by every rerun
+                if index >= len(widgets):
+                    break
+                widget = widgets[index]
+                if not _interact(widget_type, widget):
+                    continue
+            except Exception:
+                continue
+            label = f"{widget_type} {widget.label or widget.key or index!r}"
+            result["interactions"].append(_rerun(at, label, timeout, root))
+    return result
+
+def main():
+    output, timeout, max_interactions, scripts = sys.argv[1], float(sys.argv[2]), int(sys.argv[3]), sys.argv[4:]
+    root = os.getcwd()
+    _patch_script_thread()
+    
+    results = []
+    for script in scripts:
+        try:
+            results.append(profile_script(os.path.abspath(script), timeout, max_interactions, root))
+        except Exception as e:
+            results.append({"script": script, "error": f"{type(e).__name__}: {e}"})
+    
+    with open(output, "w") as f:
+        json.dump(results, f)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,180 @@
+import json
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from ..utils.logger import logger
+from ..utils.metrics import metrics
+from ..core.constants import (
+    BUILDER_DIR,
+    APP_ENTRY_FILES,
+    ENV_DIR,
+    PROFILE_MAX_INTERACTIONS,
+    PROFILE_RERUN_TIMEOUT,
+    PROFILE_TIMEOUT,
+    PROFILE_REGRESSION_RATIO,
+    PROFILE_REGRESSION_MIN_SECONDS,
+)
+from ..core.container.terminal import Terminal
+from ..project.entry import find_app_entry
+
+PROFILE_SCRIPT = Path(__file__).with_name("_profile_app.py")
+
+@dataclass
+class RerunProfile:
+    """One script run: wall time, peak Python memory and the functions with the most self time"""
+    label: str
+    wall_time: float
+    peak_memory: int  # Bytes
+    hotspots: List[Dict] = field(default_factory=list)
+    error: Optional[str] = None  # The run itself failed, e.g. timed out
+    exceptions: List[str] = field(default_factory=list)  # Exceptions the app displayed
+
+@dataclass
+class ScriptProfile:
+    script: str
+    initial: Optional[RerunProfile] = None
+    interactions: List[RerunProfile] = field(default_factory=list)  # Reruns caused by widget changes
+    error: Optional[str] = None  # The script couldn't be profiled at all
+    
+    def reruns(self) -> List[RerunProfile]:
+        return ([self.initial] if self.initial else []) + self.interactions
+
+@dataclass
+class Regression:
+    script: str
+    label: str
+    before: float
+    after: float
+    
+    def __str__(self) -> str:
+        return f"{self.script} {self.label}: {self.before * 1000:.0f}ms -> {self.after * 1000:.0f}ms"
+
+@dataclass
+class ProfileReport:
+    created: str
+    scripts: List[ScriptProfile] = field(default_factory=list)
+    
+    def to_dict(self) -> Dict:
+        return asdict(self)
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ProfileReport":
+        scripts = []
+        for script in data.get("scripts", []):
+            initial = script.get("initial")
+            scripts.append(ScriptProfile(
+                script=script["script"],
+                initial=RerunProfile(**initial) if initial else None,
+                interactions=[RerunProfile(**rerun) for rerun in script.get("interactions", [])],
+                error=script.get("error"),
+            ))
+        return cls(created=data["created"], scripts=scripts)
+    
+    def regressions(
+        self,
+        previous: "ProfileReport",
+        ratio: float = PROFILE_REGRESSION_RATIO,
+        min_seconds: float = PROFILE_REGRESSION_MIN_SECONDS,
+    ) -> List[Regression]:
+        """Reruns that got slower than in a previous report by both ratio and min_seconds"""
+        before = {
+            (script.script, rerun.label): rerun.wall_time
+            for script in previous.scripts for rerun in script.reruns() if not rerun.error
+        }
+        found = []
+        for script in self.scripts:
+            for rerun in script.reruns():
+                old = before.get((script.script, rerun.label))
+                if old is not None and not rerun.error and rerun.wall_time > old * ratio and rerun.wall_time - old >= min_seconds:
+                    found.append(Regression(script.script, rerun.label, old, rerun.wall_time))
+        return found
+
+class AppProfiler:
+    """Profile a workspace's entry point and pages with Streamlit's AppTest
+    
+    Profiling runs in a subprocess with the workspace venv's interpreter, so the app
+    sees its own packages and a hung script can be killed. Reports are kept under
+    .streamlit_builder/profiles in the workspace, newest last, so each turn can be
+    compared with the one before.
+    """
+    
+    def __init__(self, terminal: Terminal, project_root: Path, venv_path: Optional[Path] = None):
+        self.terminal = terminal
+        self.project_root = project_root
+        self.venv_path = venv_path or project_root / ENV_DIR
+        self.profiles_dir = project_root / BUILDER_DIR / "profiles"
+    
+    @property
+    def python(self) -> str:
+        venv_python = self.venv_path / "bin" / "python"
+        return str(venv_python) if venv_python.exists() else sys.executable
+    
+    def scripts(self) -> List[Path]:
+        """The entry point and every page"""
+        entry = find_app_entry(self.project_root)
+        pages = sorted((self.project_root / "pages").glob("*.py"))
+        return ([entry] if entry else []) + pages
+    
+    async def profile(
+        self,
+        scripts: Optional[List[Path]] = None,
+        rerun_timeout: float = PROFILE_RERUN_TIMEOUT,
+        max_interactions: int = PROFILE_MAX_INTERACTIONS,
+        save: bool = True,
+    ) -> ProfileReport:
+        """Profile scripts, the entry point and pages by default, and optionally save the report"""
+        scripts = scripts if scripts is not None else self.scripts()
+        if not scripts:
+            raise FileNotFoundError(f"No {' or '.join(APP_ENTRY_FILES)} or pages to profile in {self.project_root}")
+        
+        start = time.perf_counter()
+        with tempfile.TemporaryDirectory() as tmp:
+            output = Path(tmp) / "profile.json"
+            command = [
+                self.python, str(PROFILE_SCRIPT), str(output), str(rerun_timeout), str(max_interactions),
+                *(str(script.relative_to(self.project_root) if script.is_absolute() else script) for script in scripts)
+            ]
+            returncode = await self.terminal.execute(command, "profile_app", timeout=PROFILE_TIMEOUT)
+            if returncode != 0 or not output.exists():
+                output_lines = "\n".join(self.terminal.get_output("profile_app", last=20))
+                raise RuntimeError(f"Profiling failed with exit code {returncode}:\n{output_lines}")
+            results = json.loads(output.read_text())
+        
+        report = ProfileReport.from_dict({"created": datetime.now().isoformat(timespec="seconds"), "scripts": results})
+        metrics.record("profile.run", time.perf_counter() - start)
+        for script in report.scripts:
+            for rerun in script.reruns():
+                metrics.record("profile.rerun", rerun.wall_time)
+        
+        if save:
+            path = self.save(report)
+            logger.info(f"Saved profile of {len(report.scripts)} scripts to {path}")
+        return report
+    
+    def save(self, report: ProfileReport) -> Path:
+        self.profiles_dir.mkdir(parents=True, exist_ok=True)
+        path = self.profiles_dir / f"{report.created.replace(':', '')}.json"
+        suffix = 1
+        while path.exists():
+            # Two reports within the same second
+            path = self.profiles_dir / f"{report.created.replace(':', '')}_{suffix}.json"
+            suffix += 1
+        path.write_text(json.dumps(report.to_dict(), indent=2))
+        return path
+    
+    def history(self) -> List[ProfileReport]:
+        """Saved reports, oldest first"""
+        if not self.profiles_dir.exists():
+            return []
+        reports = []
+        for path in sorted(self.profiles_dir.glob("*.json"), key=lambda p: p.stat().st_mtime):
+            try:
+                reports.append(ProfileReport.from_dict(json.loads(path.read_text())))
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                logger.warning(f"Skipping unreadable profile {path}: {str(e)}")
+        return reports
\ No newline at end of file
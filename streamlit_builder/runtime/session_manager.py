@@ -1,41 +1,81 @@
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Set, Tuple
 import asyncio
+import time
 
 from watchfiles import Change
 
 from ..utils.logger import logger
+from ..utils.metrics import metrics
 from ..core.container.webcontainer import WebContainer
 from ..server.streamlit_runner import StreamlitRunner
+from ..server.forkserver import ForkServer
 from ..core.files.watcher import FileWatcher
 from ..package.uv_manager import UVManager
+from ..package.venv_pool import VenvPool
+from ..package.wheelhouse import Wheelhouse
+from ..core.constants import DEFAULT_APP_FILE, ENV_DIR, REQUIREMENTS_FILE, STREAMLIT_CONFIG_FILE, RELOAD_QUIET_PERIOD
+from ..project.entry import find_app_entry
 
 class DevelopmentSession:
     """Manages a development session for a Streamlit project"""
     
-    def __init__(self, container: WebContainer, project_path: Path):
+    def __init__(
+        self,
+        container: WebContainer,
+        project_path: Path,
+        venv_pool: Optional[VenvPool] = None,
+        wheelhouse: Optional[Wheelhouse] = None,
+        blue_green: bool = False,
+        forkserver: bool = False,
+    ):
         self.container = container
         self.project_path = project_path
-        self.streamlit = StreamlitRunner(container.terminal, project_path)
+        # Started once the venv is ready so it preloads the project's packages
+        self.forkserver = ForkServer(container.terminal, project_path / ENV_DIR) if forkserver else None
+        self.streamlit = StreamlitRunner(
+            container.terminal,
+            project_path,
+            bytecode=container.bytecode,
+            blue_green=blue_green,  # Restarts keep viewers connected through a local proxy
+            forkserver=self.forkserver
+        )
         self.file_watcher = FileWatcher(project_path)
-        self.uv = UVManager(container.terminal, project_path)
+        self.uv = UVManager(
+            container.terminal,
+            project_path,
+            pool=venv_pool,
+            wheelhouse=wheelhouse or container.wheelhouse,
+            bytecode=container.bytecode
+        )
         
-        # Set up file change handlers
-        self.file_watcher.on_change(Change.modified, self._on_file_modified)
-        self.file_watcher.on_change(Change.added, self._on_file_added)
-        self.file_watcher.on_change(Change.deleted, self._on_file_deleted)
+        # Changes are collected until the project has been quiet for a moment, so a turn
+        # that writes many files is handled as one batch
+        self.quiet_period = RELOAD_QUIET_PERIOD
+        self._pending_changes: Set[Tuple[Change, Path]] = set()
+        self._quiet_timer: Optional[asyncio.TimerHandle] = None
+        self._applying: Set[asyncio.Task] = set()
+        self._apply_lock = asyncio.Lock()  # One batch at a time; installs must not overlap in the venv
+        self.file_watcher.on_batch(self._on_changes)
     
     async def start(self, port: int = 8501):
         """Start development session"""
         try:
-            # Initialize environment
-            await self.uv.create_venv()
+            # Initialize environment, from the pool if the project's requirements are pre-built
+            requirements_path = self.project_path / REQUIREMENTS_FILE
+            requirements = requirements_path.read_text().splitlines() if requirements_path.exists() else None
+            await self.uv.create_venv(requirements)
+            if self.uv.lock_path.exists():
+                await self.uv.sync_lock()
+            
+            await self._start_forkserver()
             
             # Start file watcher
             await self.file_watcher.start()
             
             # Start Streamlit server
-            await self.streamlit.start(port=port)
+            entry = find_app_entry(self.project_path)
+            await self.streamlit.start(entry.name if entry else DEFAULT_APP_FILE, port=port)
             
             logger.info(f"Development session started for {self.project_path}")
             
@@ -47,29 +87,107 @@ class DevelopmentSession:
     async def stop(self):
         """Stop development session"""
         try:
-            await self.streamlit.stop()
             await self.file_watcher.stop()
+            if self._quiet_timer:
+                self._quiet_timer.cancel()
+                self._quiet_timer = None
+            self._pending_changes.clear()
+            for task in list(self._applying):
+                task.cancel()
+            await asyncio.gather(*self._applying, return_exceptions=True)
+            await self.streamlit.stop()
+            if self.forkserver:
+                await self.forkserver.stop()
+            if self.uv.wheelhouse:
+                logger.info(f"Wheelhouse: {self.uv.wheelhouse.report()}")
             logger.info("Development session stopped")
         except Exception as e:
             logger.error(f"Error stopping development session: {str(e)}")
             raise
     
-    async def _on_file_modified(self, path: Path):
-        """Handle file modifications"""
+    async def _start_forkserver(self):
+        """Start the fork server if enabled; Streamlit is exec'd as usual if it can't start"""
+        if not self.forkserver:
+            return
+        try:
+            await self.forkserver.start()
+        except Exception as e:
+            logger.warning(f"Fork server unavailable: {str(e)}")
+    
+    async def _on_changes(self, changes: Set[Tuple[Change, Path]]):
+        """Collect a batch from the file watcher and (re)arm the quiet period"""
+        self._pending_changes.update(changes)
+        if self._quiet_timer:
+            self._quiet_timer.cancel()
+        self._quiet_timer = asyncio.get_running_loop().call_later(self.quiet_period, self._flush_changes)
+    
+    def _flush_changes(self):
+        """Act on everything collected once the quiet period has passed"""
+        self._quiet_timer = None
+        changes, self._pending_changes = self._pending_changes, set()
+        task = asyncio.create_task(self._apply_changes(changes))
+        self._applying.add(task)
+        task.add_done_callback(self._applying.discard)
+    
+    async def _apply_changes(self, changes: Set[Tuple[Change, Path]]):
+        """Handle a batch of file changes with at most one restart
+        
+        App code changes are left to Streamlit, which reruns the script in place on save
+        and keeps session state and caches. Only dependency or server config changes,
+        or a server that died, cost a restart. Batches are applied one after another
+        in the order they were flushed.
+        """
+        async with self._apply_lock:
+            await self._apply_batch(changes)
+    
+    async def _apply_batch(self, changes: Set[Tuple[Change, Path]]):
+        metrics.increment("reload.batches")
+        metrics.record("reload.batch_size", len(changes))
         try:
-            if path.suffix == '.py':
-                await self.streamlit.restart()
-            elif path.name == 'requirements.txt':
-                await self.uv.install_requirements()
-                await self.streamlit.restart()
+            reason = None
+            if any(change != Change.deleted and path.name == REQUIREMENTS_FILE for change, path in changes):
+                # Only the changed lines are installed
+                await self.uv.sync_requirements()
+                if self.forkserver:
+                    # Children must not run with stale preloaded packages
+                    await self.forkserver.stop()
+                    await self._start_forkserver()
+                reason = "requirements"
+            elif any(path.parts[-2:] == STREAMLIT_CONFIG_FILE.parts for _, path in changes):
+                reason = "config"
+            elif self.streamlit.has_exited:
+                reason = "crash"
+            
+            if reason:
+                await self._restart(reason)
+            else:
+                for _, path in changes:
+                    if path.suffix == '.py':
+                        self._record_rerun(path)
         except Exception as e:
-            logger.error(f"Error handling file modification: {str(e)}")
+            logger.error(f"Error handling file changes: {str(e)}")
+    
+    async def _on_file_modified(self, path: Path):
+        """Handle a single file modification right away"""
+        await self._apply_changes({(Change.modified, path)})
     
-    async def _on_file_added(self, path: Path):
-        """Handle new files"""
-        await self._on_file_modified(path)
+    async def _restart(self, reason: str):
+        """Restart the server and record why and how long it took"""
+        start = time.perf_counter()
+        if not await self.streamlit.restart():
+            logger.debug(f"Restart for {reason} covered by one already in progress")
+            return
+        elapsed = time.perf_counter() - start
+        metrics.increment("reload.restarts")
+        metrics.increment(f"reload.restarts.{reason}")
+        metrics.record("reload.restart", elapsed)
+        logger.info(f"Restarted Streamlit server ({reason}) in {elapsed:.2f}s")
     
-    async def _on_file_deleted(self, path: Path):
-        """Handle deleted files"""
-        if path.suffix == '.py':
-            await self.streamlit.restart() 
\ No newline at end of file
+    def _record_rerun(self, path: Path):
+        """Record an app change that Streamlit picks up by rerunning in place"""
+        metrics.increment("reload.reruns")
+        if path.exists():
+            # From the write until the batch was handled, quiet period included; this is not
+            # how long Streamlit takes to rerun, which `profile` measures per script run
+            metrics.record("reload.change_lag", max(0.0, time.time() - path.stat().st_mtime))
+        logger.debug(f"{path.name} changed, Streamlit reruns the app in place") 
\ No newline at end of file
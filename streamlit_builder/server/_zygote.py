@@ -0,0 +1,168 @@
+"""Fork server that hands out pre-imported Streamlit interpreters
+
+Run by ForkServer with the workspace venv's interpreter, as a plain script so it
+needs nothing but Streamlit installed:
+
+    python _zygote.py SOCKET_PATH POOL_SIZE [MODULE ...]
+
+It imports Streamlit and the listed modules once, forks POOL_SIZE idle children and
+then serves one JSON request per connection on a Unix socket:
+
+    {"op": "start", "cwd": ..., "argv": [...], "env": {...}, "log": ...}  -> {"pid": ..., "warm": ...}
+    {"op": "stats"}  -> {"idle": ..., "idle_pids": [...], "pool_size": ..., "forked": ..., "served": ...}
+
+A started child becomes its own session, chdirs to the workspace, sends its output
+to the log file and runs the Streamlit CLI with argv. The start connection is handed
+to the child along with its assignment, and the child writes {"exit": CODE} to it
+before exiting, so the requester learns of the exit without probing a pid that may
+have been reused. The connection closing without a report means the child was killed.
+"""
+import gc
+import importlib
+import json
+import os
+import select
+import signal
+import socket
+import sys
+import time
+from typing import Optional
+
+READY_LINE = "forkserver ready"
+
+def _run_child(assignment: dict, report: Optional[int]):
+    """Become the requested Streamlit server, reporting its exit code on report; never returns"""
+    code = 1
+    try:
+        if report is not None:
+            os.set_inheritable(report, False)  # Not held open by processes the app runs
+        os.setsid()
+        for sig in (signal.SIGCHLD, signal.SIGTERM, signal.SIGINT):
+            signal.signal(sig, signal.SIG_DFL)
+        os.chdir(assignment["cwd"])
+        os.environ.update(assignment.get("env") or {})
+        log = os.open(assignment["log"], os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        os.dup2(log, 1)
+        os.dup2(log, 2)
+        os.close(log)
+        sys.stdout = os.fdopen(1, "w", buffering=1)
+        sys.stderr = os.fdopen(2, "w", buffering=1)
+        sys.argv = ["streamlit", *assignment["argv"]]
+        
+        from streamlit.web import cli
+        cli.main(prog_name="streamlit")
+        code = 0
+    except SystemExit as e:
+        code = e.code if isinstance(e.code, int) else 0 if e.code is None else 1
+    except BaseException:
+        import traceback
+        traceback.print_exc()
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        if report is not None:
+            try:
+                os.write(report, json.dumps({"exit": code}).encode() + b"\n")
+            except OSError:
+                pass  # The requester went away
+        os._exit(code)
+
+def _fork_idle(listener: socket.socket):
+    """Fork a child that waits for its assignment; returns (pid, socket to send it on)"""
+    parent_end, child_end = socket.socketpair()
+    pid = os.fork()
+    if pid == 0:
+        listener.close()
+        parent_end.close()
+        data, report = b"", None
+        while not data.endswith(b"\n"):
+            chunk, fds, _, _ = socket.recv_fds(child_end, 65536, 1)
+            if fds:
+                report = fds[0]
+            if not chunk:
+                os._exit(0)  # Fork server went away or shrank the pool
+            data += chunk
+        child_end.close()
+        _run_child(json.loads(data), report)
+    child_end.close()
+    return pid, parent_end
+
+def _reap(stats: dict):
+    while True:
+        try:
+            pid, _ = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            return
+        if pid == 0:
+            return
+        stats["exited"] += 1
+
+def main():
+    socket_path, pool_size, modules = sys.argv[1], int(sys.argv[2]), sys.argv[3:]
+    
+    started = time.perf_counter()
+    import streamlit.web.cli  # noqa: F401  Required; everything else is best effort
+    for module in modules:
+        try:
+            importlib.import_module(module)
+        except Exception:
+            pass
+    # Keep the preloaded objects out of collections so children don't copy their pages
+    gc.collect()
+    gc.freeze()
+    
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(socket_path)
+    listener.listen()
+    
+    stats = {"pool_size": pool_size, "forked": 0, "served": 0, "cold": 0, "exited": 0}
+    idle = []
+    
+    def refill():
+        while len(idle) < pool_size:
+            idle.append(_fork_idle(listener))
+            stats["forked"] += 1
+    
+    refill()
+    print(f"{READY_LINE} in {time.perf_counter() - started:.2f}s", flush=True)
+    
+    while True:
+        readable, _, _ = select.select([listener], [], [], 0.1)
+        _reap(stats)
+        if not readable:
+            continue
+        
+        conn, _ = listener.accept()
+        with conn:
+            data = b""
+            while not data.endswith(b"\n"):
+                chunk = conn.recv(65536)
+                if not chunk:
+                    break
+                data += chunk
+            try:
+                request = json.loads(data)
+            except ValueError:
+                continue
+            
+            if request.get("op") == "start":
+                warm = bool(idle)
+                if not warm:
+                    idle.append(_fork_idle(listener))
+                    stats["forked"] += 1
+                    stats["cold"] += 1
+                pid, channel = idle.pop(0)
+                conn.sendall(json.dumps({"pid": pid, "warm": warm}).encode() + b"\n")
+                with channel:
+                    socket.send_fds(channel, [json.dumps(request).encode() + b"\n"], [conn.fileno()])
+                stats["served"] += 1
+            elif request.get("op") == "stats":
+                idle_pids = [pid for pid, _ in idle]
+                conn.sendall(json.dumps({**stats, "idle": len(idle), "idle_pids": idle_pids}).encode() + b"\n")
+        # Only once the connection is closed here, so new children don't hold it open
+        refill()
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,217 @@
+import asyncio
+import json
+import os
+import re
+import signal
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Pattern, Tuple, Union
+
+from ..utils.logger import logger
+from ..utils.metrics import metrics
+from ..core.constants import FORK_POOL_SIZE, FORK_PRELOAD_MODULES, FORK_SERVER_START_TIMEOUT, PROCESS_STOP_TIMEOUT
+from ..core.container.handle import ProcessHandle, ProcessExitedError
+from ..core.container.terminal import Terminal
+from ._zygote import READY_LINE
+
+ZYGOTE_SCRIPT = Path(__file__).with_name("_zygote.py")
+
+class ForkedProcess:
+    """Handle to a Streamlit server forked by the fork server
+    
+    Stands in for a ProcessHandle in StreamlitRunner. Output goes to a log file, which
+    wait_for tails. The fork server reaps the process, so its exit is learned from the
+    connection the child was handed: the child writes its exit code there, and the
+    connection closing without one means it was killed (-1). Signals are only sent
+    while that connection is open, so a reused pid is never signalled.
+    """
+    
+    def __init__(self, name: str, pid: int, log_path: Path, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.name = name
+        self.pid = pid
+        self.log_path = log_path
+        self._returncode: Optional[int] = None
+        self._exited = asyncio.Event()
+        self._watcher = asyncio.create_task(self._watch(reader, writer))
+    
+    async def _watch(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Wait for the child's exit report or for its end of the connection to close"""
+        returncode = -1
+        try:
+            returncode = int(json.loads(await reader.read())["exit"])
+        except (ValueError, KeyError, TypeError, OSError):
+            pass
+        finally:
+            self._returncode = returncode
+            self._exited.set()
+            writer.close()
+    
+    @property
+    def returncode(self) -> Optional[int]:
+        return self._returncode
+    
+    def send_signal(self, sig: int):
+        if self._returncode is not None:
+            raise ProcessLookupError(f"Process {self.name} already exited")
+        os.killpg(self.pid, sig)
+    
+    async def wait(self) -> int:
+        await self._exited.wait()
+        return self._returncode
+    
+    async def terminate(self, timeout: float = PROCESS_STOP_TIMEOUT) -> int:
+        """Stop the process and its session, escalating to SIGKILL after timeout"""
+        for sig, wait in ((signal.SIGTERM, timeout), (signal.SIGKILL, timeout)):
+            try:
+                self.send_signal(sig)
+            except ProcessLookupError:
+                break
+            try:
+                return await asyncio.wait_for(self.wait(), wait)
+            except asyncio.TimeoutError:
+                continue
+        return -1
+    
+    async def wait_for(self, pattern: Union[str, Pattern[str]], timeout: Optional[float] = None) -> str:
+        """Wait for a log line matching a pattern and return it"""
+        regex = re.compile(pattern) if isinstance(pattern, str) else pattern
+        
+        async def _match() -> str:
+            offset, partial = 0, ""
+            while True:
+                exited = self.returncode is not None  # Checked before reading so no output is missed
+                try:
+                    with open(self.log_path) as log:
+                        log.seek(offset)
+                        data = log.read()
+                        offset = log.tell()
+                except FileNotFoundError:
+                    data = ""
+                *lines, partial = (partial + data).split("\n")
+                for line in lines:
+                    if regex.search(line):
+                        return line
+                if exited:
+                    raise ProcessExitedError(f"Process {self.name} exited before printing {regex.pattern!r}")
+                await asyncio.sleep(0.02)
+        
+        return await asyncio.wait_for(_match(), timeout)
+
+class ForkServer:
+    """Pool of Streamlit interpreters forked from one that already imported everything
+    
+    The fork server runs _zygote.py with the venv's interpreter. It imports Streamlit
+    and FORK_PRELOAD_MODULES once and keeps pool_size idle children forked ahead of
+    time. Starting an app hands one of them the workspace and Streamlit arguments,
+    which takes milliseconds instead of the seconds an exec'd `streamlit run` spends
+    importing. The pool is refilled after every start. Restart the fork server when
+    installed packages change so children don't run stale preloaded modules.
+    """
+    
+    def __init__(
+        self,
+        terminal: Terminal,
+        venv_path: Path,
+        pool_size: int = FORK_POOL_SIZE,
+        preload: Optional[List[str]] = None,
+    ):
+        self.terminal = terminal
+        self.venv_path = venv_path
+        self.pool_size = pool_size
+        self.preload = FORK_PRELOAD_MODULES if preload is None else preload
+        self.socket_path = Path(tempfile.gettempdir()) / f"sb_fork_{os.getpid()}_{id(self):x}.sock"
+        self._handle: Optional[ProcessHandle] = None
+    
+    @property
+    def python(self) -> str:
+        venv_python = self.venv_path / "bin" / "python"
+        return str(venv_python) if venv_python.exists() else sys.executable
+    
+    @property
+    def is_running(self) -> bool:
+        return self._handle is not None and self._handle.returncode is None
+    
+    async def start(self):
+        """Start the fork server and wait until its pool is warm"""
+        if self.is_running:
+            return
+        start = time.perf_counter()
+        command = [self.python, str(ZYGOTE_SCRIPT), str(self.socket_path), str(self.pool_size), *self.preload]
+        self._handle = await self.terminal.execute(
+            command,
+            "forkserver",
+            env={**os.environ, "PYTHONUNBUFFERED": "1"},
+            wait=False,
+            timeout=float("inf")  # Long-lived like the servers it forks; not a RUN command with a deadline
+        )
+        try:
+            await self._handle.wait_for(READY_LINE, timeout=FORK_SERVER_START_TIMEOUT)
+        except Exception as e:
+            await self.stop()
+            raise RuntimeError(f"Fork server failed to start: {str(e)}") from e
+        elapsed = time.perf_counter() - start
+        metrics.record("forkserver.warmup", elapsed)
+        logger.info(f"Fork server ready with {self.pool_size} warm interpreters in {elapsed:.2f}s")
+    
+    async def stop(self):
+        """Stop the fork server and its idle children; started apps keep running"""
+        if self._handle:
+            await self._handle.terminate()
+            self._handle = None
+        self.socket_path.unlink(missing_ok=True)
+    
+    async def restart(self):
+        """Re-import everything, e.g. after packages were installed or upgraded"""
+        await self.stop()
+        await self.start()
+    
+    async def _connect(self, payload: Dict) -> Tuple[Dict, asyncio.StreamReader, asyncio.StreamWriter]:
+        """Send a request and read the reply, leaving the connection open"""
+        reader, writer = await asyncio.open_unix_connection(str(self.socket_path))
+        try:
+            writer.write(json.dumps(payload).encode() + b"\n")
+            await writer.drain()
+            line = await reader.readline()
+            if not line:
+                raise RuntimeError("Fork server closed the connection")
+            return json.loads(line), reader, writer
+        except BaseException:
+            writer.close()
+            raise
+    
+    async def _request(self, payload: Dict) -> Dict:
+        reply, _, writer = await self._connect(payload)
+        writer.close()
+        await writer.wait_closed()
+        return reply
+    
+    async def spawn(
+        self,
+        cwd: Path,
+        argv: List[str],
+        log_path: Path,
+        env: Optional[Dict[str, str]] = None,
+        name: str = "streamlit",
+    ) -> ForkedProcess:
+        """Run `streamlit <argv>` in cwd in a warm child"""
+        start = time.perf_counter()
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        # The child keeps this connection and reports its exit on it
+        reply, reader, writer = await self._connect({
+            "op": "start",
+            "cwd": str(cwd),
+            "argv": argv,
+            "env": env or {},
+            "log": str(log_path),
+        })
+        elapsed = time.perf_counter() - start
+        metrics.record("forkserver.spawn", elapsed)
+        metrics.increment("forkserver.warm" if reply["warm"] else "forkserver.cold")
+        logger.debug(f"Forked {name} as pid {reply['pid']} in {elapsed * 1000:.1f}ms")
+        return ForkedProcess(name, reply["pid"], log_path, reader, writer)
+    
+    async def stats(self) -> Dict:
+        """Pool size, idle children and their pids, and how many were forked, served and reaped"""
+        return await self._request({"op": "stats"})
\ No newline at end of file
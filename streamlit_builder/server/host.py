@@ -0,0 +1,229 @@
+import asyncio
+import re
+import socket
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from aiohttp import web
+
+from ..utils.logger import logger
+from ..utils.metrics import metrics
+from ..core.constants import (
+    DEFAULT_APP_FILE,
+    DEFAULT_PORT,
+    HOST_PORT_RANGE,
+    HOST_MAX_LIVE_SERVERS,
+    HOST_IDLE_TIMEOUT,
+    HOST_REAP_INTERVAL,
+)
+from ..core.container.terminal import Terminal
+from .proxy import ReverseProxy
+from .streamlit_runner import StreamlitRunner
+
+_APP_NAME = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_-]*$")
+
+class PortAllocator:
+    """Hand out ports from a range, skipping ones already in use on the machine"""
+    
+    def __init__(self, port_range: Tuple[int, int] = HOST_PORT_RANGE, host: str = "127.0.0.1"):
+        self.start, self.end = port_range
+        self.host = host
+        self._allocated: Set[int] = set()
+    
+    def _is_free(self, port: int) -> bool:
+        with socket.socket() as sock:
+            try:
+                sock.bind((self.host, port))
+                return True
+            except OSError:
+                return False
+    
+    def allocate(self) -> int:
+        for port in range(self.start, self.end + 1):
+            if port not in self._allocated and self._is_free(port):
+                self._allocated.add(port)
+                return port
+        raise RuntimeError(f"No free ports left in {self.start}-{self.end}")
+    
+    def release(self, port: int):
+        self._allocated.discard(port)
+
+@dataclass
+class HostedApp:
+    """A registered workspace app and, while it runs, its server"""
+    name: str
+    project_root: Path
+    app_path: str = DEFAULT_APP_FILE
+    terminal: Optional[Terminal] = None
+    runner: Optional[StreamlitRunner] = None
+    port: Optional[int] = None
+    last_used: float = 0.0
+    starting: Optional[asyncio.Task] = None
+    
+    @property
+    def is_live(self) -> bool:
+        return self.port is not None
+
+class AppHost(ReverseProxy):
+    """Serve many workspaces' Streamlit apps behind one port, routed by path prefix
+    
+    /<name>/... goes to the app registered as name, which runs with that prefix as its
+    baseUrlPath so no paths need rewriting. Apps start on their first request and
+    stop again after idle_timeout without requests or open connections. Starting one
+    more than max_live stops the least recently used app first, preferring apps no
+    one is connected to, so the number of servers follows active viewers.
+    """
+    
+    def __init__(
+        self,
+        port: int = DEFAULT_PORT,
+        max_live: int = HOST_MAX_LIVE_SERVERS,
+        idle_timeout: float = HOST_IDLE_TIMEOUT,
+        ports: Optional[PortAllocator] = None,
+        host: str = "127.0.0.1",
+    ):
+        super().__init__(port, upstream_port=0, host=host)
+        self.max_live = max_live
+        self.idle_timeout = idle_timeout
+        self.ports = ports or PortAllocator(host=host)
+        self.apps: Dict[str, HostedApp] = {}
+        self._by_port: Dict[int, HostedApp] = {}
+        self._starting: Set[str] = set()  # Apps holding a slot while their server starts
+        self._reaper: Optional[asyncio.Task] = None
+    
+    @property
+    def live(self) -> List[HostedApp]:
+        return [app for app in self.apps.values() if app.is_live]
+    
+    def register(self, name: str, project_root: Path, app_path: str = DEFAULT_APP_FILE) -> str:
+        """Make a project reachable under /<name>/ and return that path"""
+        if not _APP_NAME.match(name):
+            raise ValueError(f"Invalid app name {name!r}: use letters, digits, '-' and '_'")
+        if name in self.apps:
+            raise ValueError(f"App {name} is already registered")
+        self.apps[name] = HostedApp(name, project_root, app_path)
+        return f"/{name}/"
+    
+    async def unregister(self, name: str):
+        """Stop an app if it runs and forget it"""
+        app = self.apps.get(name)
+        if app:
+            await self.stop_app(name, "unregistered")
+            del self.apps[name]
+    
+    async def start(self):
+        """Start the proxy and the idle reaper"""
+        await super().start()
+        self._reaper = asyncio.create_task(self._reap())
+    
+    async def stop(self):
+        """Stop every app, then the proxy"""
+        if self._reaper:
+            self._reaper.cancel()
+            await asyncio.gather(self._reaper, return_exceptions=True)
+            self._reaper = None
+        await asyncio.gather(*(self.stop_app(app.name, "shutdown") for app in self.live), return_exceptions=True)
+        await super().stop()
+    
+    async def ensure_started(self, name: str) -> int:
+        """Start an app unless it runs and return its port; concurrent callers share one start"""
+        app = self.apps[name]
+        app.last_used = time.monotonic()
+        if app.is_live:
+            return app.port
+        if app.starting is None:
+            app.starting = asyncio.create_task(self._start_app(app))
+        try:
+            # Shielded so one caller giving up doesn't cancel the start for the others
+            return await asyncio.shield(app.starting)
+        finally:
+            if app.starting and app.starting.done():
+                app.starting = None
+    
+    async def _start_app(self, app: HostedApp) -> int:
+        await self._make_room()
+        self._starting.add(app.name)
+        terminal = Terminal(app.project_root)
+        runner = StreamlitRunner(terminal, app.project_root, base_url_path=app.name)
+        start = time.perf_counter()
+        try:
+            port = self.ports.allocate()
+            try:
+                await runner.start(app.app_path, port=port)
+            except Exception:
+                self.ports.release(port)
+                await terminal.cleanup()
+                raise
+        finally:
+            self._starting.discard(app.name)
+        
+        app.terminal, app.runner, app.port = terminal, runner, port
+        self._by_port[port] = app
+        elapsed = time.perf_counter() - start
+        metrics.increment("host.starts")
+        metrics.record("host.start", elapsed)
+        logger.info(f"Started {app.name} on port {port} in {elapsed:.2f}s ({len(self.live)} live)")
+        return port
+    
+    async def _make_room(self):
+        """Stop least recently used apps until another one fits under max_live"""
+        while self.live and len(self.live) + len(self._starting) >= self.max_live:
+            # Apps with viewers connected go last
+            victim = min(self.live, key=lambda app: (self.connections(app.port) > 0, app.last_used))
+            await self.stop_app(victim.name, "evicted")
+    
+    async def stop_app(self, name: str, reason: str = "stopped"):
+        """Stop an app's server; the next request starts it again"""
+        app = self.apps.get(name)
+        if not app or not app.is_live:
+            return
+        port, runner, terminal = app.port, app.runner, app.terminal
+        app.port = app.runner = app.terminal = None
+        self._by_port.pop(port, None)
+        try:
+            await self._close_sockets(port)
+            await runner.stop()
+            await terminal.cleanup()
+        finally:
+            self.ports.release(port)
+        metrics.increment(f"host.stops.{reason}")
+        logger.info(f"Stopped {name} ({reason}), {len(self.live)} live")
+    
+    async def _reap(self):
+        """Stop apps that have been idle too long"""
+        while True:
+            await asyncio.sleep(min(HOST_REAP_INTERVAL, self.idle_timeout))
+            await self.reap_idle()
+    
+    async def reap_idle(self) -> List[str]:
+        now = time.monotonic()
+        idle = [
+            app.name for app in self.live
+            if not self.connections(app.port) and now - app.last_used >= self.idle_timeout
+        ]
+        for name in idle:
+            try:
+                await self.stop_app(name, "idle")
+            except Exception as e:
+                logger.error(f"Failed to stop idle app {name}: {str(e)}")
+        return idle
+    
+    async def _upstream(self, request: web.Request) -> int:
+        name = request.path.lstrip("/").split("/", 1)[0]
+        if name not in self.apps:
+            raise web.HTTPNotFound(text=f"No app at /{name}/")
+        if request.path == f"/{name}":
+            raise web.HTTPFound(f"/{name}/")  # Streamlit only serves under the trailing slash
+        try:
+            return await self.ensure_started(name)
+        except Exception as e:
+            logger.error(f"Failed to start {name}: {str(e)}")
+            raise web.HTTPBadGateway(text=f"App {name} failed to start")
+    
+    def _released(self, port: int):
+        # Idle time counts from the last viewer leaving, not from when they arrived
+        app = self._by_port.get(port)
+        if app:
+            app.last_used = time.monotonic()
\ No newline at end of file
@@ -0,0 +1,263 @@
+import asyncio
+import math
+import random
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import aiohttp
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+from ..utils.logger import logger
+from ..utils.metrics import metrics
+from ..core.constants import (
+    LOAD_TEST_VIEWERS,
+    LOAD_TEST_DURATION,
+    LOAD_TEST_THINK_TIME,
+    LOAD_TEST_RERUN_TIMEOUT,
+    LOAD_TEST_SAMPLE_INTERVAL,
+)
+from ..core.container.resources import children_map, proc_available, sample_tree
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile, 0 for no values"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+def widget_change(kind: str, element) -> Optional[WidgetState]:
+    """A new value for a widget, the way a viewer would change it; None if unsupported
+    
+    Value types follow the widget serializers of current Streamlit releases.
+    """
+    state = WidgetState(id=element.id)
+    if kind == "button":
+        state.trigger_value = True
+    elif kind == "checkbox":
+        state.bool_value = not element.default
+    elif kind == "slider" and len(element.default) == 1:
+        state.double_array_value.data.append(element.max)
+    elif kind == "number_input":
+        state.double_value = (element.default if element.HasField("default") else 0) + (element.step or 1)
+    elif kind in ("text_input", "text_area"):
+        state.string_value = "load test"
+    elif kind in ("selectbox", "radio") and len(element.options) > 1:
+        state.string_value = element.options[-1]
+    else:
+        return None
+    return state
+
+class ViewerSession:
+    """One synthetic browser tab speaking Streamlit's websocket protocol
+    
+    Each rerun sends a rerun_script BackMsg, optionally with one changed widget, and
+    waits for script_finished. Widgets are discovered from the deltas of each run.
+    """
+    
+    def __init__(self, session: aiohttp.ClientSession, url: str):
+        self.session = session
+        self.url = url
+        self.widgets: Dict[str, object] = {}  # Widget id -> (kind, element proto)
+        self._ws: Optional[aiohttp.ClientWebSocketResponse] = None
+    
+    async def connect(self):
+        self._ws = await self.session.ws_connect(self.url, protocols=["streamlit"], max_msg_size=0)
+    
+    async def close(self):
+        if self._ws:
+            await self._ws.close()
+            self._ws = None
+    
+    @property
+    def connected(self) -> bool:
+        return self._ws is not None and not self._ws.closed
+    
+    async def rerun(self, change: Optional[WidgetState] = None) -> bool:
+        """Run the script once; returns whether it finished without an error"""
+        message = BackMsg()
+        message.rerun_script.query_string = ""
+        if change is not None:
+            message.rerun_script.widget_states.widgets.append(change)
+        await self._ws.send_bytes(message.SerializeToString())
+        
+        failed = False
+        widgets = {}
+        async for frame in self._ws:
+            if frame.type != aiohttp.WSMsgType.BINARY:
+                raise ConnectionError(f"Websocket closed ({frame.type.name})")
+            forward = ForwardMsg()
+            forward.ParseFromString(frame.data)
+            kind = forward.WhichOneof("type")
+            if kind == "delta" and forward.delta.WhichOneof("type") == "new_element":
+                element = forward.delta.new_element
+                element_kind = element.WhichOneof("type")
+                if element_kind == "exception":
+                    failed = True
+                proto = getattr(element, element_kind)
+                if getattr(proto, "id", ""):
+                    widgets[proto.id] = (element_kind, proto)
+            elif kind == "script_finished":
+                if forward.script_finished == ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    continue
+                self.widgets = widgets or self.widgets
+                return not failed and forward.script_finished != ForwardMsg.FINISHED_WITH_COMPILE_ERROR
+        raise ConnectionError("Websocket closed")
+    
+    def random_change(self, rng: random.Random) -> Optional[tuple]:
+        """Pick a widget this viewer can change; returns (kind, WidgetState)"""
+        candidates = [(kind, element) for kind, element in self.widgets.values()]
+        rng.shuffle(candidates)
+        for kind, element in candidates:
+            state = widget_change(kind, element)
+            if state is not None:
+                return kind, state
+        return None
+
+@dataclass
+class ResourceSample:
+    elapsed: float
+    cpu_percent: float
+    rss_bytes: int
+
+@dataclass
+class LoadTestReport:
+    viewers: int
+    duration: float
+    latencies: Dict[str, List[float]] = field(default_factory=lambda: {"rerun": [], "widget": []})
+    errors: int = 0  # Runs that raised or ended in an exception
+    timeouts: int = 0
+    disconnects: int = 0
+    samples: List[ResourceSample] = field(default_factory=list)
+    
+    @property
+    def completed(self) -> int:
+        return sum(len(values) for values in self.latencies.values())
+    
+    @property
+    def throughput(self) -> float:
+        """Completed script runs per second"""
+        return self.completed / self.duration if self.duration else 0.0
+    
+    def percentiles(self, kind: Optional[str] = None) -> Dict[str, float]:
+        values = self.latencies[kind] if kind else [v for values in self.latencies.values() for v in values]
+        return {f"p{q}": percentile(values, q) for q in (50, 90, 95, 99)} | {"max": max(values, default=0.0)}
+    
+    @property
+    def peak_rss(self) -> int:
+        return max((sample.rss_bytes for sample in self.samples), default=0)
+    
+    @property
+    def mean_cpu(self) -> float:
+        return sum(s.cpu_percent for s in self.samples) / len(self.samples) if self.samples else 0.0
+
+class LoadTester:
+    """Drive concurrent synthetic viewers against a running Streamlit server on localhost
+    
+    Viewers connect over ramp_up seconds, then loop until the duration is over:
+    think, then either rerun the script or change one of its widgets. Rerun latency is
+    the time from sending the BackMsg to script_finished. If a server pid is given,
+    its process tree's CPU and RSS are sampled throughout.
+    """
+    
+    def __init__(
+        self,
+        port: int,
+        viewers: int = LOAD_TEST_VIEWERS,
+        duration: float = LOAD_TEST_DURATION,
+        think_time: float = LOAD_TEST_THINK_TIME,
+        widget_ratio: float = 0.5,
+        ramp_up: float = 1.0,
+        server_pid: Optional[int] = None,
+        base_url_path: str = "",
+        seed: Optional[int] = None,
+    ):
+        prefix = f"/{base_url_path.strip('/')}" if base_url_path.strip("/") else ""
+        self.url = f"http://localhost:{port}{prefix}/_stcore/stream"
+        self.viewers = viewers
+        self.duration = duration
+        self.think_time = think_time
+        self.widget_ratio = widget_ratio  # Share of runs that change a widget rather than plain reruns
+        self.ramp_up = ramp_up
+        self.server_pid = server_pid
+        self.rng = random.Random(seed)
+    
+    async def run(self) -> LoadTestReport:
+        loop = asyncio.get_running_loop()
+        report = LoadTestReport(viewers=self.viewers, duration=self.duration)
+        started = loop.time()
+        deadline = started + self.ramp_up + self.duration
+        
+        connector = aiohttp.TCPConnector(limit=0)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            sampler = asyncio.create_task(self._sample(report, started))
+            try:
+                await asyncio.gather(*(
+                    self._viewer(session, report, index * self.ramp_up / max(self.viewers, 1), deadline)
+                    for index in range(self.viewers)
+                ))
+            finally:
+                sampler.cancel()
+                await asyncio.gather(sampler, return_exceptions=True)
+        
+        report.duration = loop.time() - started
+        logger.info(
+            f"Load test: {self.viewers} viewers, {report.completed} runs, {report.throughput:.1f}/s, "
+            f"p95 {report.percentiles()['p95'] * 1000:.0f}ms, {report.errors} errors, {report.timeouts} timeouts"
+        )
+        return report
+    
+    async def _viewer(self, session: aiohttp.ClientSession, report: LoadTestReport, delay: float, deadline: float):
+        loop = asyncio.get_running_loop()
+        await asyncio.sleep(delay)
+        viewer = ViewerSession(session, self.url)
+        try:
+            while loop.time() < deadline:
+                if not viewer.connected:
+                    try:
+                        await viewer.connect()
+                    except aiohttp.ClientError as e:
+                        report.disconnects += 1
+                        logger.debug(f"Viewer failed to connect: {str(e)}")
+                        await asyncio.sleep(0.5)
+                        continue
+                
+                # A fresh viewer loads the page first, like a browser
+                change = None
+                if viewer.widgets and self.rng.random() < self.widget_ratio:
+                    change = viewer.random_change(self.rng)
+                kind = "widget" if change else "rerun"
+                
+                start = loop.time()
+                try:
+                    ok = await asyncio.wait_for(viewer.rerun(change[1] if change else None), LOAD_TEST_RERUN_TIMEOUT)
+                except asyncio.TimeoutError:
+                    report.timeouts += 1
+                    await viewer.close()
+                    continue
+                except (ConnectionError, aiohttp.ClientError):
+                    report.disconnects += 1
+                    await viewer.close()
+                    continue
+                
+                latency = loop.time() - start
+                report.latencies[kind].append(latency)
+                metrics.record(f"load_test.{kind}", latency)
+                if not ok:
+                    report.errors += 1
+                await asyncio.sleep(self.rng.uniform(0, 2 * self.think_time))
+        finally:
+            await viewer.close()
+    
+    async def _sample(self, report: LoadTestReport, started: float):
+        if not self.server_pid or not proc_available():
+            return
+        loop = asyncio.get_running_loop()
+        previous = None
+        while True:
+            previous = sample_tree(self.server_pid, previous, children_map())
+            if previous is None:
+                return  # Server is gone
+            report.samples.append(ResourceSample(loop.time() - started, previous.cpu_percent, previous.rss_bytes))
+            await asyncio.sleep(LOAD_TEST_SAMPLE_INTERVAL)
\ No newline at end of file
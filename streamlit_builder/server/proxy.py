@@ -0,0 +1,181 @@
+import asyncio
+import socket
+from collections import defaultdict
+from typing import Dict, Optional, Set
+
+import aiohttp
+from aiohttp import web
+from multidict import CIMultiDict
+
+from ..utils.logger import logger
+from ..utils.metrics import metrics
+from ..core.constants import PROXY_DRAIN_TIMEOUT
+
+# Headers that describe one hop and must not be forwarded
+_HOP_BY_HOP = {
+    "connection", "keep-alive", "proxy-authenticate", "proxy-authorization", "te", "trailer",
+    "transfer-encoding", "upgrade", "content-length", "sec-websocket-key", "sec-websocket-version",
+    "sec-websocket-extensions", "sec-websocket-accept", "sec-websocket-protocol",
+}
+
+def free_port(host: str = "127.0.0.1") -> int:
+    """Ask the OS for a port nothing is listening on"""
+    with socket.socket() as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+def _forward_headers(headers) -> CIMultiDict:
+    return CIMultiDict((key, value) for key, value in headers.items() if key.lower() not in _HOP_BY_HOP)
+
+class ReverseProxy:
+    """Local HTTP and websocket reverse proxy whose upstream can be switched atomically
+    
+    Every request and websocket is pinned to the upstream that was current when it
+    arrived, so after a switch the old upstream can be drained: in-flight requests
+    finish, then its websockets are closed and browsers reconnect to the new one.
+    The Host header is passed through unchanged so Streamlit's origin checks see the
+    address the browser used.
+    """
+    
+    def __init__(self, port: int, upstream_port: int, host: str = "127.0.0.1"):
+        self.port = port
+        self.upstream_port = upstream_port
+        self.host = host
+        self.switches = 0
+        self._runner: Optional[web.AppRunner] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._inflight: Dict[int, int] = defaultdict(int)  # HTTP requests per upstream port
+        self._sockets: Dict[int, Set[web.WebSocketResponse]] = defaultdict(set)
+        self._idle = asyncio.Condition()
+    
+    async def start(self):
+        """Start accepting connections"""
+        # Bodies are relayed as-is, still compressed if the upstream compressed them
+        self._session = aiohttp.ClientSession(
+            auto_decompress=False,
+            timeout=aiohttp.ClientTimeout(total=None, sock_connect=5),
+        )
+        app = web.Application()
+        app.router.add_route("*", "/{path:.*}", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        logger.info(f"Proxy listening on port {self.port}, forwarding to {self.upstream_port}")
+    
+    async def stop(self):
+        """Close all connections and stop listening"""
+        for port in list(self._sockets):
+            await self._close_sockets(port)
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+        if self._session:
+            await self._session.close()
+            self._session = None
+    
+    def switch(self, port: int) -> int:
+        """Send new connections to another upstream and return the previous one"""
+        previous, self.upstream_port = self.upstream_port, port
+        self.switches += 1
+        metrics.increment("proxy.switches")
+        logger.info(f"Proxy switched from port {previous} to {port}")
+        return previous
+    
+    def connections(self, port: int) -> int:
+        """Open requests and websockets pinned to an upstream"""
+        return self._inflight[port] + len(self._sockets[port])
+    
+    async def drain(self, port: int, timeout: float = PROXY_DRAIN_TIMEOUT):
+        """Let an old upstream's requests finish, then close its websockets"""
+        try:
+            async with self._idle:
+                await asyncio.wait_for(self._idle.wait_for(lambda: not self._inflight[port]), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"{self._inflight[port]} requests to port {port} still open after {timeout:.0f}s")
+        await self._close_sockets(port)
+    
+    async def _close_sockets(self, port: int):
+        sockets = self._sockets.pop(port, set())
+        # 1012 tells the browser the service restarted; Streamlit reconnects and reruns
+        await asyncio.gather(
+            *(ws.close(code=aiohttp.WSCloseCode.SERVICE_RESTART, message=b"Server restarted") for ws in sockets),
+            return_exceptions=True
+        )
+    
+    def _url(self, port: int, request: web.Request) -> str:
+        return f"http://{self.host}:{port}{request.rel_url}"
+    
+    async def _upstream(self, request: web.Request) -> int:
+        """Pick the upstream port for a request"""
+        return self.upstream_port
+    
+    def _released(self, port: int):
+        """Called when a request or websocket to an upstream ends"""
+    
+    async def _handle(self, request: web.Request) -> web.StreamResponse:
+        port = await self._upstream(request)  # Pinned for the lifetime of this request
+        if request.headers.get("Upgrade", "").lower() == "websocket":
+            return await self._proxy_websocket(request, port)
+        return await self._proxy_http(request, port)
+    
+    async def _proxy_http(self, request: web.Request, port: int) -> web.StreamResponse:
+        self._inflight[port] += 1
+        try:
+            async with self._session.request(
+                request.method,
+                self._url(port, request),
+                headers=_forward_headers(request.headers),
+                data=await request.read() if request.can_read_body else None,
+                allow_redirects=False,
+            ) as upstream:
+                body = await upstream.read()
+                return web.Response(status=upstream.status, headers=_forward_headers(upstream.headers), body=body)
+        except aiohttp.ClientError as e:
+            logger.warning(f"Proxy request to port {port} failed: {str(e)}")
+            return web.Response(status=502, text="Upstream unavailable")
+        finally:
+            self._inflight[port] -= 1
+            self._released(port)
+            async with self._idle:
+                self._idle.notify_all()
+    
+    async def _proxy_websocket(self, request: web.Request, port: int) -> web.StreamResponse:
+        protocols = [p.strip() for p in request.headers.get("Sec-WebSocket-Protocol", "").split(",") if p.strip()]
+        try:
+            upstream = await self._session.ws_connect(
+                self._url(port, request),
+                headers=_forward_headers(request.headers),
+                protocols=protocols,
+                max_msg_size=0,
+                autoping=True,
+            )
+        except (aiohttp.ClientError, aiohttp.WSServerHandshakeError) as e:
+            logger.warning(f"Proxy websocket to port {port} failed: {str(e)}")
+            return web.Response(status=502, text="Upstream unavailable")
+        
+        client = web.WebSocketResponse(protocols=[upstream.protocol] if upstream.protocol else (), max_msg_size=0)
+        await client.prepare(request)
+        self._sockets[port].add(client)
+        try:
+            pumps = [asyncio.create_task(self._pump(client, upstream)), asyncio.create_task(self._pump(upstream, client))]
+            # Either side closing ends the pair
+            _, pending = await asyncio.wait(pumps, return_when=asyncio.FIRST_COMPLETED)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        finally:
+            self._sockets.get(port, set()).discard(client)
+            await upstream.close()
+            await client.close()
+            self._released(port)
+        return client
+    
+    @staticmethod
+    async def _pump(source, dest):
+        async for message in source:
+            if message.type == aiohttp.WSMsgType.TEXT:
+                await dest.send_str(message.data)
+            elif message.type == aiohttp.WSMsgType.BINARY:
+                await dest.send_bytes(message.data)
+            elif message.type == aiohttp.WSMsgType.ERROR:
+                break
\ No newline at end of file
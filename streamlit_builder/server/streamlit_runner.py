@@ -1,20 +1,61 @@
 from pathlib import Path
 import asyncio
-from typing import Optional, Dict
-import signal
+import os
+import re
+from typing import Optional, Dict, Union
 import aiohttp
 
 from ..utils.logger import logger
+from ..utils.metrics import metrics
+from ..core.constants import (
+    CompilePriority,
+    BUILDER_DIR,
+    STREAMLIT_START_TIMEOUT,
+    STREAMLIT_READY_PATTERN,
+    HEALTH_POLL_INITIAL,
+    HEALTH_POLL_MAX,
+    DATASET_CACHE_DIR,
+    DATASET_CACHE_MAX_BYTES,
+)
+from ..core.container.bytecode import BytecodeCompiler
 from ..core.container.terminal import Terminal
+from ..core.container.handle import ProcessHandle, ProcessExitedError
+from .forkserver import ForkServer, ForkedProcess
+from .proxy import ReverseProxy, free_port
 
 class StreamlitRunner:
-    """Manages Streamlit server instances"""
+    """Manages Streamlit server instances
     
-    def __init__(self, terminal: Terminal, project_root: Path):
+    With blue_green, viewers connect to a local reverse proxy on the public port and
+    Streamlit listens on a spare one. A restart then starts the replacement next to
+    the running server, switches the proxy once it is ready and drains the old one,
+    so viewers see a reconnect and rerun instead of a dead page.
+    """
+    
+    def __init__(
+        self,
+        terminal: Terminal,
+        project_root: Path,
+        bytecode: Optional[BytecodeCompiler] = None,
+        blue_green: bool = False,
+        base_url_path: str = "",
+        forkserver: Optional[ForkServer] = None,
+    ):
         self.terminal = terminal
         self.project_root = project_root
-        self._process: Optional[asyncio.subprocess.Process] = None
-        self._port: int = 8501  # Default port
+        self.bytecode = bytecode  # Precompiles the app so startup doesn't
+        self.blue_green = blue_green
+        self.base_url_path = base_url_path.strip("/")  # Serve under /<path>/ instead of /
+        self.forkserver = forkserver  # Starts the server from a warm interpreter when running
+        self.proxy: Optional[ReverseProxy] = None
+        self._process: Optional[Union[ProcessHandle, ForkedProcess]] = None
+        self._port: int = 8501  # Default port, the one viewers connect to
+        self._server_port: int = self._port  # Where Streamlit listens; differs behind the proxy
+        self._app_path = "app.py"
+        self._restart_lock = asyncio.Lock()
+        self._restarts_requested = 0
+        self._restarts_covered = 0  # Requests served by a restart that began after them
+        self.restarts = 0
         
     async def start(self, app_path: str = "app.py", port: Optional[int] = None):
         """Start Streamlit server"""
@@ -25,54 +66,228 @@ class StreamlitRunner:
         try:
             if port is not None:
                 self._port = port
-                
-            cmd = ["streamlit", "run", app_path, "--server.port", str(self._port)]
+            self._app_path = app_path
+            self._server_port = free_port() if self.blue_green else self._port
+            
+            precompiled = await self._precompile()
+            started = asyncio.get_running_loop().time()
             
-            # Start streamlit process
-            self._process = await self.terminal.execute(
-                cmd,
-                "streamlit_server",
-                wait=False  # Don't wait for completion
-            )
+            self._process = await self._launch(self._server_port)
+            forked = isinstance(self._process, ForkedProcess)
             
             # Wait for server to start
             await self._wait_for_server()
-            logger.info(f"Streamlit server started on port {self._port}")
+            
+            if self.blue_green and not self.proxy:
+                self.proxy = ReverseProxy(self._port, self._server_port)
+                await self.proxy.start()
+            elif self.proxy:
+                self.proxy.switch(self._server_port)
+            
+            # Compare the two series to see what precompilation saves
+            elapsed = asyncio.get_running_loop().time() - started
+            metrics.record("streamlit.cold_start", elapsed)
+            metrics.record(f"streamlit.cold_start.{'precompiled' if precompiled else 'uncompiled'}", elapsed)
+            metrics.record(f"streamlit.cold_start.{'forked' if forked else 'exec'}", elapsed)
+            logger.info(f"Streamlit server started on port {self._port} in {elapsed:.2f}s")
             
         except Exception as e:
             logger.error(f"Failed to start Streamlit server: {str(e)}")
             await self.stop()
             raise
     
+    async def _precompile(self) -> bool:
+        """Compile the entry point and return whether nothing else is left to compile
+        
+        The entry point and its project modules are cheap to compile and usually
+        already are; installed packages keep compiling in the background.
+        """
+        if not self.bytecode:
+            return False
+        self.bytecode.submit_app(self.project_root / self._app_path)
+        await self.bytecode.wait(CompilePriority.ENTRY)
+        return self.bytecode.is_idle
+    
+    async def _launch(self, port: int) -> Union[ProcessHandle, ForkedProcess]:
+        """Spawn a Streamlit server for the app on a port, forked from a warm interpreter if possible"""
+        # runOnSave reruns the script in place when app code changes, keeping state and caches
+        args = ["run", self._app_path, "--server.port", str(port), "--server.runOnSave", "true"]
+        if self.base_url_path:
+            args += ["--server.baseUrlPath", self.base_url_path]
+        name = f"streamlit_server_{port}" if self.blue_green else "streamlit_server"
+        # Apps share one cache of remote datasets through dataset_cache.py
+        env = {
+            "STREAMLIT_BUILDER_DATASET_CACHE": str(DATASET_CACHE_DIR),
+            "STREAMLIT_BUILDER_DATASET_CACHE_BYTES": str(DATASET_CACHE_MAX_BYTES),
+        }
+        
+        if self.forkserver and self.forkserver.is_running:
+            try:
+                log_path = self.project_root / BUILDER_DIR / "logs" / f"{name}.log"
+                return await self.forkserver.spawn(self.project_root, args, log_path, env=env, name=name)
+            except Exception as e:
+                logger.warning(f"Fork server failed, starting Streamlit normally: {str(e)}")
+        elif self.forkserver:
+            logger.warning("Fork server is not running, starting Streamlit normally")
+        
+        # Start streamlit process in the background, unbuffered so the banner arrives promptly
+        return await self.terminal.execute(
+            ["streamlit", *args],
+            name,
+            env={**os.environ, "PYTHONUNBUFFERED": "1", **env},
+            wait=False  # Returns a handle as soon as the process is spawned
+        )
+    
+    @property
+    def has_exited(self) -> bool:
+        """The server was started and has since died"""
+        return self._process is not None and self._process.returncode is not None
+    
+    @property
+    def pid(self) -> Optional[int]:
+        """Pid of the running Streamlit server, the root of its process tree"""
+        return self._process.pid if self._process else None
+    
     async def stop(self):
-        """Stop Streamlit server"""
+        """Stop Streamlit server and the proxy in front of it"""
+        if self.proxy:
+            await self.proxy.stop()
+            self.proxy = None
+        await self._stop_process()
+    
+    async def _stop_process(self):
         if self._process:
             try:
-                self._process.send_signal(signal.SIGTERM)
-                await self._process.wait()
+                # Stops the whole process group so no Streamlit workers are left behind
+                await self._process.terminate()
                 logger.info("Streamlit server stopped")
             except Exception as e:
                 logger.error(f"Error stopping Streamlit server: {str(e)}")
             finally:
                 self._process = None
     
-    async def restart(self):
-        """Restart Streamlit server"""
-        current_port = self._port
-        await self.stop()
-        await self.start(port=current_port)  # Always restart with same port
-    
-    async def _wait_for_server(self, timeout: int = 10):
-        """Wait for Streamlit server to start"""
-        start_time = asyncio.get_event_loop().time()
+    async def restart(self) -> bool:
+        """Restart Streamlit server, once for any number of overlapping calls
         
-        while True:
+        A call made while a restart is in flight waits for it and then joins a single
+        follow-up restart, so no change is missed and stop/start never interleave.
+        Returns False if a restart started by another call already covered this one.
+        """
+        self._restarts_requested += 1
+        ticket = self._restarts_requested
+        async with self._restart_lock:
+            if self._restarts_covered >= ticket:
+                return False
+            covered, self._restarts_covered = self._restarts_covered, self._restarts_requested
+            current_port = self._port
             try:
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(f"http://localhost:{self._port}", timeout=1.0) as resp:
+                if self.proxy and self._process and not self.has_exited:
+                    await self._swap()
+                elif self.proxy:
+                    # Nothing left to serve viewers; keep the proxy and its port while replacing it
+                    await self._stop_process()
+                    await self.start(port=current_port)
+                else:
+                    await self.stop()
+                    await self.start(port=current_port)  # Always restart with same port
+            except Exception:
+                self._restarts_covered = covered  # Let the calls waiting behind retry
+                raise
+            self.restarts += 1
+            return True
+    
+    async def _swap(self):
+        """Blue/green restart: ready a replacement, switch the proxy, drain the old server"""
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await self._precompile()
+        
+        old, old_port = self._process, self._server_port
+        new_port = free_port()
+        new = await self._launch(new_port)
+        try:
+            await self._wait_for_server(process=new, port=new_port)
+        except Exception:
+            # The old server keeps serving
+            await new.terminate()
+            raise
+        
+        # Viewers are on the new server from here; the rest is cleanup
+        switched = loop.time()
+        self.proxy.switch(new_port)
+        self._process, self._server_port = new, new_port
+        await self.proxy.drain(old_port)
+        drained = loop.time()
+        await old.terminate()
+        
+        metrics.record("streamlit.switchover", drained - switched)
+        metrics.record("streamlit.blue_green_restart", loop.time() - started)
+        logger.info(
+            f"Switched Streamlit from port {old_port} to {new_port}: ready after {switched - started:.2f}s, "
+            f"old server drained in {drained - switched:.2f}s"
+        )
+    
+    async def _wait_for_server(
+        self,
+        timeout: float = STREAMLIT_START_TIMEOUT,
+        process: Optional[Union[ProcessHandle, ForkedProcess]] = None,
+        port: Optional[int] = None,
+    ) -> str:
+        """Wait until the server is ready and return how that was noticed
+        
+        Whichever comes first wins: the startup banner on stdout, or a 200 from the
+        health endpoint. Health checks start fast and back off, so a quick start isn't
+        held up by a long poll interval. Fails early if the process exits instead.
+        """
+        process = process or self._process
+        port = port or self._server_port
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        banner = asyncio.create_task(self._wait_for_banner(process))
+        health = asyncio.create_task(self._poll_health(port))
+        pending = {banner, health}
+        try:
+            deadline = started + timeout
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, timeout=max(0.0, deadline - loop.time()), return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    raise TimeoutError(f"Streamlit server not ready after {timeout:.0f}s")
+                for task in done:
+                    if task is health or not task.exception():
+                        source = task.result()
+                        elapsed = loop.time() - started
+                        metrics.increment(f"streamlit.ready.{source}")
+                        metrics.record("streamlit.startup", elapsed)
+                        logger.debug(f"Streamlit ready on port {port} after {elapsed:.2f}s ({source})")
+                        return source
+                    if isinstance(task.exception(), ProcessExitedError):
+                        raise RuntimeError(f"Streamlit server failed to start: {str(task.exception())}")
+                    # No usable output stream; keep polling the health endpoint
+                    logger.debug(f"Not watching Streamlit output: {str(task.exception())}")
+            raise TimeoutError(f"Streamlit server not ready after {timeout:.0f}s")
+        finally:
+            for task in (banner, health):
+                task.cancel()
+            await asyncio.gather(banner, health, return_exceptions=True)
+    
+    async def _wait_for_banner(self, process: Union[ProcessHandle, ForkedProcess]) -> str:
+        await process.wait_for(re.compile(STREAMLIT_READY_PATTERN))
+        return "banner"
+    
+    async def _poll_health(self, port: int) -> str:
+        """Poll the health endpoint over one connection pool until it answers 200"""
+        prefix = f"/{self.base_url_path}" if self.base_url_path else ""
+        url = f"http://localhost:{port}{prefix}/_stcore/health"
+        delay = HEALTH_POLL_INITIAL
+        async with aiohttp.ClientSession() as session:
+            while True:
+                try:
+                    async with session.get(url, timeout=aiohttp.ClientTimeout(total=1.0)) as resp:
                         if resp.status == 200:
-                            return
-            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
-                if asyncio.get_event_loop().time() - start_time > timeout:
-                    raise TimeoutError(f"Streamlit server failed to start: {str(e)}")
-                await asyncio.sleep(0.5) 
\ No newline at end of file
+                            return "health"
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    pass
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, HEALTH_POLL_MAX)
\ No newline at end of file
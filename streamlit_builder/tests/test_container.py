@@ -1,7 +1,19 @@
+import asyncio
+import os
+import signal
 import pytest
 import pytest_asyncio
+import sys
 from pathlib import Path
 from streamlit_builder.core.container.webcontainer import WebContainer, ContainerConfig
+from streamlit_builder.core.container.terminal import Terminal
+from streamlit_builder.core.container.output import LineDecoder, OutputBuffer
+from streamlit_builder.core.container.handle import ProcessHandle, ProcessExitedError
+from streamlit_builder.core.constants import CommandClass, CompilePriority
+from streamlit_builder.core.container.bytecode import BytecodeCompiler
+from streamlit_builder.core.container.process import ProcessManager, CommandTimeoutError, classify_command, terminate_process_group
+from streamlit_builder.core.container.resources import BreachAction, ResourceLimits, children_map
+from streamlit_builder.core.constants import SHELL_PROCESS_NAME
 
 @pytest_asyncio.fixture
 async def container(tmp_path):
@@ -35,4 +47,318 @@ async def test_file_operations(container):
     # Test file deletion
     await container.fs.delete_file("test.py")
     files = await container.fs.list_files()
-    assert len(files) == 0 
\ No newline at end of file
+    assert len(files) == 0 
+
+@pytest.mark.asyncio
+async def test_terminal_output_buffer(tmp_path):
+    terminal = Terminal(tmp_path)
+    received = []
+    terminal.add_output_handler("echo", received.append)
+    
+    returncode = await terminal.execute(
+        [sys.executable, "-c", "import sys; print('out'); print('err', file=sys.stderr)"],
+        "echo"
+    )
+    
+    assert returncode == 0
+    assert sorted(received) == ["err", "out"]
+    assert sorted(terminal.get_output("echo")) == ["err", "out"]
+    assert terminal.get_output("missing") == []
+
+def test_line_decoder_split_chunks():
+    decoder = LineDecoder()
+    data = "héllo\nwörld".encode()
+    
+    # Split inside a multi-byte character
+    assert decoder.feed(data[:2]) == []
+    assert decoder.feed(data[2:]) == ["héllo"]
+    assert decoder.flush() == ["wörld"]
+
+def test_output_buffer_bounded():
+    buffer = OutputBuffer(max_lines=3, max_bytes=1024)
+    buffer.extend([str(i) for i in range(5)])
+    
+    assert buffer.lines() == ["2", "3", "4"]
+    assert buffer.lines(last=1) == ["4"]
+    assert buffer.total_lines == 5
+    assert buffer.dropped_lines == 2
+
+@pytest.mark.asyncio
+async def test_terminal_background_process(tmp_path):
+    terminal = Terminal(tmp_path)
+    script = "import time; print('booting', flush=True); time.sleep(0.2); print('ready now', flush=True)"
+    
+    handle = await terminal.execute([sys.executable, "-c", script], "server", wait=False)
+    assert isinstance(handle, ProcessHandle)
+    assert handle.returncode is None
+    
+    line = await handle.wait_for(r"ready", timeout=5)
+    assert line == "ready now"
+    
+    # Late subscribers can replay the scrollback
+    lines = [line async for line in handle.subscribe(replay=True)]
+    assert lines == ["booting", "ready now"]
+    assert await handle.wait() == 0
+
+@pytest.mark.asyncio
+async def test_terminal_wait_for_exited_process(tmp_path):
+    terminal = Terminal(tmp_path)
+    handle = await terminal.execute([sys.executable, "-c", "print('bye')"], "short", wait=False)
+    
+    with pytest.raises(ProcessExitedError):
+        await handle.wait_for("never", timeout=5)
+
+@pytest.mark.asyncio
+async def test_persistent_shell_keeps_state(tmp_path):
+    (tmp_path / "sub").mkdir()
+    terminal = Terminal(tmp_path, persistent_shell=True, venv_path=tmp_path / ".venv")
+    
+    try:
+        assert await terminal.execute(["cd", "sub"], "cd") == 0
+        assert await terminal.execute(["pwd"], "pwd") == 0
+        assert terminal.get_output("pwd") == [str(tmp_path / "sub")]
+        
+        assert await terminal.execute(["sh", "-c", "echo -n partial; exit 3"], "fail") == 3
+        assert terminal.get_output("fail") == ["partial"]
+        
+        assert await terminal.execute(["sh", "-c", "echo $VIRTUAL_ENV"], "venv") == 0
+        assert terminal.get_output("venv") == [str(tmp_path / ".venv")]
+    finally:
+        await terminal.cleanup()
+
+@pytest.mark.asyncio
+async def test_process_stats_include_children(tmp_path):
+    manager = ProcessManager(tmp_path)
+    script = "import subprocess, sys, time; subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(5)']); time.sleep(5)"
+    await manager.run([sys.executable, "-c", script], "tree")
+    
+    try:
+        stats = None
+        for _ in range(50):
+            stats = manager.get_stats("tree")
+            if stats and stats.num_processes == 2:
+                break
+            await asyncio.sleep(0.1)
+        
+        assert stats is not None
+        assert stats.num_processes == 2
+        assert stats.rss_bytes > 0
+        assert stats.open_fds > 0
+        assert "tree" in manager.stats()
+    finally:
+        for pid in reversed(stats.pids if stats else []):
+            os.kill(pid, signal.SIGKILL)
+        await manager.cleanup()
+    
+    assert manager.get_stats("tree") is None
+
+@pytest.mark.asyncio
+async def test_process_rlimits_applied(tmp_path):
+    terminal = Terminal(tmp_path, limits=ResourceLimits(cpu_seconds=30, memory_bytes=2 * 1024 ** 3))
+    script = "import resource; print(resource.getrlimit(resource.RLIMIT_CPU)[0], resource.getrlimit(resource.RLIMIT_AS)[0])"
+    
+    assert await terminal.execute([sys.executable, "-c", script], "limits") == 0
+    assert terminal.get_output("limits") == [f"30 {2 * 1024 ** 3}"]
+
+@pytest.mark.asyncio
+async def test_shell_commands_get_limits(tmp_path):
+    limits = ResourceLimits(cpu_seconds=30, max_rss_bytes=2 ** 40)
+    terminal = Terminal(tmp_path, persistent_shell=True, limits=limits)
+    script = "import resource; print(resource.getrlimit(resource.RLIMIT_CPU)[0])"
+    try:
+        assert await terminal.execute([sys.executable, "-c", script], "limits") == 0
+        assert terminal.get_output("limits") == ["30"]
+        # The shell's process tree is monitored like any other managed process
+        assert await terminal.process_manager.is_running(SHELL_PROCESS_NAME)
+        assert SHELL_PROCESS_NAME in terminal.process_manager.stats()
+    finally:
+        await terminal.cleanup()
+
+def test_children_map_shared_within_a_tick():
+    first = children_map()
+    assert children_map() is first
+    assert children_map(max_age=0) is not first
+
+@pytest.mark.asyncio
+async def test_process_killed_on_breach(tmp_path):
+    limits = ResourceLimits(max_rss_bytes=1, on_breach=BreachAction.KILL)
+    manager = ProcessManager(tmp_path, limits=limits, sample_interval=0.05)
+    process = await manager.run([sys.executable, "-c", "import time; time.sleep(30)"], "hog")
+    
+    returncode = await asyncio.wait_for(process.wait(), timeout=5)
+    assert returncode == -signal.SIGKILL
+    await manager.cleanup()
+
+@pytest.mark.asyncio
+async def test_exited_processes_are_forgotten_and_not_signalled(tmp_path, monkeypatch):
+    manager = ProcessManager(tmp_path)
+    process = await manager.run([sys.executable, "-c", "pass"], "quick")
+    await process.wait()
+    for _ in range(50):
+        if "quick" not in manager._processes:
+            break
+        await asyncio.sleep(0.01)
+    assert not await manager.is_running("quick")
+    assert "quick" not in manager._processes
+    
+    # The pid of a reaped leader may already lead someone else's group
+    signalled = []
+    monkeypatch.setattr(os, "killpg", lambda pid, sig: signalled.append(pid))
+    assert await terminate_process_group(process) == 0
+    assert signalled == []
+    await manager.cleanup()
+
+@pytest.mark.asyncio
+async def test_stop_all_escalates_and_reaps_group(tmp_path):
+    manager = ProcessManager(tmp_path)
+    stubborn = "import signal, time; signal.signal(signal.SIGTERM, signal.SIG_IGN); print('up', flush=True); time.sleep(30)"
+    parent = f"import subprocess, sys, time; subprocess.Popen([sys.executable, '-c', {stubborn!r}]); time.sleep(30)"
+    
+    processes = [
+        await manager.run([sys.executable, "-c", stubborn], "stubborn"),
+        await manager.run([sys.executable, "-c", parent], "parent"),
+    ]
+    await processes[0].stdout.readline()
+    
+    # Wait for the grandchild so there is something to orphan
+    grandchild = None
+    for _ in range(50):
+        stats = manager.get_stats("parent")
+        if stats and stats.num_processes == 2:
+            grandchild = stats.pids[1]
+            break
+        await asyncio.sleep(0.1)
+    assert grandchild is not None
+    
+    elapsed = await manager.stop_all(timeout=0.5)
+    
+    # Both stopped concurrently within one deadline plus the SIGKILL grace period
+    assert elapsed < 0.5 + 2.0
+    assert all(process.returncode is not None for process in processes)
+    # Killed grandchildren may linger as zombies until init reaps them
+    stat = Path(f"/proc/{grandchild}/stat")
+    
+    def gone():
+        try:
+            return stat.read_text().rsplit(")", 1)[1].split()[0] == "Z"
+        except FileNotFoundError:
+            return True
+    
+    for _ in range(20):
+        if gone():
+            break
+        await asyncio.sleep(0.05)
+    assert gone()
+
+@pytest.mark.asyncio
+async def test_memoized_command_replays_output(tmp_path, monkeypatch):
+    (tmp_path / "count.py").write_text(
+        "import sys\nwith open('runs.txt', 'a') as f: f.write('x')\nprint('installed', open(sys.argv[2]).read())"
+    )
+    (tmp_path / "reqs.txt").write_text("streamlit")
+    terminal = Terminal(tmp_path, venv_path=tmp_path / ".venv")
+    command = [sys.executable, "count.py", "-r", "reqs.txt"]
+    terminal.command_cache.declare_idempotent(command[:2])
+    
+    assert await terminal.execute(command, "install", memoize=True) == 0
+    assert await terminal.execute(command, "install", memoize=True) == 0
+    assert (tmp_path / "runs.txt").read_text() == "x"
+    assert terminal.get_output("install") == ["installed streamlit"]
+    assert terminal.command_cache.hits == 1
+    
+    # Changed input file re-runs
+    (tmp_path / "reqs.txt").write_text("pandas")
+    await terminal.execute(command, "install", memoize=True)
+    assert (tmp_path / "runs.txt").read_text() == "xx"
+    
+    # Bypass re-runs
+    monkeypatch.setenv("STREAMLIT_BUILDER_NO_MEMO", "1")
+    await terminal.execute(command, "install", memoize=True)
+    assert (tmp_path / "runs.txt").read_text() == "xxx"
+    
+    # Commands that aren't idempotent are never memoized
+    assert not terminal.command_cache.is_idempotent(["streamlit", "run", "app.py"])
+
+
+def test_classify_command():
+    assert classify_command([".venv/bin/streamlit", "run", "app.py"]) == CommandClass.SERVER
+    assert classify_command(["python3.12", "-m", "pip", "install", "pandas"]) == CommandClass.INSTALL
+    assert classify_command(["uv", "pip", "install", "pandas"]) == CommandClass.INSTALL
+    assert classify_command(["python", "app.py"]) == CommandClass.RUN
+
+@pytest.mark.asyncio
+async def test_command_deadline_stops_process(tmp_path):
+    events = []
+    terminal = Terminal(tmp_path)
+    terminal.process_manager.timeout_handlers.append(events.append)
+    
+    with pytest.raises(CommandTimeoutError) as exc_info:
+        await terminal.execute([sys.executable, "-c", "import time; time.sleep(30)"], "hang", timeout=0.3)
+    assert exc_info.value.event.command_class == CommandClass.RUN
+    assert events == [exc_info.value.event]
+    
+    # Commands that finish in time are unaffected
+    assert await terminal.execute([sys.executable, "-c", "pass"], "quick", timeout=5) == 0
+    await terminal.cleanup()
+
+@pytest.mark.asyncio
+async def test_shell_command_deadline_restarts_shell(tmp_path):
+    terminal = Terminal(tmp_path, persistent_shell=True)
+    events = []
+    
+    def failing_handler(event):
+        raise RuntimeError("handler failed")
+    
+    terminal.process_manager.timeout_handlers += [failing_handler, events.append]
+    try:
+        with pytest.raises(CommandTimeoutError) as exc_info:
+            await terminal.execute(["sleep", "30"], "hang", timeout=0.3)
+        # A failing handler neither hides the timeout nor skips the handlers after it
+        assert events == [exc_info.value.event]
+        assert await terminal.execute(["echo", "alive"], "echo") == 0
+        assert terminal.get_output("echo") == ["alive"]
+    finally:
+        await terminal.cleanup()
+
+@pytest.mark.asyncio
+async def test_bytecode_compiles_entry_point_first(tmp_path):
+    (tmp_path / "app.py").write_text("import helpers\nimport json\n")
+    (tmp_path / "helpers.py").write_text("X = 1\n")
+    (tmp_path / "other.py").write_text("Y = 2\n")
+    terminal = Terminal(tmp_path)
+    compiler = BytecodeCompiler(terminal, tmp_path / ".venv")
+    
+    batches = []
+    compile_batch = compiler._compile
+    async def record(paths, priority):
+        batches.append((priority, sorted(p.name for p in paths)))
+        await compile_batch(paths, priority)
+    compiler._compile = record
+    
+    compiler.submit([tmp_path / "other.py"], CompilePriority.APP)
+    compiler.submit_app(tmp_path / "app.py")
+    await compiler.wait()
+    await terminal.cleanup()
+    
+    assert batches == [
+        (CompilePriority.ENTRY, ["app.py", "helpers.py"]),
+        (CompilePriority.APP, ["other.py"]),
+    ]
+    assert compiler.is_idle
+    compiled = {p.name.split(".")[0] for p in (tmp_path / "__pycache__").iterdir()}
+    assert compiled == {"app", "helpers", "other"}
+
+@pytest.mark.asyncio
+async def test_bytecode_compiles_outside_the_persistent_shell(tmp_path):
+    (tmp_path / "app.py").write_text("X = 1\n")
+    terminal = Terminal(tmp_path, persistent_shell=True)
+    compiler = BytecodeCompiler(terminal, tmp_path / ".venv")
+    try:
+        compiler.submit_app(tmp_path / "app.py")
+        await compiler.wait()
+    finally:
+        await terminal.cleanup()
+    
+    assert terminal._shell is None
+    assert 1 <= compiler.workers <= 4
+    assert any(p.name.startswith("app.") for p in (tmp_path / "__pycache__").iterdir())
\ No newline at end of file
@@ -13,6 +13,9 @@ from streamlit_builder.core.llm.action_runner import ActionRunner
 from streamlit_builder.core.container.webcontainer import WebContainer, ContainerConfig
 from streamlit_builder.core.llm.constants import MODEL_NAME, DEFAULT_TEMPERATURE, MAX_TOKENS
 from streamlit_builder.core.llm.prompts import SYSTEM_PROMPT, get_system_prompt
+from streamlit_builder.core.llm.perf_linter import lint_source
+from streamlit_builder.core.llm.chat import ChatSession
+from streamlit_builder.package.wheelhouse import Wheelhouse
 
 @pytest.fixture
 def sample_message():
@@ -34,12 +37,14 @@ $ streamlit run app.py
 """
 
 @pytest.fixture
-def mock_container():
+def mock_container(tmp_path):
     container = Mock(spec=WebContainer)
+    container.config = ContainerConfig(work_dir=tmp_path, env_dir=tmp_path / ".venv")
     container.fs = Mock()
     container.fs.write_file = AsyncMock()
     container.terminal = Mock()
-    container.terminal.execute = AsyncMock()
+    container.terminal.execute = AsyncMock(return_value=0)
+    container.wheelhouse = None
     return container
 
 class TestMessageParser:
@@ -83,8 +88,106 @@ class TestActionRunner:
         await runner.execute_actions([action])
         mock_container.terminal.execute.assert_called_once_with(
             ["uv", "pip", "install", "streamlit"],
-            "install_streamlit"
+            "install_streamlit",
+            memoize=False
         )
+    
+    async def test_package_action_tries_container_wheelhouse(self, mock_container, tmp_path):
+        mock_container.wheelhouse = Wheelhouse(tmp_path / "wheels")
+        runner = ActionRunner(mock_container)
+        
+        await runner.execute_actions([Action(type=ActionType.INSTALL_PACKAGE, package_name="streamlit")])
+        mock_container.terminal.execute.assert_called_once_with(
+            ["uv", "pip", "install", "streamlit", *mock_container.wheelhouse.offline_args()],
+            "install_streamlit_offline",
+            memoize=False
+        )
+    
+    async def test_package_actions_coalesced(self, mock_container):
+        runner = ActionRunner(mock_container)
+        actions = [Action(type=ActionType.INSTALL_PACKAGE, package_name=name) for name in ("pandas", "numpy", "altair")]
+        
+        await runner.execute_actions(actions)
+        mock_container.terminal.execute.assert_called_once_with(
+            ["uv", "pip", "install", "pandas", "numpy", "altair"],
+            "install_packages",
+            memoize=False
+        )
+
+SLOW_APP = """
+import streamlit as st
+import pandas as pd
+from openai import OpenAI
+
+df = pd.read_csv("data.csv")
+client = OpenAI()
+for _, row in df.iterrows():
+    st.write(row)
+
+left, right = st.columns(2)
+with left:
+    n = st.slider("Rows", 1, 10)
+    st.dataframe(df.head(n))
+with right:
+    k = st.slider("Bins", 1, 10)
+st.bar_chart(df.sample(k))
+"""
+
+class TestPerfLinter:
+    def test_flags_rerun_costs(self):
+        findings = {(f.rule, f.line) for f in lint_source(SLOW_APP, "app.py")}
+        assert findings == {("uncached-io", 6), ("uncached-resource", 7), ("row-loop", 8), ("fragment", 12)}
+    
+    def test_cached_code_is_clean(self):
+        source = """
+import streamlit as st
+import pandas as pd
+
+@st.cache_data(ttl=600)
+def load():
+    return pd.read_csv("data.csv")
+
+@st.cache_resource
+def client():
+    from openai import OpenAI
+    return OpenAI()
+
+@st.fragment
+def controls():
+    st.slider("Rows", 1, 10)
+"""
+        assert lint_source(source) == []
+        assert lint_source("def broken(:") == []
+        # The top level of a module without Streamlit runs once when imported, and tests aren't reruns
+        assert lint_source("import pandas as pd\ndf = pd.read_csv('a.csv')", "helpers.py") == []
+        helper = "import pandas as pd\n\ndef load_data(path):\n    return pd.read_csv(path)\n"
+        assert [(f.rule, f.line) for f in lint_source(helper, "utils.py")] == [("uncached-io", 4)]
+        assert lint_source(helper.replace("(path)\n", "(path)  # perf: ignore\n"), "utils.py") == []
+        assert lint_source(SLOW_APP, "tests/test_app.py") == []
+        # A client in st.cache_data gets pickled on every call
+        assert [f.rule for f in lint_source(source.replace("cache_resource", "cache_data"))] == ["uncached-resource"]
+
+@pytest.mark.asyncio
+async def test_chat_sends_findings_back_once(mock_container):
+    mock_container.bytecode = Mock()
+    responses = [
+        '<artifact type="file" title="App" id="app">```python:app.py\nimport pandas as pd\nimport streamlit as st\ndf = pd.read_csv("a.csv")\n```</artifact>',
+        '<artifact type="file" title="App" id="app">```python:app.py\nimport pandas as pd\nimport streamlit as st\ndf = pd.read_json("a.json")\n```</artifact>',
+    ]
+    
+    async def stream_chat(messages, system_prompt):
+        yield responses[len(messages) // 2]
+    
+    model = Mock()
+    model.stream_chat = stream_chat
+    chat = ChatSession(mock_container, model)
+    output = [chunk async for chunk in chat.process_prompt("Build an app")]
+    
+    assert any("performance findings" in chunk for chunk in output)
+    assert [m["role"] for m in chat.messages] == ["user", "assistant", "user", "assistant"]
+    assert "app.py:3 [uncached-io]" in chat.messages[2]["content"]
+    # The rewrite still reads uncached, but only one follow-up is sent per prompt
+    assert chat.perf_findings["uncached-io"] == 2
 
 @pytest.mark.asyncio
 class TestClaudeModel:
@@ -1,8 +1,19 @@
+import asyncio
+import base64
+import hashlib
 import pytest
+import subprocess
+import zipfile
 from pathlib import Path
+from typing import Sequence
 from unittest.mock import AsyncMock, Mock
 
 from streamlit_builder.package.uv_manager import UVManager
+from streamlit_builder.package.coalescer import InstallCoalescer
+from streamlit_builder.package.requirements import parse_requirements, requirements_key
+from streamlit_builder.package.venv_pool import VenvPool
+from streamlit_builder.package import wheelhouse as wheelhouse_module
+from streamlit_builder.package.wheelhouse import Wheelhouse
 from streamlit_builder.core.container.terminal import Terminal
 
 @pytest.fixture
@@ -28,14 +39,252 @@ class TestUVManager:
             "pandas": "==2.2.0"
         }
         
+        mock_terminal.execute.return_value = 0
         await uv_manager.install_requirements(requirements)
         
         # Check if requirements.txt was created
         requirements_path = uv_manager.project_root / "requirements.txt"
-        assert requirements_path.exists()
+        assert requirements_path.read_text() == "streamlit>=1.32.0\npandas==2.2.0"
         
-        # Check if uv install was called
-        mock_terminal.execute.assert_called_once_with(
+        # Without a lock snapshot the whole file is installed
+        assert mock_terminal.execute.call_args_list[0].args == (
             ["uv", "pip", "install", "-r", str(requirements_path)],
             "install_requirements"
-        ) 
\ No newline at end of file
+        )
+    
+    async def test_sync_requirements_installs_only_changes(self, uv_manager, mock_terminal):
+        mock_terminal.execute.return_value = 0
+        mock_terminal.get_output.return_value = ["pandas==2.2.0", "streamlit==1.40.0", "altair==5.0.0"]
+        requirements_path = uv_manager.project_root / "requirements.txt"
+        requirements_path.write_text("streamlit>=1.32.0\npandas==2.2.0\naltair\n")
+        await uv_manager.sync_requirements()
+        assert "altair==5.0.0" in uv_manager.lock_path.read_text()
+        
+        mock_terminal.execute.reset_mock()
+        requirements_path.write_text("streamlit>=1.32.0\npandas>=2.2.0\nplotly\n")
+        diff = await uv_manager.sync_requirements()
+        
+        assert (diff.added, diff.changed, diff.removed) == (["plotly"], ["pandas>=2.2.0"], ["altair"])
+        commands = [call.args[0] for call in mock_terminal.execute.call_args_list]
+        resolved = str(uv_manager.venv_path / "requirements.resolved.txt")
+        assert commands[:3] == [
+            ["uv", "pip", "install", "plotly", "pandas>=2.2.0"],
+            ["uv", "pip", "compile", str(requirements_path), "--no-header", "-o", resolved],
+            ["uv", "pip", "sync", resolved],
+        ]
+        
+        # Nothing changed, nothing runs
+        mock_terminal.execute.reset_mock()
+        assert (await uv_manager.sync_requirements()).is_empty
+        mock_terminal.execute.assert_not_called()
+    
+    async def test_coalesced_installs(self, uv_manager, mock_terminal):
+        mock_terminal.execute.return_value = 0
+        coalescer = InstallCoalescer(uv_manager, window=0.05)
+        
+        results = await asyncio.gather(*(coalescer.install(name) for name in ("pandas", "numpy", "Pandas")))
+        mock_terminal.execute.assert_called_once_with(
+            ["uv", "pip", "install", "pandas", "numpy"], "install_packages", memoize=False
+        )
+        assert [r.package for r in results] == ["pandas", "numpy", "pandas"]
+        assert all(r.success and r.batch_size == 2 for r in results)
+    
+    async def test_coalesced_install_failure_is_attributed(self, uv_manager, mock_terminal):
+        # The batch fails, then only the broken package fails on its own
+        mock_terminal.execute.side_effect = lambda cmd, name, **kwargs: 1 if "nope" in cmd else 0
+        coalescer = InstallCoalescer(uv_manager, window=None)
+        futures = [coalescer.request("pandas"), coalescer.request("nope")]
+        
+        await coalescer.flush()
+        assert [f.result().success for f in futures] == [True, False]
+        assert mock_terminal.execute.call_count == 3
+    
+    async def test_conflicting_versions_are_not_reported_installed(self, uv_manager, mock_terminal):
+        mock_terminal.execute.return_value = 0
+        coalescer = InstallCoalescer(uv_manager, window=None)
+        first = coalescer.request("pandas", "2.1")
+        second = coalescer.request("pandas", "2.2")
+        
+        assert second.done() and not second.result().success
+        assert second.result().conflict == "pandas==2.1"
+        await coalescer.flush()
+        assert first.result().success
+        mock_terminal.execute.assert_called_once_with(
+            ["uv", "pip", "install", "pandas==2.1"], "install_pandas", memoize=False
+        )
+    
+    async def test_flush_and_report(self, uv_manager, mock_terminal):
+        mock_terminal.execute.return_value = 0
+        coalescer = InstallCoalescer(uv_manager, window=None)
+        coalescer.request("pandas")
+        coalescer.request("numpy")
+        
+        assert [r.package for r in await coalescer.flush_and_report()] == ["pandas", "numpy"]
+        assert await coalescer.flush_and_report() == []
+
+def test_requirements_key_normalized():
+    assert requirements_key({"Streamlit": ">=1.32.0", "pandas": "2.2.0"}) == requirements_key(
+        ["pandas == 2.2.0", "streamlit>=1.32.0  # ui"]
+    )
+    assert requirements_key(["streamlit"]) != requirements_key(["streamlit", "pandas"])
+
+def test_parse_requirements_keeps_urls_and_markers():
+    parsed = parse_requirements([
+        "My_Pkg @ https://host/Path/Pkg-1.0.whl#sha256=AbC  # pinned wheel",
+        "Pandas [Excel] >= 2.0, < 3 ; python_version < '3.13'",
+    ])
+    assert parsed == {
+        "my-pkg": "my-pkg @ https://host/Path/Pkg-1.0.whl#sha256=AbC",
+        "pandas": "pandas[excel]>=2.0,<3; python_version < '3.13'",
+    }
+
+@pytest.fixture
+def venv_pool(tmp_path, monkeypatch):
+    pool = VenvPool(tmp_path / "pool", quota_bytes=10 ** 9)
+    
+    async def fake_build(key, specs):
+        # Shaped like a uv venv: an entry point whose shebang embeds the venv path
+        template = pool._template(key)
+        (template / "bin").mkdir(parents=True)
+        (template / "lib").mkdir()
+        (template / "lib" / "module.py").write_text("x = 1")
+        (template / "bin" / "tool").write_text(f"#!{template}/bin/python\n")
+        (template / "pyvenv.cfg").write_text("home = /usr/bin")
+        pool._meta_path(key).write_text('{"last_used": 0}')
+        return True
+    
+    monkeypatch.setattr(pool, "_build", fake_build)
+    return pool
+
+@pytest.mark.asyncio
+async def test_venv_pool_clones_after_refill(venv_pool, tmp_path):
+    requirements = {"streamlit": ">=1.32.0"}
+    dest = tmp_path / "workspace" / ".venv"
+    
+    assert not await venv_pool.acquire(requirements, dest)
+    await venv_pool.prewarm(requirements)
+    assert await venv_pool.acquire(requirements, dest)
+    
+    template = venv_pool._template(requirements_key(requirements))
+    assert (dest / "lib" / "module.py").stat().st_ino == (template / "lib" / "module.py").stat().st_ino
+    assert (dest / "bin" / "tool").read_text() == f"#!{dest}/bin/python\n"
+    assert (template / "bin" / "tool").read_text() == f"#!{template}/bin/python\n"
+    assert (venv_pool.hits, venv_pool.misses) == (1, 1)
+
+@pytest.mark.asyncio
+async def test_venv_pool_close_finishes_prewarm(venv_pool, tmp_path):
+    build = venv_pool._build
+    
+    async def slow_build(key, specs):
+        await asyncio.sleep(0.1)
+        return await build(key, specs)
+    
+    venv_pool._build = slow_build
+    venv_pool.terminal = AsyncMock()
+    requirements = {"streamlit": ">=1.32.0"}
+    assert not await venv_pool.acquire(requirements, tmp_path / "clone")
+    await venv_pool.close()
+    assert venv_pool.is_ready(requirements)
+
+@pytest.mark.asyncio
+async def test_venv_pool_evicts_least_recently_used(venv_pool, tmp_path):
+    for name in ("a", "b", "c"):
+        await venv_pool.prewarm([name])
+    await venv_pool.acquire(["a"], tmp_path / "clone")
+    
+    venv_pool.quota_bytes = 1
+    evicted = venv_pool.evict(keep=requirements_key(["c"]))
+    assert evicted == [requirements_key(["b"]), requirements_key(["a"])]
+    assert venv_pool.is_ready(["c"])
+
+def build_wheel(directory: Path, name: str, version: str, requires: Sequence[str] = ()) -> Path:
+    """Write a minimal pure-Python wheel"""
+    module = name.replace("-", "_")
+    dist_info = f"{module}-{version}.dist-info"
+    metadata = f"Metadata-Version: 2.1\nName: {name}\nVersion: {version}\n"
+    metadata += "".join(f"Requires-Dist: {requirement}\n" for requirement in requires)
+    files = {
+        f"{module}/__init__.py": f"VERSION = {version!r}\n",
+        f"{dist_info}/METADATA": metadata,
+        f"{dist_info}/WHEEL": "Wheel-Version: 1.0\nGenerator: test\nRoot-Is-Purelib: true\nTag: py3-none-any\n",
+    }
+    record = []
+    for path, content in files.items():
+        digest = base64.urlsafe_b64encode(hashlib.sha256(content.encode()).digest()).rstrip(b"=").decode()
+        record.append(f"{path},sha256={digest},{len(content.encode())}")
+    files[f"{dist_info}/RECORD"] = "\n".join(record + [f"{dist_info}/RECORD,,"]) + "\n"
+    
+    directory.mkdir(parents=True, exist_ok=True)
+    wheel = directory / f"{module}-{version}-py3-none-any.whl"
+    with zipfile.ZipFile(wheel, "w") as archive:
+        for path, content in files.items():
+            archive.writestr(path, content)
+    return wheel
+
+def uv_available(cwd: Path) -> bool:
+    try:
+        return subprocess.run(["uv", "--version"], cwd=cwd, capture_output=True).returncode == 0
+    except OSError:
+        return False
+
+@pytest.mark.asyncio
+async def test_wheelhouse_without_pip_reports_pins_uncached(tmp_path, monkeypatch):
+    monkeypatch.setattr(wheelhouse_module, "_pip_available", lambda: False)
+    wheelhouse = Wheelhouse(tmp_path / "wheels")
+    wheelhouse.terminal = AsyncMock()
+    
+    assert await wheelhouse.populate(["demo-pkg==0.1.0"]) == ["demo-pkg==0.1.0"]
+    wheelhouse.terminal.execute.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_offline_install_from_wheelhouse(tmp_path):
+    if not uv_available(tmp_path):
+        pytest.skip("uv is not installed")
+    
+    wheelhouse = Wheelhouse(tmp_path / "wheels", offline_only=True)
+    build_wheel(wheelhouse.root, "demo-pkg", "0.1.0")
+    terminal = Terminal(tmp_path)
+    uv = UVManager(terminal, tmp_path, wheelhouse=wheelhouse)
+    try:
+        await uv.create_venv()
+        (tmp_path / "requirements.txt").write_text("demo-pkg==0.1.0\n")
+        await uv.sync_requirements()
+    finally:
+        await terminal.cleanup()
+    
+    assert "demo-pkg==0.1.0" in uv.lock_path.read_text()
+    assert (wheelhouse.hits, wheelhouse.misses) == (1, 0)
+    assert wheelhouse.missing(["demo-pkg==0.1.0", "other==1.0"]) == ["other==1.0"]
+    result = subprocess.run(
+        [str(uv.venv_path / "bin" / "python"), "-c", "import demo_pkg; print(demo_pkg.VERSION)"],
+        capture_output=True, text=True
+    )
+    assert result.stdout.strip() == "0.1.0"
+
+@pytest.mark.asyncio
+async def test_removed_requirement_takes_its_dependencies(tmp_path):
+    if not uv_available(tmp_path):
+        pytest.skip("uv is not installed")
+    
+    wheelhouse = Wheelhouse(tmp_path / "wheels", offline_only=True)
+    build_wheel(wheelhouse.root, "demo-app", "0.1.0", requires=["demo-dep"])
+    build_wheel(wheelhouse.root, "demo-dep", "0.1.0")
+    build_wheel(wheelhouse.root, "demo-other", "0.1.0")
+    terminal = Terminal(tmp_path)
+    uv = UVManager(terminal, tmp_path, wheelhouse=wheelhouse)
+    requirements_path = tmp_path / "requirements.txt"
+    try:
+        await uv.create_venv()
+        requirements_path.write_text("demo-app==0.1.0\ndemo-other==0.1.0\n")
+        await uv.sync_requirements()
+        assert "demo-dep==0.1.0" in uv.lock_path.read_text()
+        
+        requirements_path.write_text("demo-other==0.1.0\n")
+        diff = await uv.sync_requirements()
+    finally:
+        await terminal.cleanup()
+    
+    assert diff.removed == ["demo-app"]
+    pins = [line for line in uv.lock_path.read_text().splitlines() if not line.startswith("#")]
+    assert pins == ["demo-other==0.1.0"]
+    assert not (uv.venv_path / "requirements.resolved.txt").exists()
\ No newline at end of file
@@ -0,0 +1,68 @@
+import pytest
+from pathlib import Path
+
+from streamlit_builder.core.container.terminal import Terminal
+from streamlit_builder.runtime.profiler import AppProfiler, ProfileReport, RerunProfile, ScriptProfile
+
+def _report(wall_times):
+    return ProfileReport(
+        created="2025-01-01T00:00:00",
+        scripts=[ScriptProfile("app.py", initial=RerunProfile(label, wall_time, 0)) for label, wall_time in wall_times]
+    )
+
+def test_regressions_need_ratio_and_absolute_slowdown():
+    before = ProfileReport(created="t0", scripts=[ScriptProfile(
+        "app.py",
+        initial=RerunProfile("initial run", 0.010, 0),
+        interactions=[RerunProfile("button 'Go'", 0.200, 0), RerunProfile("slider 'n'", 0.200, 0)],
+    )])
+    after = ProfileReport(created="t1", scripts=[ScriptProfile(
+        "app.py",
+        initial=RerunProfile("initial run", 0.030, 0),  # 3x but only 20ms
+        interactions=[RerunProfile("button 'Go'", 0.500, 0), RerunProfile("slider 'n'", 0.260, 0)],
+    )])
+    
+    regressions = after.regressions(before)
+    assert [(r.label, r.before, r.after) for r in regressions] == [("button 'Go'", 0.2, 0.5)]
+
+def test_report_round_trip():
+    report = _report([("initial run", 0.1)])
+    report.scripts[0].interactions.append(RerunProfile("button 'Go'", 0.2, 1024, hotspots=[{"function": "app.py:1(f)"}]))
+    assert ProfileReport.from_dict(report.to_dict()) == report
+
+def test_scripts_find_home_entry_point(tmp_path):
+    (tmp_path / "pages").mkdir()
+    (tmp_path / "pages" / "1_Data.py").write_text("")
+    (tmp_path / "Home.py").write_text("")
+    (tmp_path / "streamlit_app.py").write_text("")
+    profiler = AppProfiler(Terminal(tmp_path), tmp_path)
+    assert profiler.scripts() == [tmp_path / "Home.py", tmp_path / "pages" / "1_Data.py"]
+    
+    (tmp_path / "app.py").write_text("")
+    assert profiler.scripts()[0] == tmp_path / "app.py"
+
+@pytest.mark.asyncio
+async def test_profile_app_and_pages(tmp_path):
+    (tmp_path / "app.py").write_text(
+        "import streamlit as st\n"
+        "if st.button('Go'):\n"
+        "    st.write(sum(range(10000)))\n"
+    )
+    (tmp_path / "pages").mkdir()
+    (tmp_path / "pages" / "broken.py").write_text("raise ValueError('boom')\n")
+    
+    terminal = Terminal(tmp_path)
+    profiler = AppProfiler(terminal, tmp_path)
+    try:
+        report = await profiler.profile()
+    finally:
+        await terminal.cleanup()
+    
+    app, broken = report.scripts
+    assert app.script == "app.py"
+    assert app.initial.wall_time > 0 and app.initial.hotspots
+    assert [rerun.label for rerun in app.interactions] == ["button 'Go'"]
+    assert broken.initial.exceptions == ["boom"]
+    
+    # Saved with the workspace for the next comparison
+    assert profiler.history() == [report]
\ No newline at end of file
@@ -1,9 +1,19 @@
 import pytest
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 from unittest.mock import AsyncMock, Mock, ANY
 
 from streamlit_builder.project.manager import ProjectManager
 from streamlit_builder.core.container.webcontainer import WebContainer
+from streamlit_builder.project import datasets as datasets_module
+from streamlit_builder.project.datasets import DatasetCatalog
+from streamlit_builder.project import _dataset_cache as dataset_cache
+from streamlit_builder.core.llm.perf_linter import lint_source
 
 @pytest.fixture
 def mock_container():
@@ -55,4 +65,157 @@ class TestProjectManager:
     
     async def test_create_project_invalid_template(self, project_manager):
         with pytest.raises(ValueError, match="Template invalid_template not found"):
-            await project_manager.create_project("test_app", template_name="invalid_template") 
\ No newline at end of file
+            await project_manager.create_project("test_app", template_name="invalid_template") 
+
+@pytest.mark.asyncio
+async def test_ingest_converts_once_and_describes_schema(tmp_path, monkeypatch):
+    import pyarrow.parquet as pq
+    
+    data = tmp_path / "data"
+    data.mkdir()
+    (data / "Sales 2024.csv").write_text("region,amount\nnorth,10\nsouth,\nnorth,32.5\n")
+    (data / "events.json").write_text('[{"kind": "click", "n": 1}, {"kind": "view", "n": 3}]')
+    catalog = DatasetCatalog(tmp_path)
+    
+    infos = {info.name: info for info in await catalog.ingest_all()}
+    assert set(infos) == {"sales_2024", "events"}
+    sales = infos["sales_2024"]
+    assert sales.rows == 3 and sales.path == "data/sales_2024.parquet"
+    amount = sales.columns[1]
+    assert (amount.type, amount.null_count, amount.min, amount.max) == ("double", 1, "10.0", "32.5")
+    assert pq.read_table(tmp_path / sales.path).num_rows == 3
+    assert (tmp_path / "data_loader.py").exists()
+    assert "amount: double (1 nulls, 10.0 .. 32.5)" in catalog.prompt_context()
+    
+    # Unchanged sources aren't converted again, and the catalog is never a source
+    conversions = []
+    monkeypatch.setattr(datasets_module, "convert_to_parquet", lambda *args: conversions.append(args))
+    mtime = (tmp_path / sales.path).stat().st_mtime_ns
+    for _ in range(2):
+        await catalog.ingest_all()
+    assert conversions == []
+    assert (tmp_path / sales.path).stat().st_mtime_ns == mtime
+    assert set(catalog.datasets()) == {"sales_2024", "events"}
+
+@pytest.mark.asyncio
+async def test_ingest_names_are_unique_and_deleted_sources_dropped(tmp_path):
+    data = tmp_path / "data"
+    (data / "sub").mkdir(parents=True)
+    (data / "sales.csv").write_text("region,amount\nnorth,10\n")
+    (data / "sales.json").write_text('[{"region": "south", "amount": 3}]')
+    (data / "sub" / "sales.json").write_text('[{"region": "east", "amount": 5}]')
+    catalog = DatasetCatalog(tmp_path)
+    
+    infos = {info.source: info.name for info in await catalog.ingest_all()}
+    assert infos == {"data/sales.csv": "sales", "data/sales.json": "sales_2", "data/sub/sales.json": "sub_sales"}
+    assert len({info.path for info in catalog.datasets().values()}) == 3
+    
+    (data / "sales.csv").unlink()
+    await catalog.ingest_all()
+    assert set(catalog.datasets()) == {"sales_2", "sub_sales"}
+    assert not (data / "sales.parquet").exists()
+
+@pytest.fixture
+def dataset_server(tmp_path, monkeypatch):
+    """HTTP server with ETags; files maps path -> body, requests logs (path, status)"""
+    monkeypatch.setenv("STREAMLIT_BUILDER_DATASET_CACHE", str(tmp_path / "cache"))
+    files = {}
+    requests = []
+    
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = files[self.path]
+            etag = f'"{hash(body)}"'
+            if self.headers.get("If-None-Match") == etag:
+                requests.append((self.path, 304))
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            time.sleep(0.2)  # Long enough for concurrent fetches to overlap
+            requests.append((self.path, 200))
+            self.send_response(200)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, *args):
+            pass
+    
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}", files, requests
+    server.shutdown()
+
+def test_dataset_cache_revalidates_with_etag(dataset_server):
+    base, files, requests = dataset_server
+    files["/trips.csv"] = b"a,b\n1,2\n"
+    url = f"{base}/trips.csv"
+    
+    path = dataset_cache.fetch(url)
+    assert path.read_bytes() == b"a,b\n1,2\n" and path.name.endswith(".csv")
+    assert dataset_cache.fetch(url) == path  # Fresh: no request at all
+    assert dataset_cache.fetch(url, max_age=0) == path
+    assert requests == [("/trips.csv", 200), ("/trips.csv", 304)]
+    
+    files["/trips.csv"] = b"a,b\n3,4\n"
+    assert dataset_cache.read_csv(url, max_age=0)["a"].tolist() == [3]
+    assert requests[-1] == ("/trips.csv", 200)
+
+def test_dataset_cache_serves_json_urls(dataset_server, monkeypatch):
+    base, files, requests = dataset_server
+    monkeypatch.setenv("STREAMLIT_BUILDER_DATASET_CACHE_BYTES", "250")
+    files["/rows.json"] = b'[{"a": 1}]'
+    files["/other.json"] = b"x" * 100
+    
+    path = dataset_cache.fetch(f"{base}/rows.json")
+    assert path.name.endswith(".json") and path.read_bytes() == b'[{"a": 1}]'
+    # Data files aren't mistaken for metadata when the cache is trimmed
+    dataset_cache.fetch(f"{base}/other.json")
+    assert dataset_cache.fetch(f"{base}/rows.json", max_age=0).read_bytes() == b'[{"a": 1}]'
+    assert requests[-1] == ("/rows.json", 304)
+
+def test_dataset_cache_downloads_once_for_concurrent_fetches(dataset_server):
+    base, files, requests = dataset_server
+    files["/big.bin"] = b"x" * 100_000
+    
+    with ThreadPoolExecutor(8) as pool:
+        paths = set(pool.map(lambda _: dataset_cache.fetch(f"{base}/big.bin"), range(8)))
+    
+    assert len(paths) == 1
+    assert requests == [("/big.bin", 200)]
+
+def test_dataset_cache_evicts_least_recently_used(dataset_server, monkeypatch):
+    base, files, requests = dataset_server
+    monkeypatch.setenv("STREAMLIT_BUILDER_DATASET_CACHE_BYTES", "250")
+    for name in ("a", "b", "c"):
+        files[f"/{name}"] = b"x" * 100
+    
+    first = dataset_cache.fetch(f"{base}/a")
+    second = dataset_cache.fetch(f"{base}/b")
+    time.sleep(0.01)
+    dataset_cache.fetch(f"{base}/a")  # Used again, so b is now the oldest
+    dataset_cache.fetch(f"{base}/c")
+    
+    assert first.exists() and not second.exists()
+
+@pytest.mark.parametrize("template_name", ["dashboard", "sql"])
+def test_performance_template_meets_its_timing_budget(template_name, project_manager, tmp_path):
+    template = project_manager.templates[template_name]
+    files = template.get_files()
+    assert "fastReruns = true" in files[".streamlit/config.toml"]
+    for path, content in files.items():
+        target = tmp_path / path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(content)
+        if path.endswith(".py"):
+            assert lint_source(content, path) == [], path
+    
+    # The generated AppTest timing checks run against the generated app
+    result = subprocess.run(
+        [sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider", "tests"],
+        cwd=tmp_path, capture_output=True, text=True, timeout=120,
+    )
+    assert result.returncode == 0, result.stdout[-2000:]
+    assert "3 passed" in result.stdout
\ No newline at end of file
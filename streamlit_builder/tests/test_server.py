@@ -3,11 +3,19 @@ import asyncio
 from pathlib import Path
 from unittest.mock import AsyncMock, Mock, patch
 import signal
+import socket
 import aiohttp
+from aiohttp import web
 from types import SimpleNamespace
 
 from streamlit_builder.server.streamlit_runner import StreamlitRunner
 from streamlit_builder.core.container.terminal import Terminal
+from streamlit_builder.core.container.handle import ProcessExitedError
+from streamlit_builder.core.container.process import CommandClass
+from streamlit_builder.server.proxy import ReverseProxy, free_port
+from streamlit_builder.server.host import AppHost, PortAllocator
+from streamlit_builder.server.forkserver import ForkServer, ForkedProcess
+from streamlit_builder.server.load_test import LoadTester, percentile, widget_change
 
 @pytest.fixture
 def mock_terminal():
@@ -75,14 +83,36 @@ class TestStreamlitRunner:
             assert streamlit_runner._process is not None
             assert streamlit_runner._port == 8501
     
+    async def test_ready_from_banner(self, streamlit_runner):
+        # The health endpoint never answers; the stdout banner decides
+        streamlit_runner._process = Mock(wait_for=AsyncMock(return_value="You can now view your Streamlit app"))
+        
+        with patch('aiohttp.ClientSession', return_value=MockClientSession(MockResponse(status=503))):
+            assert await streamlit_runner._wait_for_server(timeout=2) == "banner"
+    
+    async def test_ready_from_health(self, streamlit_runner):
+        # No usable output stream falls back to the health endpoint
+        streamlit_runner._process = Mock(wait_for=AsyncMock(side_effect=OSError("no output")))
+        
+        with patch('aiohttp.ClientSession', return_value=MockClientSession(MockResponse(status=200))):
+            assert await streamlit_runner._wait_for_server(timeout=2) == "health"
+    
+    async def test_exit_before_ready_fails_fast(self, streamlit_runner):
+        streamlit_runner._process = Mock(wait_for=AsyncMock(side_effect=ProcessExitedError("exited with 1")))
+        
+        with patch('aiohttp.ClientSession', return_value=MockClientSession(MockResponse(status=503))):
+            started = asyncio.get_running_loop().time()
+            with pytest.raises(RuntimeError):
+                await streamlit_runner._wait_for_server(timeout=5)
+            assert asyncio.get_running_loop().time() - started < 1
+    
     async def test_stop_server(self, streamlit_runner, mock_process):
         # Use the fixture with correct sync/async methods
         streamlit_runner._process = mock_process
         
         await streamlit_runner.stop()
         
-        mock_process.send_signal.assert_called_once_with(signal.SIGTERM)
-        mock_process.wait.assert_awaited_once()  # wait is still async
+        mock_process.terminate.assert_awaited_once()
         assert streamlit_runner._process is None
     
     async def test_restart_server(self, streamlit_runner):
@@ -95,4 +125,283 @@ class TestStreamlitRunner:
             await streamlit_runner.restart()
             
             mock_stop.assert_called_once()
-            mock_start.assert_called_once_with(port=8501) 
\ No newline at end of file
+            mock_start.assert_called_once_with(port=8501)
+    
+    async def test_concurrent_restarts_single_flight(self, streamlit_runner):
+        async def slow_start(port):
+            await asyncio.sleep(0.05)
+        
+        with patch.object(streamlit_runner, 'start', side_effect=slow_start) as mock_start, \
+             patch.object(streamlit_runner, 'stop', AsyncMock()):
+            # The first call restarts; the rest arrive mid-restart and share one follow-up
+            results = await asyncio.gather(*(streamlit_runner.restart() for _ in range(5)))
+            
+            assert mock_start.call_count == 2
+            assert results.count(True) == 2 
+    
+    async def test_blue_green_restart(self, mock_terminal, tmp_path):
+        runner = StreamlitRunner(mock_terminal, tmp_path, blue_green=True)
+        old, new = AsyncMock(returncode=None), AsyncMock(returncode=None)
+        runner._process, runner._server_port = old, 9001
+        runner.proxy = Mock(spec=ReverseProxy)
+        
+        with patch.object(runner, '_launch', AsyncMock(return_value=new)), \
+             patch.object(runner, '_wait_for_server', AsyncMock()):
+            await runner.restart()
+        
+        # The old server only stops after viewers were moved to the new one
+        runner.proxy.switch.assert_called_once_with(runner._server_port)
+        runner.proxy.drain.assert_awaited_once_with(9001)
+        old.terminate.assert_awaited_once()
+        new.terminate.assert_not_awaited()
+        assert runner._process is new
+
+async def _upstream(name: str):
+    """Start a tiny server that names itself over HTTP and echoes over websockets"""
+    async def index(request):
+        return web.Response(text=name)
+    
+    async def echo(request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        async for message in ws:
+            await ws.send_str(f"{name}:{message.data}")
+        return ws
+    
+    app = web.Application()
+    app.router.add_get("/", index)
+    app.router.add_get("/ws", echo)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    port = free_port()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    return runner, port
+
+@pytest.mark.asyncio
+async def test_proxy_switch_and_drain():
+    blue, blue_port = await _upstream("blue")
+    green, green_port = await _upstream("green")
+    proxy = ReverseProxy(free_port(), blue_port)
+    await proxy.start()
+    url = f"http://127.0.0.1:{proxy.port}"
+    try:
+        async with aiohttp.ClientSession() as session:
+            async with session.get(url) as resp:
+                assert await resp.text() == "blue"
+            ws = await session.ws_connect(f"{url}/ws")
+            await ws.send_str("hi")
+            assert (await ws.receive()).data == "blue:hi"
+            
+            proxy.switch(green_port)
+            async with session.get(url) as resp:
+                assert await resp.text() == "green"
+            assert proxy.connections(blue_port) == 1  # The websocket stays pinned
+            
+            await proxy.drain(blue_port)
+            message = await ws.receive()
+            assert message.type == aiohttp.WSMsgType.CLOSE
+            assert message.data == aiohttp.WSCloseCode.SERVICE_RESTART
+            assert proxy.connections(blue_port) == 0
+    finally:
+        await proxy.stop()
+        await blue.cleanup()
+        await green.cleanup()
+
+@pytest.fixture
+def app_host(tmp_path):
+    host = AppHost(port=free_port(), max_live=1, idle_timeout=60)
+    for name in ("a", "b"):
+        (tmp_path / name).mkdir()
+        host.register(name, tmp_path / name)
+    return host
+
+@pytest.mark.asyncio
+class TestAppHost:
+    async def test_lazy_start_and_lru_eviction(self, app_host):
+        with patch('streamlit_builder.server.host.StreamlitRunner') as mock_runner:
+            mock_runner.return_value = AsyncMock()
+            assert not app_host.live  # Nothing runs until requested
+            
+            port = await app_host.ensure_started("a")
+            assert await app_host.ensure_started("a") == port
+            mock_runner.assert_called_once()
+            assert mock_runner.call_args.kwargs["base_url_path"] == "a"
+            
+            # Over max_live, the least recently used app makes room
+            await app_host.ensure_started("b")
+            assert [app.name for app in app_host.live] == ["b"]
+            mock_runner.return_value.stop.assert_awaited_once()
+            await app_host.stop()
+    
+    async def test_concurrent_requests_share_one_start(self, app_host):
+        async def slow_start(*args, **kwargs):
+            await asyncio.sleep(0.05)
+        
+        with patch('streamlit_builder.server.host.StreamlitRunner') as mock_runner:
+            mock_runner.return_value = AsyncMock(start=AsyncMock(side_effect=slow_start))
+            ports = await asyncio.gather(*(app_host.ensure_started("a") for _ in range(3)))
+            
+            assert len(set(ports)) == 1
+            mock_runner.return_value.start.assert_awaited_once()
+            await app_host.stop()
+    
+    async def test_idle_apps_are_stopped(self, app_host):
+        with patch('streamlit_builder.server.host.StreamlitRunner') as mock_runner:
+            mock_runner.return_value = AsyncMock()
+            await app_host.ensure_started("a")
+            assert await app_host.reap_idle() == []
+            
+            app_host.idle_timeout = 0
+            assert await app_host.reap_idle() == ["a"]
+            assert not app_host.live
+    
+    async def test_port_allocator_skips_busy_ports(self):
+        busy = free_port()
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", busy))
+            sock.listen()
+            ports = PortAllocator((busy, busy + 5))
+            first = ports.allocate()
+            assert first != busy
+            assert ports.allocate() != first
+            ports.release(first)
+            assert ports.allocate() == first
+
+@pytest.mark.asyncio
+class TestForkServer:
+    async def test_spawn_from_warm_pool(self, tmp_path):
+        terminal = Terminal(tmp_path)
+        terminal.process_manager.timeouts[CommandClass.RUN] = 0.5
+        forkserver = ForkServer(terminal, tmp_path / ".venv", pool_size=1, preload=[])
+        try:
+            await forkserver.start()
+            # The zygote outlives any command deadline
+            assert not terminal.process_manager._deadlines
+            process = await forkserver.spawn(tmp_path, ["version"], tmp_path / "logs" / "version.log")
+            
+            assert "Streamlit, version" in await process.wait_for("version", timeout=10)
+            assert await process.wait() == 0  # Reported by the child itself
+            with pytest.raises(ProcessLookupError):
+                process.send_signal(signal.SIGTERM)
+            stats = await forkserver.stats()
+            assert stats["served"] == 1 and stats["cold"] == 0
+            assert stats["idle"] == 1  # Refilled
+            await asyncio.sleep(0.5)
+            assert forkserver.is_running
+        finally:
+            await forkserver.stop()
+            await terminal.cleanup()
+    
+    async def test_forked_process_exit_before_match(self, tmp_path):
+        log = tmp_path / "server.log"
+        log.write_text("starting\n")
+        ours, childs = socket.socketpair()
+        childs.close()  # Killed without reporting
+        process = ForkedProcess("streamlit", 2 ** 22 + 1, log, *await asyncio.open_unix_connection(sock=ours))
+        
+        with pytest.raises(ProcessExitedError):
+            await process.wait_for("ready", timeout=1)
+        assert process.returncode == -1
+    
+    async def test_restart_replaces_idle_children_only(self, tmp_path):
+        (tmp_path / "app.py").write_text("import streamlit as st\nst.write('hi')\n")
+        terminal = Terminal(tmp_path)
+        forkserver = ForkServer(terminal, tmp_path / ".venv", pool_size=2, preload=[])
+        try:
+            await forkserver.start()
+            args = ["run", "app.py", "--server.port", str(free_port()), "--server.headless", "true"]
+            app = await forkserver.spawn(tmp_path, args, tmp_path / "logs" / "app.log")
+            await app.wait_for("URL", timeout=30)
+            idle = (await forkserver.stats())["idle_pids"]
+            assert len(idle) == 2 and app.pid not in idle
+            
+            await forkserver.restart()
+            assert all(not _running(pid) for pid in idle)
+            assert app.returncode is None and _running(app.pid)
+            stats = await forkserver.stats()
+            assert stats["idle"] == 2 and stats["served"] == 0
+            
+            assert await app.terminate() is not None
+            assert app.returncode is not None
+        finally:
+            await forkserver.stop()
+            await terminal.cleanup()
+    
+    async def test_runner_starts_from_fork_server(self, mock_terminal, tmp_path):
+        forkserver = Mock(spec=ForkServer, is_running=True)
+        forkserver.spawn = AsyncMock(return_value=Mock(spec=ForkedProcess))
+        runner = StreamlitRunner(mock_terminal, tmp_path, forkserver=forkserver)
+        
+        with patch.object(runner, '_wait_for_server', AsyncMock()):
+            await runner.start(port=8600)
+        
+        assert forkserver.spawn.call_args.args[1][:4] == ["run", "app.py", "--server.port", "8600"]
+        mock_terminal.execute.assert_not_called()
+
+def _running(pid: int) -> bool:
+    """Whether a pid is alive and not a zombie waiting for a reaper"""
+    try:
+        return Path(f"/proc/{pid}/stat").read_text().rsplit(")", 1)[1].split()[0] != "Z"
+    except (FileNotFoundError, IndexError):
+        return False
+
+async def _fake_streamlit():
+    """A /_stcore/stream endpoint that answers every rerun with one checkbox"""
+    from streamlit.proto.BackMsg_pb2 import BackMsg
+    from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+    
+    received = []
+    
+    async def stream(request):
+        ws = web.WebSocketResponse(protocols=["streamlit"])
+        await ws.prepare(request)
+        async for message in ws:
+            back = BackMsg()
+            back.ParseFromString(message.data)
+            received.append(back)
+            delta = ForwardMsg()
+            delta.delta.new_element.checkbox.id = "check"
+            await ws.send_bytes(delta.SerializeToString())
+            await ws.send_bytes(ForwardMsg(script_finished=ForwardMsg.FINISHED_SUCCESSFULLY).SerializeToString())
+        return ws
+    
+    app = web.Application()
+    app.router.add_get("/_stcore/stream", stream)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    port = free_port()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    return runner, port, received
+
+@pytest.mark.asyncio
+async def test_load_test_reruns_and_changes_widgets():
+    server, port, received = await _fake_streamlit()
+    try:
+        tester = LoadTester(port, viewers=3, duration=0.5, think_time=0.01, ramp_up=0.1, seed=1)
+        report = await tester.run()
+    finally:
+        await server.cleanup()
+    
+    assert report.errors == report.timeouts == report.disconnects == 0
+    assert report.latencies["rerun"] and report.latencies["widget"]
+    assert report.completed == len(received)
+    changed = [back.rerun_script.widget_states.widgets[0] for back in received if back.rerun_script.widget_states.widgets]
+    assert changed and all(state.id == "check" and state.bool_value for state in changed)
+    assert report.percentiles()["p50"] <= report.percentiles()["p99"]
+
+def test_load_test_helpers():
+    from streamlit.proto.Element_pb2 import Element
+    
+    assert percentile([], 95) == 0.0
+    assert percentile([0.3, 0.1, 0.2, 0.4], 50) == 0.2
+    assert percentile([0.3, 0.1, 0.2, 0.4], 99) == 0.4
+    
+    element = Element()
+    element.selectbox.id = "pick"
+    element.selectbox.options.extend(["a", "b"])
+    assert widget_change("selectbox", element.selectbox).string_value == "b"
+    element.slider.id = "rows"
+    element.slider.max = 100
+    element.slider.default.append(10)
+    assert list(widget_change("slider", element.slider).double_array_value.data) == [100]
+    assert widget_change("file_uploader", element.slider) is None
\ No newline at end of file
@@ -1,15 +1,20 @@
 import pytest
+import asyncio
 from pathlib import Path
 from unittest.mock import AsyncMock, Mock, patch
 from watchfiles import Change
 
 from streamlit_builder.runtime.session_manager import DevelopmentSession
 from streamlit_builder.core.container.webcontainer import WebContainer
+from streamlit_builder.core.container.bytecode import BytecodeCompiler
+from streamlit_builder.utils.metrics import metrics
 
 @pytest.fixture
 def mock_container():
     container = Mock(spec=WebContainer)
     container.terminal = AsyncMock()
+    container.bytecode = AsyncMock(spec=BytecodeCompiler)
+    container.wheelhouse = None
     return container
 
 @pytest.fixture
@@ -38,16 +43,72 @@ class TestDevelopmentSession:
             mock_stop.assert_called_once()
             mock_watch.assert_called_once()
     
-    async def test_file_change_handlers(self, session):
+    async def test_file_change_handlers(self, session, tmp_path):
         with patch.object(session.streamlit, 'restart', AsyncMock()) as mock_restart:
-            # Test Python file modification
+            # Python changes are rerun in place by Streamlit
+            reruns = metrics.count("reload.reruns")
+            await session._on_file_modified(Path('test.py'))
+            mock_restart.assert_not_called()
+            assert metrics.count("reload.reruns") == reruns + 1
+            
+            # Saved files record how long the change took to be handled
+            lags = len(metrics.timings("reload.change_lag"))
+            (tmp_path / 'page.py').write_text("x = 1")
+            await session._on_file_modified(tmp_path / 'page.py')
+            assert len(metrics.timings("reload.change_lag")) == lags + 1
+            assert not metrics.timings("reload.rerun")
+            
+            # Server config is only read at startup
+            await session._on_file_modified(tmp_path / '.streamlit' / 'config.toml')
+            mock_restart.assert_called_once()
+            
+            mock_restart.reset_mock()
+            
+            # A dead server is restarted on the next change
+            session.streamlit._process = Mock(returncode=1)
             await session._on_file_modified(Path('test.py'))
             mock_restart.assert_called_once()
+            session.streamlit._process = None
             
             mock_restart.reset_mock()
             
             # Test requirements.txt modification
-            with patch.object(session.uv, 'install_requirements', AsyncMock()) as mock_install:
+            with patch.object(session.uv, 'sync_requirements', AsyncMock()) as mock_install:
                 await session._on_file_modified(Path('requirements.txt'))
                 mock_install.assert_called_once()
-                mock_restart.assert_called_once()
\ No newline at end of file
+                mock_restart.assert_called_once()
+    
+    async def test_change_batch_restarts_once(self, session, tmp_path):
+        session.quiet_period = 0.05
+        with patch.object(session.streamlit, 'restart', AsyncMock(return_value=True)) as mock_restart, \
+             patch.object(session.uv, 'sync_requirements', AsyncMock()) as mock_sync:
+            # One turn writing app code, dependencies and server config, seen in several batches
+            await session._on_changes({(Change.added, tmp_path / f'page_{i}.py') for i in range(6)})
+            await session._on_changes({(Change.modified, tmp_path / 'requirements.txt')})
+            await session._on_changes({(Change.added, tmp_path / '.streamlit' / 'config.toml')})
+            mock_restart.assert_not_called()  # Still inside the quiet period
+            
+            await asyncio.sleep(0.1)
+            await asyncio.gather(*session._applying)
+            
+            mock_sync.assert_called_once()
+            mock_restart.assert_called_once()
+    
+    async def test_overlapping_requirement_batches_sync_one_at_a_time(self, session, tmp_path):
+        running, overlaps = 0, 0
+        
+        async def sync():
+            nonlocal running, overlaps
+            running += 1
+            overlaps += running > 1
+            await asyncio.sleep(0.05)
+            running -= 1
+        
+        with patch.object(session.streamlit, 'restart', AsyncMock(return_value=True)) as mock_restart, \
+             patch.object(session.uv, 'sync_requirements', side_effect=sync) as mock_sync:
+            requirements = {(Change.modified, tmp_path / 'requirements.txt')}
+            await asyncio.gather(session._apply_changes(requirements), session._apply_changes(requirements))
+        
+        assert mock_sync.call_count == 2
+        assert mock_restart.call_count == 2
+        assert overlaps == 0
\ No newline at end of file
@@ -5,7 +5,7 @@ from pathlib import Path
 from unittest.mock import AsyncMock
 from watchfiles import Change
 
-from streamlit_builder.core.files.watcher import FileWatcher
+from streamlit_builder.core.files.watcher import FileWatcher, _coalesce
 from streamlit_builder.utils.logger import logger
 
 @pytest.fixture
@@ -20,6 +20,16 @@ def watcher(tmp_dir):
     """Create a FileWatcher instance"""
     return FileWatcher(tmp_dir)
 
+def test_batches_have_one_change_per_path(tmp_path):
+    kept, temporary, gone = tmp_path / "kept.py", tmp_path / "tmp.py", tmp_path / "gone.py"
+    kept.write_text("x = 1")
+    changes = {
+        (Change.added, str(kept)), (Change.modified, str(kept)),
+        (Change.added, str(temporary)), (Change.deleted, str(temporary)),
+        (Change.modified, str(gone)), (Change.deleted, str(gone)),
+    }
+    assert _coalesce(changes) == {kept: Change.added, gone: Change.deleted}
+
 @pytest.mark.asyncio
 class TestFileWatcher:
     async def test_handler_registration(self, watcher):
@@ -27,6 +37,80 @@ class TestFileWatcher:
         watcher.on_change(Change.modified, handler)
         assert handler in watcher.handlers[Change.modified]
     
+    async def test_batch_handler(self, watcher, tmp_dir):
+        handler = AsyncMock()
+        watcher.on_batch(handler)
+        await watcher.start()
+        
+        for name in ("a.py", "b.py", "c.py"):
+            (tmp_dir / name).write_text("x = 1")
+        
+        start_time = asyncio.get_event_loop().time()
+        seen = set()
+        while not {"a.py", "b.py", "c.py"} <= seen:
+            await asyncio.sleep(0.1)
+            seen = {path.name for call in handler.call_args_list for _, path in call[0][0]}
+            if asyncio.get_event_loop().time() - start_time > 2.0:
+                break
+        
+        await watcher.stop()
+        
+        # Files written together arrive in far fewer calls than files
+        assert {"a.py", "b.py", "c.py"} <= seen
+        assert handler.call_count < 3
+    
+    async def test_ignored_changes_are_dropped(self, watcher, tmp_dir):
+        handler = AsyncMock()
+        watcher.on_batch(handler)
+        await watcher.start()
+        
+        for relative in (".venv/lib/site.py", "__pycache__/app.cpython-312.pyc", "util.pyc", "app.py"):
+            (tmp_dir / relative).parent.mkdir(parents=True, exist_ok=True)
+            (tmp_dir / relative).write_text("x = 1")
+        
+        start_time = asyncio.get_event_loop().time()
+        while not handler.call_count and asyncio.get_event_loop().time() - start_time < 2.0:
+            await asyncio.sleep(0.1)
+        await asyncio.sleep(0.3)
+        await watcher.stop()
+        
+        seen = {path.relative_to(tmp_dir) for call in handler.call_args_list for _, path in call[0][0]}
+        assert seen == {Path("app.py")}
+        assert watcher.stats["dropped"] >= 3
+        assert watcher.stats["events"] == 1
+    
+    async def test_slow_handler_does_not_hold_up_others(self, watcher, tmp_dir):
+        release = asyncio.Event()
+        slow_batches, fast_batches = [], []
+        
+        async def slow(batch):
+            slow_batches.append({path.name for _, path in batch})
+            await release.wait()
+        
+        async def fast(batch):
+            fast_batches.append({path.name for _, path in batch})
+        
+        watcher.on_batch(slow)
+        watcher.on_batch(fast)
+        await watcher.start()
+        
+        for name in ("a.py", "b.py", "c.py"):
+            (tmp_dir / name).write_text("x = 1")
+            start_time = asyncio.get_event_loop().time()
+            while not any(name in batch for batch in fast_batches):
+                await asyncio.sleep(0.05)
+                assert asyncio.get_event_loop().time() - start_time < 2.0, f"{name} not dispatched"
+        
+        # The slow handler is still on its first batch; the others wait merged into one
+        assert len(slow_batches) == 1
+        assert watcher.stats["merged"] >= 1
+        release.set()
+        await watcher.wait_idle()
+        await watcher.stop()
+        
+        assert len(slow_batches) == 2
+        assert set().union(*slow_batches) == {"a.py", "b.py", "c.py"}
+    
     async def test_start_stop(self, watcher):
         await watcher.start()
         assert watcher._running
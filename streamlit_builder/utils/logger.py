@@ -36,6 +36,10 @@ class Logger:
         """Set the logging level"""
         self.logger.setLevel(level.value)
     
+    def is_enabled_for(self, level: LogLevel) -> bool:
+        """Check whether messages at a level would be emitted"""
+        return self.logger.isEnabledFor(logging.getLevelName(level.value))
+    
     def debug(self, message: str):
         self.logger.debug(message)
     
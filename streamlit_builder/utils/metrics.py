@@ -0,0 +1,64 @@
+import statistics
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Iterator, List
+
+MAX_SAMPLES = 1000  # Timing samples kept per metric
+
+class Metrics:
+    """In-process counters and timing samples"""
+    
+    def __init__(self):
+        self._counters: Dict[str, int] = defaultdict(int)
+        self._timings: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=MAX_SAMPLES))
+    
+    def increment(self, name: str, value: int = 1):
+        """Increase a counter"""
+        self._counters[name] += value
+    
+    def record(self, name: str, seconds: float):
+        """Record a timing sample in seconds"""
+        self._timings[name].append(seconds)
+    
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        """Time the enclosed block and record it under a name"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+    
+    def count(self, name: str) -> int:
+        return self._counters.get(name, 0)
+    
+    def timings(self, name: str) -> List[float]:
+        return list(self._timings.get(name, []))
+    
+    def summary(self, name: str) -> Dict[str, float]:
+        """Summarize the timing samples of a metric"""
+        samples = sorted(self._timings.get(name, []))
+        if not samples:
+            return {"count": 0}
+        return {
+            "count": len(samples),
+            "mean": statistics.fmean(samples),
+            "p50": samples[len(samples) // 2],
+            "p95": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+            "max": samples[-1],
+        }
+    
+    def snapshot(self) -> Dict[str, Dict]:
+        """Return all counters and timing summaries"""
+        return {
+            "counters": dict(self._counters),
+            "timings": {name: self.summary(name) for name in self._timings},
+        }
+    
+    def reset(self):
+        self._counters.clear()
+        self._timings.clear()
+
+# Global metrics instance
+metrics = Metrics()
\ No newline at end of file